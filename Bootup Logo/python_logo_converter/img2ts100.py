@@ -4,6 +4,7 @@ from __future__ import division
 import os
 import sys
 
+from intel_hex import intel_hex
 
 try:
     from PIL import Image, ImageOps
@@ -20,67 +21,6 @@ LCD_HEIGHT      = 16
 LCD_NUM_BYTES   = LCD_WIDTH * LCD_HEIGHT // 8
 LCD_PADDED_SIZE = 1024
 
-INTELHEX_DATA_RECORD                    = 0x00
-INTELHEX_END_OF_FILE_RECORD             = 0x01
-INTELHEX_EXTENDED_LINEAR_ADDRESS_RECORD = 0x04
-INTELHEX_BYTES_PER_LINE                 = 16
-INTELHEX_MINIMUM_SIZE                   = 4096
-
-
-def split16(word):
-    """return high and low byte of 16-bit word value as tuple"""
-    return (word >> 8) & 0xff, word & 0xff
-
-
-def intel_hex_line(record_type, offset, data):
-    """generate a line of data in Intel hex format"""
-    # length, address offset, record type
-    record_length = len(data)
-    yield ':{:02X}{:04X}{:02X}'.format(record_length, offset, record_type)
-
-    # data
-    for byte in data:
-        yield "{:02X}".format(byte)
-
-    # compute and write checksum (now using unix style line endings for DFU3.45 compatibility
-    yield "{:02X}\n".format((((sum(data,                   # sum data ...
-                                     record_length           # ... and other ...
-                                     + sum(split16(offset))  # ... fields ...
-                                     + record_type)          # ... on line
-                                 & 0xff)                     # low 8 bits
-                                ^ 0xff)                      # two's ...
-                               + 1)                          # ... complement
-                              & 0xff)                        # low 8 bits
-
-
-def intel_hex(file, bytes_, start_address=0x0):
-    """write block of data in Intel hex format"""
-    def write(generator):
-        file.write(''.join(generator))
-
-    if len(bytes_) % INTELHEX_BYTES_PER_LINE != 0:
-        raise ValueError("Program error: Size of LCD data is not evenly divisible by {}"
-                         .format(INTELHEX_BYTES_PER_LINE))
-
-    address_lo =  start_address        & 0xffff
-    address_hi = (start_address >> 16) & 0xffff
-
-    write(intel_hex_line(INTELHEX_EXTENDED_LINEAR_ADDRESS_RECORD, 0,
-                               split16(address_hi)))
-
-    size_written = 0
-    while size_written < INTELHEX_MINIMUM_SIZE:
-        offset = address_lo
-        for line_start in range(0, len(bytes_), INTELHEX_BYTES_PER_LINE):
-            write(intel_hex_line(INTELHEX_DATA_RECORD, offset,
-                                 bytes_[line_start:line_start + INTELHEX_BYTES_PER_LINE]))
-            size_written += INTELHEX_BYTES_PER_LINE
-            if size_written >= INTELHEX_MINIMUM_SIZE:
-                break
-            offset += INTELHEX_BYTES_PER_LINE
-
-    write(intel_hex_line(INTELHEX_END_OF_FILE_RECORD, 0, ()))
-
 
 def img2hex(input_filename,
             output_file,
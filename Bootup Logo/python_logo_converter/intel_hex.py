@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# coding=utf-8
+"""
+Intel hex output for the DFU bootloader, shared by img2ts100.py (boot
+logos) and the language packs of Translation Editor/languagePack.py.
+"""
+
+INTELHEX_DATA_RECORD                    = 0x00
+INTELHEX_END_OF_FILE_RECORD             = 0x01
+INTELHEX_EXTENDED_LINEAR_ADDRESS_RECORD = 0x04
+INTELHEX_BYTES_PER_LINE                 = 16
+INTELHEX_MINIMUM_SIZE                   = 4096
+
+
+def split16(word):
+    """return high and low byte of 16-bit word value as tuple"""
+    return (word >> 8) & 0xff, word & 0xff
+
+
+def intel_hex_line(record_type, offset, data):
+    """generate a line of data in Intel hex format"""
+    # length, address offset, record type
+    record_length = len(data)
+    yield ':{:02X}{:04X}{:02X}'.format(record_length, offset, record_type)
+
+    # data
+    for byte in data:
+        yield "{:02X}".format(byte)
+
+    # compute and write checksum (now using unix style line endings for DFU3.45 compatibility
+    yield "{:02X}\n".format((((sum(data,                   # sum data ...
+                                     record_length           # ... and other ...
+                                     + sum(split16(offset))  # ... fields ...
+                                     + record_type)          # ... on line
+                                 & 0xff)                     # low 8 bits
+                                ^ 0xff)                      # two's ...
+                               + 1)                          # ... complement
+                              & 0xff)                        # low 8 bits
+
+
+def intel_hex(file, bytes_, start_address=0x0):
+    """
+    write block of data in Intel hex format, repeated up to the minimum
+    size the DFU bootloader takes. Longer data is written once, it has to
+    stay within the 64 KB segment of start_address
+    """
+    def write(generator):
+        file.write(''.join(generator))
+
+    if len(bytes_) % INTELHEX_BYTES_PER_LINE != 0:
+        raise ValueError("Program error: Size of LCD data is not evenly divisible by {}"
+                         .format(INTELHEX_BYTES_PER_LINE))
+
+    address_lo =  start_address        & 0xffff
+    address_hi = (start_address >> 16) & 0xffff
+
+    write(intel_hex_line(INTELHEX_EXTENDED_LINEAR_ADDRESS_RECORD, 0,
+                               split16(address_hi)))
+
+    size = max(INTELHEX_MINIMUM_SIZE, len(bytes_))
+    size_written = 0
+    while size_written < size:
+        offset = address_lo
+        for line_start in range(0, len(bytes_), INTELHEX_BYTES_PER_LINE):
+            write(intel_hex_line(INTELHEX_DATA_RECORD, offset,
+                                 bytes_[line_start:line_start + INTELHEX_BYTES_PER_LINE]))
+            size_written += INTELHEX_BYTES_PER_LINE
+            if size_written >= size:
+                break
+            offset += INTELHEX_BYTES_PER_LINE
+
+    write(intel_hex_line(INTELHEX_END_OF_FILE_RECORD, 0, ()))
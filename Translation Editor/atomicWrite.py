@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+Files written whole or not at all.
+
+The generators run in parallel (make_translation.py --jobs, several
+buildFirmware.py or make runs, the threads of a TranslationCompiler) and
+share the caches and outputs. Every file is written to a temporary file
+named after the process and thread, then renamed over the old one, so a
+reader sees the old or the new content but never a partial file.
+"""
+import os
+import threading
+
+
+def writeAtomic(fileName, data):
+    # data (bytes) becomes the content of fileName in one rename
+    tempFile = "{}.{}.{}.tmp".format(fileName, os.getpid(), threading.get_ident())
+    try:
+        with open(tempFile, "wb") as f:
+            f.write(data)
+        os.replace(tempFile, fileName)
+    except BaseException:
+        if os.path.exists(tempFile):
+            os.remove(tempFile)
+        raise
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+Timing and peak memory benchmarks of the translation and logo tools and of
+glyphStore.py.
+
+    benchmark.py run [--corpus real,languages,symbols,startup] [--label TEXT]
+    benchmark.py compare [--threshold PERCENT] [OLD NEW]
+
+run times each benchmark (best of --repeat runs), measures its peak Python
+allocations with tracemalloc in one more run, and appends the results to
+the history file. compare lists two runs of the history side by side (the
+last two by default) and exits with 1 when a benchmark got slower or
+bigger by more than the threshold.
+
+Corpora:
+    real      : the translation_xx.json files of this directory
+    languages : 200 languages made from the real ones
+    symbols   : one language using a 1000 symbol alphabet, drawn from a
+                synthetic font store since fontTables.py has fewer glyphs
+    startup   : start of every ts100tool.py command in a new interpreter.
+                run fails when one takes more than STARTUP_BUDGET seconds
+                longer than the bare interpreter
+"""
+from __future__ import print_function
+import os
+import io
+import sys
+import json
+import time
+import shutil
+import subprocess
+import struct
+import random
+import argparse
+import tempfile
+import platform
+import tracemalloc
+import contextlib
+from datetime import datetime
+
+import fontStore
+import sizeReport
+import make_translation
+import translationStore
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# Next to the font store cache, wherever the benchmark is started from
+HISTORY_FILE = os.path.join(SCRIPT_DIR, make_translation.CACHE_DIR, "benchmarks.json")
+CORPORA = ["real", "languages", "symbols", "startup"]
+SYNTHETIC_LANGUAGES = 200
+SYNTHETIC_SYMBOLS = 1000
+LOGO_DIR = os.path.join(SCRIPT_DIR, "..", "Bootup Logo", "python_logo_converter")
+TOOL_FILE = os.path.join(SCRIPT_DIR, "..", "ts100tool.py")
+STARTUP_BUDGET = 0.1  # seconds a ts100tool.py command may add to the interpreter start
+
+
+def measure(function, repeat):
+    """Best and mean wall time of repeat calls, then the peak of one traced call"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "best": min(times),
+        "mean": sum(times) / len(times),
+        "peak": peak,
+    }
+
+
+def makeLanguageCorpus(jsonDir, outDir, count):
+    # count languages made by cycling through the real ones, codes L000..
+    sources = make_translation.getTranslationFiles(jsonDir)
+    for i in range(count):
+        lang = make_translation.loadJson(os.path.join(jsonDir, sources[i % len(sources)]), False)
+        code = "L%03d" % i
+        lang['languageCode'] = code
+        with io.open(os.path.join(outDir, "translation_" + code.lower() + ".json"), "w",
+                     encoding="utf-8") as f:
+            f.write(json.dumps(lang, ensure_ascii=False))
+    shutil.copy(os.path.join(jsonDir, "translations_def.js"), outDir)
+
+
+def makeSymbolStore(symbols):
+    # A font store holding the real glyphs plus the synthetic symbols
+    store = fontStore.getFontStore()
+    rng = random.Random(1)
+    out = [struct.pack("<4sHH32s", fontStore.STORE_MAGIC, fontStore.STORE_VERSION, 2, b"\0" * 32)]
+    for font, glyphBytes in enumerate(fontStore.GLYPH_BYTES):
+        glyphs = dict((sym, bytes(store.getGlyph(font, sym))) for sym in store.getSymbols(font))
+        for sym in symbols:
+            glyphs[sym] = bytes(bytearray(rng.randrange(256) for _ in range(glyphBytes)))
+        order = sorted(glyphs, key=ord)
+        out.append(struct.pack("<HI", glyphBytes, len(order)))
+        out.append(struct.pack("<%dI" % len(order), *[ord(sym) for sym in order]))
+        out.extend(glyphs[sym] for sym in order)
+    return fontStore.FontStore(b"".join(out))
+
+
+def makeSymbolLanguage(lang, symbols):
+    # Same structure as lang, every translated text rewritten in symbols
+    rng = random.Random(2)
+
+    def rewrite(value):
+        if isinstance(value, dict):
+            return dict((key, rewrite(item)) for key, item in value.items())
+        if isinstance(value, list):
+            return [rewrite(item) for item in value]
+        if isinstance(value, str) and len(value) > 1:
+            return "".join(rng.choice(symbols) if c not in " \n" else c for c in value)
+        return value
+
+    synthetic = dict(lang)
+    for key in ("messages", "characters", "menuGroups", "menuOptions"):
+        synthetic[key] = rewrite(lang[key])
+    # Make sure every symbol is used at least once
+    synthetic['menuOptions'] = dict(synthetic['menuOptions'])
+    firstId = sorted(synthetic['menuOptions'])[0]
+    entry = dict(synthetic['menuOptions'][firstId])
+    entry['desc'] = "".join(symbols)
+    synthetic['menuOptions'][firstId] = entry
+    synthetic['languageCode'] = "SYM"
+    return synthetic
+
+
+def getLanguageBenchmarks(corpus, jsonDir, defs, langDict, buildVersion):
+    # The generator steps, each over every language of the corpus
+    langCodes = make_translation.orderOutput(langDict)
+
+    def letterCounts():
+        return [make_translation.getLetterCounts(defs, langDict[code], buildVersion)
+                for code in langCodes]
+
+    counts = letterCounts()
+
+    def fontMaps():
+        return [make_translation.getFontMapAndTable(textList) for textList in counts]
+
+    symbolMaps = [symbolMap for _, symbolMap in fontMaps()]
+    texts = [make_translation.getTextList(defs, langDict[code], buildVersion)
+             for code in langCodes]
+
+    def convStrings():
+        for symbolMap, textList in zip(symbolMaps, texts):
+            for text in textList:
+                make_translation.convStr(symbolMap, text)
+
+    def writeLanguages():
+        for code in langCodes:
+            make_translation.writeLanguage(code, langDict[code], defs, io.StringIO(),
+                                           buildVersion)
+
+    benchmarks = [
+        ("getLetterCounts", letterCounts),
+        ("getFontMapAndTable", fontMaps),
+        ("convStr", convStrings),
+        ("writeLanguage", writeLanguages),
+    ]
+    if jsonDir is not None:
+        benchmarks.insert(0, ("readTranslations",
+                              lambda: make_translation.readTranslations(jsonDir)))
+    return [(corpus + "/" + name, function) for name, function in benchmarks]
+
+
+def getLogoBenchmarks():
+    # img2ts100.py needs PIL, the logo benchmarks are left out without it
+    sys.path.insert(0, LOGO_DIR)
+    try:
+        import img2ts100
+        from PIL import Image, ImageDraw
+    except ImportError as e:
+        print("Skipping the logo benchmarks: " + str(e), file=sys.stderr)
+        return [], None
+    tempDir = tempfile.mkdtemp()
+    imageFile = os.path.join(tempDir, "logo.png")
+    image = Image.new("L", (192, 32))
+    ImageDraw.Draw(image).ellipse((8, 2, 184, 30), fill=255)
+    image.save(imageFile)
+    data = bytes(bytearray(random.Random(3).randrange(256)
+                           for _ in range(img2ts100.LCD_PADDED_SIZE)))
+    benchmarks = [
+        ("logo/img2hex", lambda: img2ts100.img2hex(imageFile, io.StringIO())),
+        ("logo/intel_hex", lambda: img2ts100.intel_hex(io.StringIO(), data, 0x0800F800)),
+    ]
+    return benchmarks, tempDir
+
+
+def getGlyphBenchmarks():
+    # glyphStore.py needs NumPy, the glyph benchmarks are left out without it
+    try:
+        import glyphStore
+    except ImportError as e:
+        print("Skipping the glyph benchmarks: " + str(e), file=sys.stderr)
+        return []
+    store = glyphStore.getGlyphStore()
+    width, height = glyphStore.FONT_SIZES[fontStore.FONT_LARGE]
+    glyphs = store.glyphs[fontStore.FONT_LARGE]
+    return [
+        ("glyphs/getDuplicates", lambda: [store.getDuplicates(font) for font in (0, 1)]),
+        ("glyphs/getInkBounds", lambda: [store.getInkBounds(font) for font in (0, 1)]),
+        ("glyphs/unpackPages", lambda: glyphStore.packPages(
+            glyphStore.unpackPages(glyphs, width, height))),
+        ("glyphs/mirrorGlyphs", lambda: glyphStore.mirrorGlyphs(glyphs, width, height,
+                                                                True, True)),
+    ]
+
+
+def getStartupBenchmarks():
+    # Each command started the way CI starts it, with the arguments doing the least work
+    tempDir = tempfile.mkdtemp()
+    reportFile = os.path.join(tempDir, "sizes.json")
+    sizeReport.writeReport(reportFile, [sizeReport.makeRow("EN", "TS100", 2000, 2000, 500)])
+    commands = [
+        ("python", ["-c", "pass"]),
+        ("ts100tool", [TOOL_FILE]),
+        ("translate", [TOOL_FILE, "translate", "--help"]),
+        ("logo", [TOOL_FILE, "logo", "--help"]),
+        ("font", [TOOL_FILE, "font"]),
+        ("report", [TOOL_FILE, "report", reportFile]),
+    ]
+
+    def start(args):
+        return lambda: subprocess.run([sys.executable] + args, stdout=subprocess.DEVNULL,
+                                      stderr=subprocess.DEVNULL)
+
+    return [("startup/" + name, start(args)) for name, args in commands], tempDir
+
+
+def checkStartup(results):
+    """Startup benchmarks slower than the bare interpreter by more than STARTUP_BUDGET"""
+    python = results.get("startup/python")
+    if python is None:
+        return []
+    return [name for name in sorted(results) if name.startswith("startup/") and
+            results[name]["best"] - python["best"] > STARTUP_BUDGET]
+
+
+def runBenchmarks(jsonDir, corpora, repeat):
+    # The tools print their progress, only the results are shown
+    out = sys.stdout
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        return runCorpora(jsonDir, corpora, repeat, out)
+
+
+def runCorpora(jsonDir, corpora, repeat, out):
+    results = {}
+    defs, _ = translationStore.loadDefs(jsonDir)
+    buildVersion = make_translation.readVersion(jsonDir)
+
+    def run(benchmarks):
+        for name, function in benchmarks:
+            results[name] = measure(function, repeat)
+            print("{:<36} {:>9.2f} ms {:>9.2f} ms {:>10} B".format(
+                name, 1000 * results[name]["best"], 1000 * results[name]["mean"],
+                results[name]["peak"]), file=out)
+            out.flush()
+
+    print("{:<36} {:>12} {:>12} {:>12}".format("Benchmark", "best", "mean", "peak"), file=out)
+    if "real" in corpora:
+        langDict, _ = make_translation.readTranslations(jsonDir)
+        run(getLanguageBenchmarks("real", jsonDir, defs, langDict, buildVersion))
+        logoBenchmarks, tempDir = getLogoBenchmarks()
+        try:
+            run(logoBenchmarks)
+        finally:
+            if tempDir:
+                shutil.rmtree(tempDir)
+        run(getGlyphBenchmarks())
+
+    if "languages" in corpora:
+        tempDir = tempfile.mkdtemp()
+        try:
+            makeLanguageCorpus(jsonDir, tempDir, SYNTHETIC_LANGUAGES)
+            langDict, _ = make_translation.readTranslations(tempDir)
+            run(getLanguageBenchmarks("languages", tempDir, defs, langDict, buildVersion))
+        finally:
+            shutil.rmtree(tempDir)
+
+    if "symbols" in corpora:
+        # CJK ideographs, none of them has a real glyph
+        symbols = [chr(0x4E00 + i) for i in range(SYNTHETIC_SYMBOLS)]
+        realStores = fontStore._stores
+        fontStore._stores = {fontStore.getCacheDir(): makeSymbolStore(symbols)}
+        try:
+            langDict, _ = make_translation.readTranslations(jsonDir, ["EN"])
+            langDict = {"SYM": makeSymbolLanguage(langDict["EN"], symbols)}
+            run(getLanguageBenchmarks("symbols", None, defs, langDict, buildVersion))
+        finally:
+            fontStore._stores = realStores
+
+    if "startup" in corpora:
+        startupBenchmarks, tempDir = getStartupBenchmarks()
+        try:
+            run(startupBenchmarks)
+        finally:
+            shutil.rmtree(tempDir)
+    return results
+
+
+def loadHistory(historyFile):
+    try:
+        with io.open(historyFile, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except IOError:
+        return {"runs": []}
+
+
+def saveHistory(historyFile, history):
+    historyDir = os.path.dirname(historyFile)
+    if historyDir and not os.path.isdir(historyDir):
+        os.makedirs(historyDir)
+    with io.open(historyFile, "w", encoding="utf-8", newline="\n") as f:
+        f.write(json.dumps(history, indent=2, sort_keys=True))
+        f.write("\n")
+
+
+def compareRuns(old, new, threshold):
+    """Print both runs side by side, returns the benchmarks that regressed"""
+    regressions = []
+    print("{:<36} {:>10} {:>10} {:>8} {:>8}".format("Benchmark", "old ms", "new ms", "time", "peak"))
+    for name in sorted(set(old["results"]) & set(new["results"])):
+        a = old["results"][name]
+        b = new["results"][name]
+        timeChange = 100.0 * (b["best"] - a["best"]) / a["best"] if a["best"] else 0.0
+        peakChange = 100.0 * (b["peak"] - a["peak"]) / a["peak"] if a["peak"] else 0.0
+        flag = ""
+        if timeChange > threshold or peakChange > threshold:
+            regressions.append(name)
+            flag = " <-"
+        print("{:<36} {:>10.2f} {:>10.2f} {:>+7.1f}% {:>+7.1f}%{}".format(
+            name, 1000 * a["best"], 1000 * b["best"], timeChange, peakChange, flag))
+    return regressions
+
+
+def parse_commandline():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the translation and logo tools")
+    parser.add_argument("--history", default=HISTORY_FILE,
+                        help="JSON file holding the benchmark runs "
+                             "(default: " + HISTORY_FILE + ")")
+    commands = parser.add_subparsers(dest="command")
+    run = commands.add_parser("run", help="run the benchmarks and add them to the history")
+    run.add_argument("jsonDir", nargs="?", default=os.path.relpath(SCRIPT_DIR),
+                     help="directory holding the translation_xx.json files "
+                          "(default: the directory of this script)")
+    run.add_argument("-c", "--corpus", default="real",
+                     help="comma separated corpora: " + ", ".join(CORPORA) + " or all "
+                          "(default: real)")
+    run.add_argument("-r", "--repeat", type=int, default=3,
+                     help="timed runs per benchmark (default: 3)")
+    run.add_argument("--label", default="",
+                     help="note stored with the run, E.g. the change being measured")
+    compare = commands.add_parser("compare", help="compare two runs of the history")
+    compare.add_argument("runs", nargs="*", type=int,
+                         help="indexes of the old and new run (default: -2 -1)")
+    compare.add_argument("-t", "--threshold", type=float, default=10.0,
+                         help="percent of slowdown or growth counted as a "
+                              "regression (default: 10)")
+    args = parser.parse_args()
+    if args.command is None:
+        parser.error("choose a command: run or compare")
+    if args.command == "run":
+        corpora = CORPORA if args.corpus == "all" else [
+            x.strip() for x in args.corpus.split(",") if x.strip()]
+        for corpus in corpora:
+            if corpus not in CORPORA:
+                parser.error("unknown corpus " + corpus)
+        args.corpus = corpora
+        if args.repeat < 1:
+            parser.error("--repeat must be 1 or more")
+    elif args.runs and len(args.runs) != 2:
+        parser.error("compare takes no run or two runs")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_commandline()
+    history = loadHistory(args.history)
+
+    if args.command == "run":
+        results = runBenchmarks(args.jsonDir, args.corpus, args.repeat)
+        history["runs"].append({
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "label": args.label,
+            "python": platform.python_version(),
+            "results": results,
+        })
+        saveHistory(args.history, history)
+        print("Added run {} to {}".format(len(history["runs"]) - 1, args.history))
+        slow = checkStartup(results)
+        if slow:
+            print("error: {} start(s) over the budget of {:.0f} ms: {}".format(
+                len(slow), 1000 * STARTUP_BUDGET, ", ".join(slow)))
+            sys.exit(1)
+    else:
+        old, new = args.runs or [-2, -1]
+        try:
+            oldRun = history["runs"][old]
+            newRun = history["runs"][new]
+        except IndexError:
+            print("error: {} holds {} run(s)".format(args.history, len(history["runs"])))
+            sys.exit(1)
+        print("old: {} {}".format(oldRun["date"], oldRun["label"]))
+        print("new: {} {}".format(newRun["date"], newRun["label"]))
+        regressions = compareRuns(oldRun, newRun, args.threshold)
+        if regressions:
+            print("error: {} benchmark(s) regressed by more than {}%".format(
+                len(regressions), args.threshold))
+            sys.exit(1)
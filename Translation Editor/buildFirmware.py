@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+Builds the firmware for every model and language, in parallel.
+
+Only the translation unit differs between the languages of a model, apart
+from the few settings unit.h defines per language (Fahrenheit support,
+compressed strings, code pages). The languages of a model are grouped by
+those settings and every group gets its own object directory. The first
+variant of a group compiles all the objects, every other variant of the
+group only compiles its Translation_XX.cpp and links, and those builds run
+side by side on all cores.
+
+The sources are generated with make_translation.py --split first, then
+`make` is run with OUTPUT_DIR pointing at the object directory of the group,
+so the Makefile stays the one place the compiler flags are set.
+
+With --packs only the lang=PACK firmware is built per model, and every
+language becomes a language pack flashed next to it (see languagePack.py).
+"""
+from __future__ import print_function
+import os
+import re
+import sys
+import time
+import shutil
+import argparse
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import make_translation
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+FIRMWARE_DIR = os.path.join(SCRIPT_DIR, "..", "workspace", "TS100")
+OBJECTS_DIR = "Objects"
+HEXFILE_DIR = "Hexfile"
+
+
+def getUnitSettings(unitFile):
+    # language code -> the #defines unit.h gives the language, in order
+    settings = {}
+    langCode = None
+    with open(unitFile, "r") as f:
+        for line in f:
+            line = line.strip()
+            match = re.match(r"#ifdef LANG_(\w+)$", line)
+            if match:
+                langCode = match.group(1)
+                settings[langCode] = ()
+            elif line.startswith("#endif"):
+                langCode = None
+            elif langCode and line.startswith("#define"):
+                settings[langCode] += (" ".join(line.split()),)
+    return settings
+
+
+def getBuildGroups(models, langCodes, settings):
+    """
+    The variants to build as [(object directory, [(model, language), ...])],
+    languages sharing their unit.h settings share the object directory
+    """
+    groups = []
+    for model in models:
+        bySettings = {}
+        for langCode in langCodes:
+            bySettings.setdefault(settings.get(langCode, ()), []).append(langCode)
+        for i, groupCodes in enumerate(bySettings.values()):
+            groups.append((os.path.join(OBJECTS_DIR, "{}_{}".format(model, i)),
+                           [(model, langCode) for langCode in groupCodes]))
+    return groups
+
+
+def buildVariant(firmwareDir, objectDir, model, langCode, makeArgs, jobs=1):
+    # Returns the seconds the build took, the make output is only shown on failure
+    command = (["make", "-j" + str(jobs), "lang=" + langCode, "model=" + model,
+                "OUTPUT_DIR=" + objectDir] + makeArgs)
+    start = time.perf_counter()
+    process = subprocess.run(command, cwd=firmwareDir, stdout=subprocess.PIPE,
+                             stderr=subprocess.STDOUT, universal_newlines=True)
+    seconds = time.perf_counter() - start
+    if process.returncode != 0:
+        raise RuntimeError("{} {} failed:\n{}".format(model, langCode, process.stdout))
+    return seconds
+
+
+def buildAll(firmwareDir, groups, makeArgs, jobs):
+    """
+    Build every variant of groups, returns {(model, language): (seconds,
+    compiled everything)}. Raises RuntimeError with the make output of the
+    first variant that failed
+    """
+    timings = {}
+    # The first variant of a group builds its common objects, make already
+    # spreads those over the cores
+    for objectDir, variants in groups:
+        model, langCode = variants[0]
+        print("Building {} {} with the common objects".format(model, langCode))
+        sys.stdout.flush()
+        timings[variants[0]] = (buildVariant(firmwareDir, objectDir, model, langCode,
+                                             makeArgs, jobs), True)
+
+    # Everything else only compiles a translation and links, one per core
+    rest = [(objectDir, variant) for objectDir, variants in groups for variant in variants[1:]]
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [(variant, pool.submit(buildVariant, firmwareDir, objectDir,
+                                         variant[0], variant[1], makeArgs))
+                   for objectDir, variant in rest]
+        for variant, future in futures:
+            timings[variant] = (future.result(), False)
+            print("Built {} {} in {:.1f} s".format(variant[0], variant[1], timings[variant][0]))
+            sys.stdout.flush()
+    return timings
+
+
+def printTimings(timings, wall):
+    print("Model  Language   Seconds")
+    for (model, langCode), (seconds, common) in sorted(timings.items()):
+        print("{:<6} {:<8} {:>9.1f}{}".format(model, langCode, seconds,
+                                              "  (common objects)" if common else ""))
+    total = sum(seconds for seconds, _ in timings.values())
+    print("{} firmware(s) in {:.1f} s, {:.1f} s of builds".format(len(timings), wall, total))
+
+
+def parse_commandline():
+    parser = argparse.ArgumentParser(
+        description="Build the firmware of every model and language in parallel")
+    parser.add_argument("jsonDir", nargs="?", default=SCRIPT_DIR,
+                        help="directory holding the translation_xx.json files")
+    parser.add_argument("-l", "--languages", action="append", default=[],
+                        help="language code(s) to build, comma separated "
+                             "or repeated (default: all languages)")
+    parser.add_argument("-m", "--models", action="append", default=[],
+                        help="model(s) to build, comma separated or repeated "
+                             "(default: " + ",".join(make_translation.MODELS) + ")")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="builds running at once, 0 uses every core (default: 0)")
+    parser.add_argument("--firmware-dir", default=FIRMWARE_DIR,
+                        help="directory of the firmware Makefile")
+    parser.add_argument("--packs", metavar="DIR",
+                        help="build one lang=" + make_translation.PACK_LANGUAGE + " firmware "
+                             "per model and write the language packs to this directory")
+    parser.add_argument("--reproducible", action="store_true",
+                        help="keep the build version and date out of the translation "
+                             "units (make_translation.py --reproducible)")
+    parser.add_argument("--clean", action="store_true",
+                        help="remove the objects and firmware of earlier builds first")
+    parser.add_argument("--make-arg", action="append", default=[],
+                        help="extra make argument, e.g. COMPILER_PREFIX=arm-atollic")
+    args = parser.parse_args()
+
+    args.languages = [code.strip().upper() for arg in args.languages
+                      for code in arg.split(",") if code.strip()]
+    args.models = [model.strip().upper() for arg in args.models
+                   for model in arg.split(",") if model.strip()] or make_translation.MODELS
+    for model in args.models:
+        if model not in make_translation.MODELS:
+            parser.error("unknown model " + model)
+    if args.jobs < 0:
+        parser.error("--jobs must be 0 or more")
+    args.jobs = args.jobs or os.cpu_count() or 1
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_commandline()
+    start = time.perf_counter()
+    firmwareDir = os.path.abspath(args.firmware_dir)
+
+    # Same generation as build.sh, through the stamp cache and the depfile
+    command = [sys.executable, os.path.join(SCRIPT_DIR, "make_translation.py"), args.jsonDir,
+               os.path.join(firmwareDir, "Core", "Src", make_translation.TRANSLATION_CPP),
+               os.path.join(firmwareDir, "Core", "Inc", make_translation.UNIT_H),
+               "--split", "--jobs", "0",
+               "--depfile", os.path.join(firmwareDir, "Core", "Src", "Translation.d")]
+    if args.languages:
+        command += ["-l", ",".join(args.languages)]
+    if args.packs:
+        command += ["--packs", args.packs]
+    if args.reproducible:
+        command += ["--reproducible"]
+    if subprocess.call(command) != 0:
+        sys.exit(1)
+    if args.packs:
+        langCodes = [make_translation.PACK_LANGUAGE]
+    else:
+        langCodes = args.languages or make_translation.orderOutput(dict.fromkeys(
+            fileName[12:-5].upper()
+            for fileName in make_translation.getTranslationFiles(args.jsonDir)))
+
+    if args.clean:
+        shutil.rmtree(os.path.join(firmwareDir, OBJECTS_DIR), ignore_errors=True)
+        shutil.rmtree(os.path.join(firmwareDir, HEXFILE_DIR), ignore_errors=True)
+
+    settings = getUnitSettings(os.path.join(firmwareDir, "Core", "Inc", make_translation.UNIT_H))
+    groups = getBuildGroups(args.models, langCodes, settings)
+    try:
+        timings = buildAll(firmwareDir, groups, args.make_arg, args.jobs)
+    except RuntimeError as e:
+        print("error: " + str(e))
+        sys.exit(1)
+    printTimings(timings, time.perf_counter() - start)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+Compiled font store for the glyphs defined in fontTables.py.
+
+fontTables.py keeps every glyph as a string of C hex literals. The store
+holds the same glyphs as raw bytes in a compact binary file, next to a
+sorted codepoint index per font, so the generator can mmap it instead of
+compiling and executing the font dictionaries on every run.
+
+File layout (little endian):
+    header  : magic "TSFS", format version (u16), font count (u16),
+              sha256 of fontTables.py (32 bytes)
+    per font: glyph size in bytes (u16), glyph count (u32),
+              codepoints (u32 * count, sorted), glyph bytes (size * count)
+
+The file is rebuilt whenever the hash of fontTables.py no longer matches.
+"""
+from __future__ import print_function
+import os
+import sys
+import mmap
+import struct
+import hashlib
+import argparse
+import threading
+from array import array
+
+from atomicWrite import writeAtomic
+
+FONT_LARGE = 0  # 12x16, USER_FONT_12
+FONT_SMALL = 1  # 6x8, USER_FONT_6x8
+GLYPH_BYTES = (24, 6)
+
+STORE_MAGIC = b"TSFS"
+STORE_VERSION = 1
+STORE_FILE = "fontTables.bin"
+CACHE_DIR = ".cache"
+
+_HEADER = struct.Struct("<4sHH32s")
+_FONT_HEADER = struct.Struct("<HI")
+
+_stores = {}  # cache directory -> FontStore
+_storeLock = threading.Lock()
+
+
+def getFontTablesFile():
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "fontTables.py")
+
+
+def getCacheDir(cacheDir=None):
+    if cacheDir is None:
+        return os.path.join(os.path.dirname(os.path.abspath(__file__)), CACHE_DIR)
+    return os.path.abspath(cacheDir)
+
+
+def getSourceHash(fontTablesFile=None):
+    with open(fontTablesFile or getFontTablesFile(), "rb") as f:
+        return hashlib.sha256(f.read()).digest()
+
+
+def parseGlyph(text, glyphBytes, sym):
+    # "0x00,0x7C, ..." -> bytes
+    values = [int(x, 16) for x in text.split(",") if x.strip()]
+    if len(values) != glyphBytes:
+        raise ValueError("Glyph for {!r} has {} bytes, expected {}".format(
+            sym, len(values), glyphBytes))
+    return bytes(bytearray(values))
+
+
+def buildFontStore(sourceHash=None):
+    """Parse fontTables.py into the binary store layout, returns the bytes"""
+    import fontTables
+
+    fontMaps = (fontTables.getFontMap(), fontTables.getSmallFontMap())
+    out = [_HEADER.pack(STORE_MAGIC, STORE_VERSION, len(fontMaps),
+                        sourceHash or getSourceHash())]
+    for glyphBytes, fontMap in zip(GLYPH_BYTES, fontMaps):
+        symbols = sorted(fontMap, key=ord)
+        out.append(_FONT_HEADER.pack(glyphBytes, len(symbols)))
+        out.append(struct.pack("<%dI" % len(symbols), *[ord(sym) for sym in symbols]))
+        out.extend(parseGlyph(fontMap[sym], glyphBytes, sym) for sym in symbols)
+    return b"".join(out)
+
+
+class FontStore(object):
+    """
+    Read only view over a compiled font store buffer (usually an mmap).
+    Glyphs are returned as memoryview slices of the buffer, no copy is made.
+    """
+
+    def __init__(self, data):
+        self.data = memoryview(data)
+        magic, version, fontCount, self.sourceHash = _HEADER.unpack_from(data, 0)
+        if magic != STORE_MAGIC or version != STORE_VERSION:
+            raise ValueError("Not a font store (or an older format)")
+        self.glyphBytes = []
+        self.codepoints = []
+        self.indexes = []
+        self.offsets = []
+        self.glyphText = {}
+        offset = _HEADER.size
+        for _ in range(fontCount):
+            glyphBytes, count = _FONT_HEADER.unpack_from(data, offset)
+            offset += _FONT_HEADER.size
+            codepoints = array("I")
+            codepoints.frombytes(bytes(self.data[offset:offset + 4 * count]))
+            if sys.byteorder != "little":
+                codepoints.byteswap()
+            offset += 4 * count
+            self.glyphBytes.append(glyphBytes)
+            self.codepoints.append(codepoints)
+            self.indexes.append(dict((cp, row) for row, cp in enumerate(codepoints)))
+            self.offsets.append(offset)
+            offset += glyphBytes * count
+
+    def hasGlyph(self, font, sym):
+        return ord(sym) in self.indexes[font]
+
+    def getSymbols(self, font):
+        return [chr(cp) for cp in self.codepoints[font]]
+
+    def getGlyph(self, font, sym):
+        size = self.glyphBytes[font]
+        start = self.offsets[font] + size * self.indexes[font][ord(sym)]
+        return self.data[start:start + size]
+
+    def getGlyphText(self, font, sym):
+        # C literals of a glyph, formatted once per process
+        key = (font, sym)
+        text = self.glyphText.get(key)
+        if text is None:
+            text = self.glyphText[key] = formatGlyph(self.getGlyph(font, sym))
+        return text
+
+    def getGlyphs(self, font):
+        # All glyph bytes of a font in codepoint order, one block
+        size = self.glyphBytes[font]
+        start = self.offsets[font]
+        return self.data[start:start + size * len(self.codepoints[font])]
+
+
+def formatGlyph(glyph):
+    # Same layout as the fontTables.py strings, one C literal per byte
+    return "".join("0x%0.2X," % b for b in bytearray(glyph))
+
+
+def loadFontStore(cacheDir=None):
+    """
+    Return the FontStore for fontTables.py, (re)building the cached binary
+    file first when it is missing or was built from another fontTables.py
+    """
+    cacheDir = getCacheDir(cacheDir)
+    storeFile = os.path.join(cacheDir, STORE_FILE)
+    sourceHash = getSourceHash()
+
+    try:
+        with open(storeFile, "rb") as f:
+            header = f.read(_HEADER.size)
+        valid = (len(header) == _HEADER.size and
+                 _HEADER.unpack(header) == (STORE_MAGIC, STORE_VERSION, 2, sourceHash))
+    except IOError:
+        valid = False
+
+    if not valid:
+        data = buildFontStore(sourceHash)
+        if not os.path.isdir(cacheDir):
+            os.makedirs(cacheDir)
+        writeAtomic(storeFile, data)
+
+    with open(storeFile, "rb") as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return FontStore(data)
+
+
+def getFontStore(cacheDir=None):
+    """
+    The store kept in cacheDir, loaded once per process and directory by
+    whichever thread needs it first. Without cacheDir the first store loaded
+    is returned, they all hold the same glyphs, or the one of the default
+    directory (see loadFontStore)
+    """
+    with _storeLock:
+        if cacheDir is None and _stores:
+            return next(iter(_stores.values()))
+        cacheDir = getCacheDir(cacheDir)
+        if cacheDir not in _stores:
+            _stores[cacheDir] = loadFontStore(cacheDir)
+        return _stores[cacheDir]
+
+
+def parse_commandline():
+    parser = argparse.ArgumentParser(
+        description="Build the compiled store of fontTables.py and list its fonts")
+    parser.add_argument("text", nargs="?",
+                        help="also list the symbols of this text that have no glyph")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_commandline()
+    store = getFontStore()
+    for font, name in ((FONT_LARGE, "USER_FONT_12"), (FONT_SMALL, "USER_FONT_6x8")):
+        print("{}: {} glyphs of {} bytes".format(
+            name, len(store.codepoints[font]), store.glyphBytes[font]))
+        if args.text is not None:
+            missing = sorted(set(sym for sym in args.text if not store.hasGlyph(font, sym)))
+            print("  missing: " + (" ".join(missing) or "none"))
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+Trimmed column storage of the large font glyphs.
+
+A USER_FONT_12 glyph is 12 columns of two bytes, the top 8 pixel page
+first, then the bottom one. Most glyphs leave columns empty on either
+side, so make_translation.py --compress-glyphs stores each glyph as
+
+    header : first used column (high nibble), used column count (low nibble)
+    data   : the used columns of the top page, then of the bottom page
+
+with a u16 offset per glyph into the table, USER_FONT_12_OFFSETS. A blank
+glyph is the header alone. OLED::drawTrimmedGlyph() expands a glyph the way
+expandGlyph() below does. The 6x8 glyphs stay as they are, one byte
+columns leave too little to trim to pay for the offsets.
+"""
+from __future__ import print_function
+
+GLYPH_WIDTH = 12
+GLYPH_PAGES = 2
+OFFSET_BYTES = 2
+
+
+def trimGlyph(glyph):
+    """Trimmed bytes of a GLYPH_WIDTH x GLYPH_PAGES glyph"""
+    glyph = bytearray(glyph)
+    used = [column for column in range(GLYPH_WIDTH)
+            if any(glyph[page * GLYPH_WIDTH + column] for page in range(GLYPH_PAGES))]
+    if not used:
+        return b"\0"
+    first, count = used[0], used[-1] - used[0] + 1
+    out = bytearray([(first << 4) | count])
+    for page in range(GLYPH_PAGES):
+        out += glyph[page * GLYPH_WIDTH + first:page * GLYPH_WIDTH + first + count]
+    return bytes(out)
+
+
+def expandGlyph(data, offset):
+    """
+    Reference decompressor, the same steps as OLED::drawTrimmedGlyph().
+    Returns the full glyph stored at offset of data
+    """
+    data = bytearray(data)
+    first, count = data[offset] >> 4, data[offset] & 0x0F
+    glyph = bytearray(GLYPH_WIDTH * GLYPH_PAGES)
+    for page in range(GLYPH_PAGES):
+        for column in range(count):
+            glyph[page * GLYPH_WIDTH + first + column] = data[offset + 1 + page * count + column]
+    return bytes(glyph)
+
+
+def trimGlyphs(glyphs):
+    """
+    Trim every glyph of glyphs and check that each expands back to the
+    same bytes. Returns (data, offsets), raises ValueError on a mismatch
+    """
+    data = bytearray()
+    offsets = []
+    for glyph in glyphs:
+        offsets.append(len(data))
+        data += trimGlyph(glyph)
+    for i, (glyph, offset) in enumerate(zip(glyphs, offsets)):
+        if expandGlyph(data, offset) != bytes(glyph):
+            raise ValueError("Glyph {} does not survive trimming".format(i))
+    if len(data) > 0xFFFF:
+        raise ValueError("Trimmed font of {} bytes does not fit u16 offsets".format(len(data)))
+    return bytes(data), offsets
+
+
+def getTrimmedSize(glyphs):
+    # Flash of the trimmed glyphs and their offsets
+    return sum(len(trimGlyph(glyph)) for glyph in glyphs) + OFFSET_BYTES * len(glyphs)
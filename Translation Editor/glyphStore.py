@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+The fonts of fontStore as NumPy arrays, for working on every glyph at once.
+
+A font is one (glyphs, glyph bytes) uint8 array in codepoint order, read
+straight from the fontStore buffer, with the codepoints next to it. A glyph
+keeps the layout OLED::drawArea reads: one 8 pixel page after the other,
+each page a byte per column with the least significant bit on top. So the
+12x16 glyphs are two pages of 12 columns and the 6x8 glyphs one page of 6.
+
+unpackPages() and packPages() convert between that layout and (height,
+width) pixel arrays, toStrips() lays glyphs side by side the way drawArea
+puts them on the screen. GlyphStore finds empty and duplicate glyphs,
+measures the ink of every glyph and writes C tables in the format of the
+generator.
+
+Run as a script it prints these figures for both fonts.
+"""
+from __future__ import print_function
+import sys
+import time
+import argparse
+
+try:
+    import numpy as np
+except ImportError as error:
+    raise ImportError("{}: {} requires NumPy. "
+                      "Install with `pip` or OS-specific package "
+                      "management tool."
+                      .format(error, sys.argv[0]))
+
+import fontStore
+
+# (width, height) of the glyphs of each font, indexed like fontStore
+FONT_SIZES = ((12, 16), (6, 8))
+FONT_NAMES = ("USER_FONT_12", "USER_FONT_6x8")
+
+# Every byte with its bits in reverse order, turns a page upside down
+REVERSED_BITS = np.packbits(np.unpackbits(np.arange(256, dtype=np.uint8)[:, None],
+                                          axis=1)[:, ::-1], axis=1).ravel()
+# C literal of every byte value, as fontStore.formatGlyph writes them
+BYTE_LITERALS = np.array(["0x%0.2X," % value for value in range(256)])
+
+_store = None
+
+
+def unpackPages(glyphs, width, height):
+    """(glyphs, height, width) bool pixels of (glyphs, glyph bytes) glyphs"""
+    glyphs = np.asarray(glyphs, np.uint8).reshape(-1, height // 8, width)
+    bits = np.unpackbits(glyphs[..., None], axis=3, bitorder="little")
+    # (glyphs, pages, columns, bits) -> (glyphs, pages, bits, columns)
+    return bits.transpose(0, 1, 3, 2).reshape(-1, height, width).astype(bool)
+
+
+def packPages(pixels):
+    """(glyphs, glyph bytes) glyphs of (glyphs, height, width) pixels"""
+    pixels = np.asarray(pixels, bool)
+    count, height, width = pixels.shape
+    bits = pixels.reshape(count, height // 8, 8, width).transpose(0, 1, 3, 2)
+    return np.packbits(bits, axis=3, bitorder="little").reshape(count, -1)
+
+
+def toStrips(glyphs, width, height):
+    """
+    (pages, glyphs * width) columns of glyphs drawn side by side, what
+    OLED::drawArea writes to the strips of the screen
+    """
+    glyphs = np.asarray(glyphs, np.uint8).reshape(-1, height // 8, width)
+    return glyphs.transpose(1, 0, 2).reshape(height // 8, -1)
+
+
+def fromStrips(strips, width):
+    """The glyphs of width columns that toStrips() laid out"""
+    strips = np.asarray(strips, np.uint8)
+    pages = strips.shape[0]
+    return strips.reshape(pages, -1, width).transpose(1, 0, 2).reshape(-1, pages * width)
+
+
+def mirrorGlyphs(glyphs, width, height, horizontal=True, vertical=False):
+    """glyphs flipped left to right and/or upside down, still page packed"""
+    glyphs = np.asarray(glyphs, np.uint8).reshape(-1, height // 8, width)
+    if horizontal:
+        glyphs = glyphs[:, :, ::-1]
+    if vertical:
+        glyphs = REVERSED_BITS[glyphs[:, ::-1, :]]
+    return np.ascontiguousarray(glyphs).reshape(-1, (height // 8) * width)
+
+
+class GlyphStore(object):
+    """
+    Both fonts as arrays: codepoints[font] (glyphs,) uint32, sorted, and
+    glyphs[font] (glyphs, glyph bytes) uint8, row n being the glyph of
+    codepoints[font][n]. Arrays made from a FontStore are read only views
+    of its buffer
+    """
+
+    def __init__(self, codepoints, glyphs):
+        self.codepoints = [np.asarray(cps, np.uint32) for cps in codepoints]
+        self.glyphs = [np.asarray(font, np.uint8) for font in glyphs]
+        self.indexes = [dict((int(cp), row) for row, cp in enumerate(cps))
+                        for cps in self.codepoints]
+
+    @classmethod
+    def fromFontStore(cls, store=None):
+        store = store or fontStore.getFontStore()
+        codepoints = [np.frombuffer(cps, np.uint32) for cps in store.codepoints]
+        glyphs = [np.frombuffer(store.getGlyphs(font), np.uint8).reshape(-1, glyphBytes)
+                  for font, glyphBytes in enumerate(store.glyphBytes)]
+        return cls(codepoints, glyphs)
+
+    def hasGlyph(self, font, sym):
+        return ord(sym) in self.indexes[font]
+
+    def getSymbols(self, font):
+        return [chr(cp) for cp in self.codepoints[font]]
+
+    def getRows(self, font, symbols):
+        # Rows of the glyphs of symbols, raises KeyError for a missing glyph
+        index = self.indexes[font]
+        return np.array([index[ord(sym)] for sym in symbols], np.intp)
+
+    def getGlyphs(self, font, symbols):
+        """(len(symbols), glyph bytes) glyphs of symbols, in their order"""
+        return self.glyphs[font][self.getRows(font, symbols)]
+
+    def getPixels(self, font):
+        width, height = FONT_SIZES[font]
+        return unpackPages(self.glyphs[font], width, height)
+
+    def getEmpty(self, font):
+        # True for the glyphs drawing nothing (the spaces)
+        return ~self.glyphs[font].any(axis=1)
+
+    def getDuplicates(self, font):
+        """
+        For every row the first row holding the same bytes, a row is a
+        duplicate when that is not itself
+        """
+        # Each glyph as one opaque value, much faster to sort than rows
+        glyphs = np.ascontiguousarray(self.glyphs[font])
+        keys = glyphs.view(np.dtype((np.void, glyphs.shape[1]))).ravel()
+        _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        return first[inverse.ravel()]
+
+    def getInkBounds(self, font):
+        """
+        (glyphs, 4) int array of the left, top, right and bottom ink edges,
+        right and bottom exclusive. All zero for an empty glyph
+        """
+        # Straight from the bytes: a column has ink when one of its page
+        # bytes is set, a line when its bit is set in one of the columns
+        width, height = FONT_SIZES[font]
+        pages = self.glyphs[font].reshape(-1, height // 8, width)
+        columns = pages.any(axis=1)
+        lines = np.unpackbits(np.bitwise_or.reduce(pages, axis=2)[..., None],
+                              axis=2, bitorder="little").reshape(len(pages), height).astype(bool)
+        bounds = np.zeros((len(pages), 4), int)
+        for axis, used in ((0, columns), (1, lines)):
+            inked = used.any(axis=1)
+            size = used.shape[1]
+            bounds[:, axis] = np.where(inked, used.argmax(axis=1), 0)
+            bounds[:, axis + 2] = np.where(inked, size - used[:, ::-1].argmax(axis=1), 0)
+        return bounds
+
+    def getInkWidths(self, font):
+        # Columns from the first to the last one with ink, 0 for empty glyphs
+        bounds = self.getInkBounds(font)
+        return bounds[:, 2] - bounds[:, 0]
+
+    def formatTable(self, font, name, symbols, symbolMap):
+        """
+        C table of the glyphs of symbols in the layout of the generator,
+        one glyph per line followed by its code in symbolMap (symbol -> encoded
+        text, as make_translation builds it) and the symbol
+        """
+        literals = BYTE_LITERALS[self.getGlyphs(font, symbols)]
+        lines = ["".join(row) + "//" + symbolMap[sym] + " -> " + sym
+                 for row, sym in zip(literals, symbols)]
+        return "const uint8_t " + name + "[] = {\n" + "".join(
+            line + "\n" for line in lines) + "};\n"
+
+
+def getGlyphStore():
+    # One store per process, over the buffer of fontStore.getFontStore()
+    global _store
+    if _store is None:
+        _store = GlyphStore.fromFontStore()
+    return _store
+
+
+def printFontStats(store, font):
+    start = time.perf_counter()
+    empty = store.getEmpty(font)
+    duplicates = store.getDuplicates(font)
+    widths = store.getInkWidths(font)
+    seconds = time.perf_counter() - start
+    symbols = store.getSymbols(font)
+    width, height = FONT_SIZES[font]
+    print("{}: {} glyphs of {}x{}".format(FONT_NAMES[font], len(symbols), width, height))
+    print("  empty: " + " ".join("U+%04X" % ord(sym) for sym, e in zip(symbols, empty) if e))
+    shared = [(symbols[first], sym) for row, (first, sym) in
+              enumerate(zip(duplicates, symbols)) if first != row]
+    print("  {} glyph(s) drawn like another: {}".format(
+        len(shared), " ".join("{}={}".format(sym, other) for other, sym in shared)))
+    inked = widths[~empty]
+    print("  ink width {} to {} columns, {:.1f} on average".format(
+        inked.min(), inked.max(), inked.mean()))
+    print("  measured in {:.0f} us".format(1e6 * seconds))
+
+
+def parse_commandline():
+    parser = argparse.ArgumentParser(
+        description="Show the empty and duplicate glyphs and the ink widths of the fonts")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    parse_commandline()
+    store = getGlyphStore()
+    for font in (fontStore.FONT_LARGE, fontStore.FONT_SMALL):
+        printFontStats(store, font)
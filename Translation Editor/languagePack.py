@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+Language packs: the font tables and strings of one language, flashed on
+their own at a fixed address next to a firmware built with lang=PACK.
+
+The firmware keeps a table with the address of every string variable
+(LanguageSlots). loadLanguagePack() checks the header of the pack and
+points every variable at its string in the pack, and the fonts at the
+font tables of the pack, so one firmware per model serves every language.
+
+Pack layout, little endian:
+    header  : magic "TSLP", format version (u16), slot count (u16),
+              slot layout (u32), language code (8 bytes, NUL padded),
+              short name type (u8), unused (u8), glyph rows (u16),
+              offsets of USER_FONT_12 and USER_FONT_6x8 (u32 each),
+              pack size (u32), sum of the bytes after the header (u32)
+    offsets : u16 per slot, offset of its string in the pack, 0xFFFF
+              for NULL
+    data    : USER_FONT_12, USER_FONT_6x8, then the NUL terminated
+              strings, identical strings stored once
+
+The slot layout is the CRC32 of the slot names, a pack only loads into a
+firmware generated from the same translations_def.js.
+"""
+from __future__ import print_function
+import os
+import sys
+import zlib
+import struct
+
+# The Intel hex writer of the boot logo converter
+LOGO_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Bootup Logo",
+                        "python_logo_converter")
+if LOGO_DIR not in sys.path:
+    sys.path.append(LOGO_DIR)
+from intel_hex import (intel_hex, INTELHEX_DATA_RECORD, INTELHEX_END_OF_FILE_RECORD,  # noqa: E402
+                       INTELHEX_EXTENDED_LINEAR_ADDRESS_RECORD, INTELHEX_BYTES_PER_LINE,
+                       INTELHEX_MINIMUM_SIZE)
+
+PACK_MAGIC = b"TSLP"
+PACK_VERSION = 1
+PACK_ADDRESS = 0x0800D800  # LANGUAGE_PACK_ADDRESS of the Makefile
+PACK_SIZE = 8 * 1024  # up to the boot logo page at 0x0800F800
+NULL_OFFSET = 0xFFFF
+
+_HEADER = struct.Struct("<4sHHI8sBBHIIII")
+_OFFSET = struct.Struct("<H")
+
+# Same layout as _HEADER, for the loader of the generated LANG_PACK block
+HEADER_C = """struct LanguagePackHeader {
+	uint32_t magic;
+	uint16_t version;
+	uint16_t slotCount;
+	uint32_t layout;
+	char languageCode[8];
+	uint8_t shortNameType;
+	uint8_t unused;
+	uint16_t glyphRows;
+	uint32_t font12;
+	uint32_t font6x8;
+	uint32_t size;
+	uint32_t checksum;
+};
+"""
+
+
+def getMagicC():
+    # PACK_MAGIC read as the u32 of the C header
+    return "0x%08X" % struct.unpack("<I", PACK_MAGIC)[0]
+
+
+def getSlotLayout(slotNames):
+    return zlib.crc32("\n".join(slotNames).encode("utf-8")) & 0xffffffff
+
+
+def getChecksum(data):
+    return sum(bytearray(data)) & 0xffffffff
+
+
+def getIndexSize(slotCount):
+    # Bytes of the header and the string offsets
+    return _HEADER.size + _OFFSET.size * slotCount
+
+
+def buildPack(languageCode, shortNameType, slotLayout, fontLarge, fontSmall, strings,
+              glyphRows):
+    """
+    The bytes of a pack. strings holds the encoded bytes of every slot in
+    slot order, without terminator, or None for a NULL slot. Raises
+    ValueError when the pack does not fit PACK_SIZE
+    """
+    dataStart = getIndexSize(len(strings))
+    data = bytearray(fontLarge) + bytearray(fontSmall)
+    offsets = []
+    stored = {}
+    for text in strings:
+        if text is None:
+            offsets.append(NULL_OFFSET)
+            continue
+        if text not in stored:
+            stored[text] = dataStart + len(data)
+            data += text + b"\0"
+        offsets.append(stored[text])
+
+    body = b"".join(_OFFSET.pack(offset) for offset in offsets) + bytes(data)
+    size = _HEADER.size + len(body)
+    if size > PACK_SIZE or dataStart + len(data) > NULL_OFFSET:
+        raise ValueError("{}: language pack of {} bytes does not fit the {} bytes at 0x{:08X}"
+                         .format(languageCode, size, PACK_SIZE, PACK_ADDRESS))
+    header = _HEADER.pack(PACK_MAGIC, PACK_VERSION, len(strings), slotLayout,
+                          languageCode.encode("ascii"), shortNameType, 0, glyphRows,
+                          dataStart, dataStart + len(fontLarge), size, getChecksum(body))
+    return header + body
+
+
+def readPack(pack):
+    """
+    (header fields as a dict, [string bytes or None per slot]) of a pack.
+    Raises ValueError when the pack is damaged
+    """
+    if len(pack) < _HEADER.size:
+        raise ValueError("language pack too short")
+    (magic, version, slotCount, slotLayout, languageCode, shortNameType, _, glyphRows,
+     font12, font6x8, size, checksum) = _HEADER.unpack_from(pack)
+    if magic != PACK_MAGIC or version != PACK_VERSION:
+        raise ValueError("not a version {} language pack".format(PACK_VERSION))
+    if size > len(pack) or getChecksum(pack[_HEADER.size:size]) != checksum:
+        raise ValueError("language pack checksum mismatch")
+    strings = []
+    for i in range(slotCount):
+        offset, = _OFFSET.unpack_from(pack, _HEADER.size + _OFFSET.size * i)
+        if offset == NULL_OFFSET:
+            strings.append(None)
+        else:
+            strings.append(bytes(pack[offset:pack.index(b"\0", offset)]))
+    header = {
+        'languageCode': languageCode.rstrip(b"\0").decode("ascii"),
+        'slotCount': slotCount,
+        'slotLayout': slotLayout,
+        'shortNameType': shortNameType,
+        'glyphRows': glyphRows,
+        'font12': font12,
+        'font6x8': font6x8,
+        'size': size,
+    }
+    return header, strings
+
+
+def writeIntelHex(f, data, startAddress=PACK_ADDRESS):
+    """
+    Write data at startAddress in Intel hex format, padded with erased flash
+    (0xFF) to whole lines and to the smallest file the bootloader takes.
+    A pack stays within the 64 KB segment of PACK_ADDRESS, which intel_hex()
+    writes one extended address record for
+    """
+    data = bytearray(data)
+    data += b"\xff" * (-len(data) % INTELHEX_BYTES_PER_LINE)
+    data += b"\xff" * max(0, INTELHEX_MINIMUM_SIZE - len(data))
+    if (startAddress + len(data) - 1) >> 16 != startAddress >> 16:
+        raise ValueError("{} bytes at 0x{:08X} cross a 64 KB segment".format(len(data), startAddress))
+    intel_hex(f, data, startAddress)
+
+
+def readIntelHex(f):
+    """{address: byte} of the data records of an Intel hex file"""
+    memory = {}
+    addressHi = 0
+    for lineNumber, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        record = bytearray.fromhex(line[1:])
+        if not line.startswith(":") or len(record) != record[0] + 5 or sum(record) & 0xff:
+            raise ValueError("line {}: bad Intel hex record".format(lineNumber))
+        recordType = record[3]
+        data = record[4:-1]
+        if recordType == INTELHEX_DATA_RECORD:
+            address = (addressHi << 16) + (record[1] << 8) + record[2]
+            for i, byte in enumerate(data):
+                memory[address + i] = byte
+        elif recordType == INTELHEX_EXTENDED_LINEAR_ADDRESS_RECORD:
+            addressHi = (data[0] << 8) + data[1]
+        elif recordType == INTELHEX_END_OF_FILE_RECORD:
+            break
+    return memory
+
+
+if __name__ == "__main__":
+    # Check a pack written by make_translation.py --packs and show its header
+    if len(sys.argv) != 2:
+        print("usage: languagePack.py language_XX.hex")
+        sys.exit(2)
+    with open(sys.argv[1], "r") as f:
+        memory = readIntelHex(f)
+    pack = bytearray(memory.get(PACK_ADDRESS + i, 0xff) for i in range(PACK_SIZE))
+    try:
+        header, strings = readPack(pack)
+    except ValueError as e:
+        print("error: " + str(e))
+        sys.exit(1)
+    header['slotLayout'] = "0x%08X" % header['slotLayout']
+    for field in ('languageCode', 'slotCount', 'slotLayout', 'shortNameType', 'glyphRows',
+                  'size'):
+        print("{:<14} {}".format(field, header[field]))
+    print("{:<14} {}".format("strings", len(set(text for text in strings if text is not None))))
@@ -1,591 +1,2210 @@
-#!/usr/bin/env python3
-# coding=utf-8
-from __future__ import print_function
-import json
-import os
-import io
-from datetime import datetime
-import sys
-import fontTables
-import re
-import subprocess
-
-TRANSLATION_CPP = "Translation.cpp"
-UNIT_H = "unit.h"
-
-try:
-    to_unicode = unicode
-except NameError:
-    to_unicode = str
-
-
-# Loading a single JSON file
-def loadJson(fileName, skipFirstLine):
-    with io.open(fileName, mode="r", encoding="utf-8") as f:
-        if skipFirstLine:
-            f.readline()
-
-        obj = json.loads(f.read())
-
-    return obj
-
-
-# Reading all language translations into a dictionary by langCode
-def readTranslations(jsonDir):
-    langDict = {}
-    UnitDict = {}
-
-    # Read all translation files from the input dir
-    for fileName in os.listdir(jsonDir):
-
-        fileWithPath = os.path.join(jsonDir, fileName)
-        lf = fileName.lower()
-
-        # Read only translation_XX.json
-        if lf.startswith("translation_") and lf.endswith(".json"):
-            try:
-                lang = loadJson(fileWithPath, False)
-            except json.decoder.JSONDecodeError as e:
-                print("Failed to decode " + lf)
-                print(str(e))
-                sys.exit(2)
-
-            # Extract lang code from file name
-            langCode = fileName[12:-5].upper()
-            # ...and the one specified in the JSON file...
-            try:
-                langCodeFromJson = lang['languageCode']
-            except KeyError:
-                langCodeFromJson = "(missing)"
-
-            try:
-                TempUnitF_FromJson = lang['tempUnitFahrenheit']
-            except KeyError:
-                TempUnitF_FromJson = True # Default to true.
-            
-            # ...cause they should be the same!
-            if langCode != langCodeFromJson:
-                raise ValueError("Invalid languageCode " + langCodeFromJson +
-                                 " in file " + fileName)
-
-            langDict[langCode] = lang
-            UnitDict[langCode] = TempUnitF_FromJson
-    return langDict, UnitDict
-
-
-def writeStart(f):
-    f.write(
-        to_unicode(
-            """// WARNING: THIS FILE WAS AUTO GENERATED BY make_translation.py. PLEASE DO NOT EDIT.
-
-#include "Translation.h"
-#ifndef LANG
-#define LANG_EN
-#endif
-"""))
-
-
-def writeStartUnit(f):
-    f.write(
-        to_unicode(
-            """// WARNING: THIS FILE WAS AUTO GENERATED BY make_translation.py. PLEASE DO NOT EDIT.
- 
-/**
- * °F Fahrenheit Support
- * You will find the default Fahrenheit configuration in the translation_xx.json
- * If tempUnitFahrenheit is set to:
- *    true -  you can switch in menu settings to Fahrenheit or Celsius.
- *    false - you see only Celsius. All settings are then is in Celsius only.
- */
-
-#ifndef _UNIT_H
-#define _UNIT_H\n
-"""))
-
-def escapeC(s):
-    return s.replace("\"", "\\\"")
-
-
-def getConstants():
-    # Extra constants that are used in the firmware that are shared across all languages
-    consants = []
-    consants.append(('SymbolPlus', '+'))
-    consants.append(('SymbolMinus', '-'))
-    consants.append(('SymbolSpace', ' '))
-    consants.append(('SymbolDot', '.'))
-    consants.append(('SymbolDegC', 'C'))
-    consants.append(('SymbolDegF', 'F'))
-    consants.append(('SymbolMinutes', 'M'))
-    consants.append(('SymbolSeconds', 'S'))
-    consants.append(('SymbolWatts', 'W'))
-    consants.append(('SymbolVolts', 'V'))
-    consants.append(('SymbolDC', 'DC'))
-    consants.append(('SymbolCellCount', 'S'))
-    consants.append(('SymbolVersionNumber', buildVersion))
-    return consants
-
-
-def getTipModelEnumTS80():
-    constants = []
-    constants.append("B02")
-    constants.append("D25")
-    constants.append("TS80")  # end of miniware
-    constants.append("User")  # User
-    return constants
-
-
-def getTipModelEnumTS100():
-    constants = []
-    constants.append("B02")
-    constants.append("D24")
-    constants.append("BC2")
-    constants.append(" C1")
-    constants.append("TS100")  # end of miniware
-    constants.append("BC2")
-    constants.append("Hakko")  # end of hakko
-    constants.append("User")
-    return constants
-
-
-def getDebugMenu():
-    constants = []
-    constants.append(datetime.today().strftime('%d-%m-%y'))
-    constants.append("HW G ")
-    constants.append("HW M ")
-    constants.append("HW P ")
-    constants.append("Time ")
-    constants.append("Move ")
-    constants.append("RTip ")
-    constants.append("CTip ")
-    constants.append("CHan ")
-    constants.append("Vin  ")
-    constants.append("PCB  ")  # PCB Version AKA IMU version
-    return constants
-
-
-def getLetterCounts(defs, lang):
-    textList = []
-    # iterate over all strings
-    obj = lang['menuOptions']
-    for mod in defs['menuOptions']:
-        eid = mod['id']
-        textList.append(obj[eid]['desc'])
-
-    obj = lang['messages']
-    for mod in defs['messages']:
-        eid = mod['id']
-        if eid not in obj:
-            textList.append(mod['default'])
-        else:
-            textList.append(obj[eid])
-
-    obj = lang['characters']
-
-    for mod in defs['characters']:
-        eid = mod['id']
-        textList.append(obj[eid])
-
-    obj = lang['menuOptions']
-    for mod in defs['menuOptions']:
-        eid = mod['id']
-        if lang['menuDouble']:
-            textList.append(obj[eid]['text2'][0])
-            textList.append(obj[eid]['text2'][1])
-        else:
-            textList.append(obj[eid]['text'])
-
-    obj = lang['menuGroups']
-    for mod in defs['menuGroups']:
-        eid = mod['id']
-        textList.append(obj[eid]['text2'][0])
-        textList.append(obj[eid]['text2'][1])
-
-    obj = lang['menuGroups']
-    for mod in defs['menuGroups']:
-        eid = mod['id']
-        textList.append(obj[eid]['desc'])
-    constants = getConstants()
-    for x in constants:
-        textList.append(x[1])
-    textList.extend(getTipModelEnumTS100())
-    textList.extend(getTipModelEnumTS80())
-    textList.extend(getDebugMenu())
-
-    # collapse all strings down into the composite letters and store totals for these
-
-    symbolCounts = {}
-    for line in textList:
-        line = line.replace('\n', '').replace('\r', '')
-        line = line.replace('\\n', '').replace('\\r', '')
-        if len(line):
-            # print(line)
-            for letter in line:
-                symbolCounts[letter] = symbolCounts.get(letter, 0) + 1
-    symbolCounts = sorted(
-        symbolCounts.items(),
-        key=lambda kv: (kv[1], kv[0]))  # swap to Big -> little sort order
-    symbolCounts = list(map(lambda x: x[0], symbolCounts))
-    symbolCounts.reverse()
-    return symbolCounts
-
-
-def getFontMapAndTable(textList):
-    # the text list is sorted
-    # allocate out these in their order as number codes
-    symbolMap = {}
-    symbolMap['\n'] = '\\x01'  # Force insert the newline char
-    index = 2  # start at 2, as 0= null terminator,1 = new line
-    forcedFirstSymbols = ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9']
-    # enforce numbers are first
-    for sym in forcedFirstSymbols:
-        symbolMap[sym] = "\\x%0.2X" % index
-        index = index + 1
-    if len(textList) > (253 - len(forcedFirstSymbols)):
-        print('Error, too many used symbols for this version')
-        exit(1)
-    print('Generating fonts for {} symbols'.format(len(textList)))
-
-    for sym in textList:
-        if sym not in symbolMap:
-            symbolMap[sym] = "\\x%0.2X" % index
-            index = index + 1
-    # Get the font table
-    fontTableStrings = []
-    fontSmallTableStrings = []
-    fontTable = fontTables.getFontMap()
-    fontSmallTable = fontTables.getSmallFontMap()
-    for sym in forcedFirstSymbols:
-        if sym not in fontTable:
-            print('Missing Large font element for {}'.format(sym))
-            exit(1)
-        fontLine = fontTable[sym]
-        fontTableStrings.append(
-            fontLine + "//{} -> {}".format(symbolMap[sym], sym))
-        if sym not in fontSmallTable:
-            print('Missing Small font element for {}'.format(sym))
-            exit(1)
-        fontLine = fontSmallTable[sym]
-        fontSmallTableStrings.append(
-            fontLine + "//{} -> {}".format(symbolMap[sym], sym))
-
-    for sym in textList:
-        if sym not in fontTable:
-            print('Missing Large font element for {}'.format(sym))
-            exit(1)
-        if sym not in forcedFirstSymbols:
-            fontLine = fontTable[sym]
-            fontTableStrings.append(
-                fontLine + "//{} -> {}".format(symbolMap[sym], sym))
-            if sym not in fontSmallTable:
-                print('Missing Small font element for {}'.format(sym))
-                exit(1)
-            fontLine = fontSmallTable[sym]
-            fontSmallTableStrings.append(
-                fontLine + "//{} -> {}".format(symbolMap[sym], sym))
-    outputTable = "const uint8_t USER_FONT_12[] = {" + to_unicode("\n")
-    for line in fontTableStrings:
-        # join font table int one large string
-        outputTable = outputTable + line + to_unicode("\n")
-    outputTable = outputTable + "};" + to_unicode("\n")
-    outputTable = outputTable + "const uint8_t USER_FONT_6x8[] = {" + to_unicode(
-        "\n")
-    for line in fontSmallTableStrings:
-        # join font table int one large string
-        outputTable = outputTable + line + to_unicode("\n")
-    outputTable = outputTable + "};" + to_unicode("\n")
-    return (outputTable, symbolMap)
-
-
-def convStr(symbolConversionTable, text):
-    # convert all of the symbols from the string into escapes for their content
-    outputString = ""
-    for c in text.replace('\\r', '').replace('\\n', '\n'):
-        if c not in symbolConversionTable:
-            print('Missing font definition for {}'.format(c))
-        else:
-            outputString = outputString + symbolConversionTable[c]
-    return outputString
-
-
-def writeLanguage(languageCode, defs, f):
-    print("Generating block for " + languageCode)
-    lang = langDict[languageCode]
-    # Iterate over all of the text to build up the symbols & counts
-    textList = getLetterCounts(defs, lang)
-    # From the letter counts, need to make a symbol translator & write out the font
-    (fontTableText, symbolConversionTable) = getFontMapAndTable(textList)
-
-    f.write(to_unicode("\n#ifdef LANG_" + languageCode + "\n"))
-    f.write(fontTableText)
-    try:
-        langName = lang['languageLocalName']
-    except KeyError:
-        langName = languageCode
-
-    f.write(to_unicode("// ---- " + langName + " ----\n\n"))
-
-    # ----- Writing SettingsDescriptions
-    obj = lang['menuOptions']
-    f.write(to_unicode("const char* SettingsDescriptions[] = {\n"))
-
-    maxLen = 25
-    for mod in defs['menuOptions']:
-        eid = mod['id']
-        if 'feature' in mod:
-            f.write(to_unicode("#ifdef " + mod['feature'] + "\n"))
-        f.write(to_unicode("  /* " + eid.ljust(maxLen)[:maxLen] + " */ "))
-        f.write(
-            to_unicode("\"" +
-                       convStr(symbolConversionTable, (obj[eid]['desc'])) +
-                       "\"," + "//{} \n".format(obj[eid]['desc'])))
-        if 'feature' in mod:
-            f.write(to_unicode("#endif\n"))
-
-    f.write(to_unicode("};\n\n"))
-
-    # ----- Writing Message strings
-
-    obj = lang['messages']
-
-    for mod in defs['messages']:
-        eid = mod['id']
-        sourceText = ""
-        if 'default' in mod:
-            sourceText = (mod['default'])
-        if eid in obj:
-            sourceText = (obj[eid])
-        translatedText = convStr(symbolConversionTable, sourceText)
-        f.write(
-            to_unicode("const char* " + eid + " = \"" +
-                       translatedText + "\";" + "//{} \n".format(sourceText.replace('\n', '_'))))
-
-    f.write(to_unicode("\n"))
-
-    # ----- Writing Characters
-
-    obj = lang['characters']
-
-    for mod in defs['characters']:
-        eid = mod['id']
-        f.write(
-            to_unicode("const char* " + eid + " = \"" +
-                       convStr(symbolConversionTable, obj[eid]) + "\";" + "//{} \n".format(obj[eid])))
-
-    f.write(to_unicode("\n"))
-
-    # Write out firmware constant options
-    constants = getConstants()
-    for x in constants:
-        f.write(
-            to_unicode("const char* " + x[0] + " = \"" +
-                       convStr(symbolConversionTable, x[1]) + "\";" + "//{} \n".format(x[1])))
-
-    f.write(to_unicode("\n"))
-    # Write out tip model strings
-
-    f.write(to_unicode("const char* TipModelStrings[] = {\n"))
-    f.write(to_unicode("#ifdef MODEL_TS100\n"))
-    for c in getTipModelEnumTS100():
-        f.write(to_unicode("\t \"" + convStr(symbolConversionTable,
-                                             c) + "\"," + "//{} \n".format(c)))
-    f.write(to_unicode("#else\n"))
-    for c in getTipModelEnumTS80():
-        f.write(to_unicode("\t \"" + convStr(symbolConversionTable,
-                                             c) + "\"," + "//{} \n".format(c)))
-    f.write(to_unicode("#endif\n"))
-
-    f.write(to_unicode("};\n\n"))
-
-    # Debug Menu
-    f.write(to_unicode("const char* DebugMenu[] = {\n"))
-
-    for c in getDebugMenu():
-        f.write(to_unicode("\t \"" + convStr(symbolConversionTable,
-                                             c) + "\"," + "//{} \n".format(c)))
-    f.write(to_unicode("};\n\n"))
-
-    # ----- Menu Options
-
-    # Menu type
-    f.write(
-        to_unicode(
-            "const enum ShortNameType SettingsShortNameType = SHORT_NAME_" +
-            ("DOUBLE" if lang['menuDouble'] else "SINGLE") + "_LINE;\n"))
-
-    # ----- Writing SettingsDescriptions
-    obj = lang['menuOptions']
-    f.write(to_unicode("const char* SettingsShortNames[][2] = {\n"))
-
-    maxLen = 25
-    for mod in defs['menuOptions']:
-        eid = mod['id']
-        if 'feature' in mod:
-            f.write(to_unicode("#ifdef " + mod['feature'] + "\n"))
-        f.write(to_unicode("  /* " + eid.ljust(maxLen)[:maxLen] + " */ "))
-        if lang['menuDouble']:
-            f.write(
-                to_unicode(
-                    "{ \"" +
-                    convStr(symbolConversionTable, (obj[eid]['text2'][0])) +
-                    "\", \"" +
-                    convStr(symbolConversionTable, (obj[eid]['text2'][1])) +
-                    "\" }," + "//{} \n".format(obj[eid]['text2'])))
-        else:
-            f.write(
-                to_unicode("{ \"" +
-                           convStr(symbolConversionTable, (obj[eid]['text'])) +
-                           "\" }," + "//{} \n".format(obj[eid]['text'])))
-        if 'feature' in mod:
-            f.write(to_unicode("#endif\n"))
-
-    f.write(to_unicode("};\n\n"))
-
-    # ----- Writing Menu Groups
-    obj = lang['menuGroups']
-    f.write(
-        to_unicode("const char* SettingsMenuEntries[" + str(len(obj)) +
-                   "] = {\n"))
-
-    maxLen = 25
-    for mod in defs['menuGroups']:
-        eid = mod['id']
-        f.write(to_unicode("  /* " + eid.ljust(maxLen)[:maxLen] + " */ "))
-        f.write(
-            to_unicode("\"" +
-                       convStr(symbolConversionTable, (obj[eid]['text2'][0]) +
-                               "\\n" + obj[eid]['text2'][1]) + "\"," + "//{} \n".format(obj[eid]['text2'])))
-
-    f.write(to_unicode("};\n\n"))
-
-    # ----- Writing Menu Groups Descriptions
-    obj = lang['menuGroups']
-    f.write(
-        to_unicode("const char* SettingsMenuEntriesDescriptions[" +
-                   str(len(obj)) + "] = {\n"))
-
-    maxLen = 25
-    for mod in defs['menuGroups']:
-        eid = mod['id']
-        f.write(to_unicode("  /* " + eid.ljust(maxLen)[:maxLen] + " */ "))
-        f.write(
-            to_unicode("\"" +
-                       convStr(symbolConversionTable, (obj[eid]['desc'])) +
-                       "\"," + "//{} \n".format(obj[eid]['desc'])))
-
-    f.write(to_unicode("};\n\n"))
-
-    # ----- Block end
-    f.write(to_unicode("#endif\n"))
-
-
-def writeUnit(languageCode, defs, f, UnitCodes):
-    print("Generating unit block for " + languageCode)
-    lang = langDict[languageCode]
-    unit = UnitDict[UnitCodes]
-    try:
-        langName = lang['languageLocalName']
-    except KeyError:
-        langName = languageCode
-    f.write(to_unicode("  #ifdef LANG_" + languageCode + "\n"))
-    if unit: 
-        f.write(to_unicode("    #define  ENABLED_FAHRENHEIT_SUPPORT" + "\n"))
-    else: f.write(to_unicode("    //#define  ENABLED_FAHRENHEIT_SUPPORT" + "\n"))
-    # ----- Block end
-    f.write(to_unicode("  #endif /* ---- " + langName + " ---- */\n"))
-
-def readVersion():
-    with open(os.path.relpath(jsonDir + 
-    "/../workspace/TS100/version.h"),"r") as version_file:
-        try: 
-            for line in version_file:
-                if re.findall(r'^.*(?<=(#define)).*(?<=(BUILD_VERSION))', line):
-                    line = re.findall(r'\"(.+?)\"',line)
-                    if line: 
-                        version = line[0]
-                        try: version += "."+ subprocess.check_output(
-                            ["git","rev-parse", "--short=7", "HEAD"]).strip().decode('ascii').upper()
-                            # --short=7: the shorted hash with 7 digits. Increase/decrease if needed!
-                        except OSError: version += " git"
-        finally: 
-            if version_file: 
-                version_file.close(); 
-                return version
-
-def read_opts():
-    """ Reading input parameters
-    First parameter = json directory
-    Second parameter = translation directory
-    Third paramter = unit directory
-    """
-    if len(sys.argv) > 1:
-        jsonDir = sys.argv[1]
-    else:
-        jsonDir = "."
-
-    if len(sys.argv) > 2:
-        outFileTranslationCPP = sys.argv[2]
-    else:
-        outDir = os.path.relpath(jsonDir + "/../workspace/TS100/Core/Src")
-        outFileTranslationCPP = os.path.join(outDir, TRANSLATION_CPP)
-    
-    if len(sys.argv) > 3:
-        outFileUnitH = sys.argv[3]
-    else:
-        outDir = os.path.relpath(jsonDir + "/../workspace/TS100/Core/Inc")
-        outFileUnitH = os.path.join(outDir,UNIT_H)
-
-    if len(sys.argv) > 4:
-        raise Exception("Too many parameters!")
-
-    return jsonDir, outFileTranslationCPP, outFileUnitH
-
-
-def orderOutput(langDict):
-    # These languages go first
-    mandatoryOrder = ['EN']
-
-    # Then add all others in alphabetical order
-    sortedKeys = sorted(langDict.keys())
-
-    # Add the rest as they come
-    for key in sortedKeys:
-        if key not in mandatoryOrder:
-            mandatoryOrder.append(key)
-
-    return mandatoryOrder
-
-
-def writeTarget(outFileTranslationCPP, outFileUnitH, defs, langCodes, UnitCodes):
-    # Start writing the file
-    with io.open(outFileTranslationCPP, 'w', encoding='utf-8', newline="\n") as f:
-        writeStart(f)
-        for langCode in langCodes:
-            writeLanguage(langCode, defs, f)
-
-    with io.open(outFileUnitH, 'w', encoding='utf-8', newline="\n") as f:
-        writeStartUnit(f)
-        for langCode, UnitCode in zip(langCodes, UnitCodes):
-            writeUnit(langCode, defs, f, UnitCode)
-        f.write(to_unicode("\n#endif /* _UNIT_H */\n"))
-
-if __name__ == "__main__":
-    try:
-        jsonDir, outFileTranslationCPP, outFileUnitH = read_opts()
-    except:
-        print("usage: make_translation.py {json dir} {cpp dir}")
-        sys.exit(1)
-
-    try: buildVersion = readVersion()
-    except: print("error: could not get/extract build version"); sys.exit(1)
-
-    print("Build version: " + buildVersion)
-    print("Making " + outFileTranslationCPP + " from " + jsonDir)
-    print("Making " + outFileUnitH + " from " + jsonDir)
-
-    langDict, UnitDict = readTranslations(jsonDir)
-    defs = loadJson(os.path.join(jsonDir, "translations_def.js"), True)
-    langCodes = orderOutput(langDict)
-    UnitCodes = orderOutput(UnitDict)
-    writeTarget(outFileTranslationCPP, outFileUnitH, defs, langCodes, UnitCodes)
-
-    print("Done")
+#!/usr/bin/env python3
+# coding=utf-8
+from __future__ import print_function
+import json
+import os
+import io
+from datetime import datetime, timezone
+import sys
+import fontStore
+import re
+import subprocess
+import argparse
+import hashlib
+import shlex
+import contextlib
+import time
+
+TRANSLATION_CPP = "Translation.cpp"
+UNIT_H = "unit.h"
+CACHE_DIR = ".cache"
+# RAM the TranslationBuffer of --compress may take. Of the 20 KB RAM region
+# of LinkerScript.ld the task and idle stacks, the minimum heap and stack of
+# the linker script and the other globals use about 6 KB (no FreeRTOS heap
+# is linked, configSUPPORT_DYNAMIC_ALLOCATION is 0)
+COMPRESS_RAM_BUDGET = 4 * 1024
+MULTI_LANGUAGE = "MULTI"  # lang=MULTI builds the --multi output
+PACK_LANGUAGE = "PACK"  # lang=PACK builds the firmware loading the --packs
+# Menu options with this feature (the language setting) only exist in lang=MULTI
+MULTI_FEATURE = "LANG_" + MULTI_LANGUAGE
+SETTINGS_INDEX = "SETTINGS_INDEX_"  # + menu option id, see writeSettingsIndexes
+MODELS = ["TS100", "TS80"]
+POINTER_SIZE = 4
+SINGLE_BYTE_CODES = 254  # \x02..\xFF, 0 ends a string and \x01 is the newline
+CODE_PAGE_SIZE = 255  # second byte of a paged symbol, \x01..\xFF
+MAX_CODE_PAGES = 16
+# String tables holding u16 offsets into TranslationStrings with --pool-strings
+POOL_OFFSET_TABLES = ("SettingsShortNames", "SettingsMenuEntries")
+# Written for the other modes but read by nothing (the menu groups have no
+# description in gui.cpp), pooled builds leave them out
+UNUSED_POOL_SLOTS = ("SettingsMenuEntriesDescriptions",)
+POOL_OFFSET_SIZE = 2
+VOLATILE_CPP = "TranslationVolatile.cpp"  # build version and date with --reproducible
+VOLATILE_VERSION = "TranslationBuildVersion"
+VOLATILE_DATE = "TranslationBuildDate"
+# Symbols of the build version and date with --reproducible. They get the
+# same codes in every language, so TranslationVolatile.cpp serves them all
+VOLATILE_SYMBOLS = "0123456789ABCDEFv.- git"
+
+# PhaseProfiler of --profile, None when not profiling
+profiler = None
+
+try:
+    to_unicode = unicode
+except NameError:
+    to_unicode = str
+
+
+# Loading a single JSON file
+def loadJson(fileName, skipFirstLine):
+    with io.open(fileName, mode="r", encoding="utf-8") as f:
+        if skipFirstLine:
+            f.readline()
+
+        obj = json.loads(f.read())
+
+    return obj
+
+
+# Listing the translation_XX.json files in the input dir, sorted by file name
+# If langCodes is given only the files for those languages are returned
+def getTranslationFiles(jsonDir, langCodes=None):
+    fileNames = []
+    for fileName in sorted(os.listdir(jsonDir)):
+        lf = fileName.lower()
+        # Read only translation_XX.json
+        if lf.startswith("translation_") and lf.endswith(".json"):
+            # Skip languages that were not requested without parsing them
+            if langCodes and fileName[12:-5].upper() not in langCodes:
+                continue
+            fileNames.append(fileName)
+    return fileNames
+
+
+# Reading the language translations into a dictionary by langCode
+# If langCodes is given only those languages are loaded
+def readTranslations(jsonDir, langCodes=None, cacheDir=None):
+    # Validated and normalised by translationStore, from its cache when the
+    # files did not change. Raises ValueError listing the problems of all files
+    import translationStore
+    fileNames = getTranslationFiles(jsonDir, langCodes)
+    _, langDict, UnitDict = translationStore.loadLanguages(jsonDir, fileNames, cacheDir)
+
+    if langCodes:
+        missing = [code for code in langCodes if code not in langDict]
+        if missing:
+            raise ValueError("No translation file for language(s) " +
+                             ", ".join(missing) + " in " + jsonDir)
+    return langDict, UnitDict
+
+
+def profilePhase(name, language=""):
+    # Times one step of the generation when running with --profile
+    if profiler is None:
+        return contextlib.nullcontext()
+    return profiler.phase(name, language)
+
+
+def writeStart(f):
+    f.write(
+        to_unicode(
+            """// WARNING: THIS FILE WAS AUTO GENERATED BY make_translation.py. PLEASE DO NOT EDIT.
+
+#include "Translation.h"
+#ifndef LANG
+#define LANG_EN
+#endif
+"""))
+
+
+def writeStartUnit(f):
+    f.write(
+        to_unicode(
+            """// WARNING: THIS FILE WAS AUTO GENERATED BY make_translation.py. PLEASE DO NOT EDIT.
+ 
+/**
+ * °F Fahrenheit Support
+ * You will find the default Fahrenheit configuration in the translation_xx.json
+ * If tempUnitFahrenheit is set to:
+ *    true -  you can switch in menu settings to Fahrenheit or Celsius.
+ *    false - you see only Celsius. All settings are then is in Celsius only.
+ */
+
+#ifndef _UNIT_H
+#define _UNIT_H\n
+"""))
+
+def escapeC(s):
+    return s.replace("\"", "\\\"")
+
+
+def getConstants(buildVersion):
+    # Extra constants that are used in the firmware that are shared across all languages
+    consants = []
+    consants.append(('SymbolPlus', '+'))
+    consants.append(('SymbolMinus', '-'))
+    consants.append(('SymbolSpace', ' '))
+    consants.append(('SymbolDot', '.'))
+    consants.append(('SymbolDegC', 'C'))
+    consants.append(('SymbolDegF', 'F'))
+    consants.append(('SymbolMinutes', 'M'))
+    consants.append(('SymbolSeconds', 'S'))
+    consants.append(('SymbolWatts', 'W'))
+    consants.append(('SymbolVolts', 'V'))
+    consants.append(('SymbolDC', 'DC'))
+    consants.append(('SymbolCellCount', 'S'))
+    consants.append(('SymbolVersionNumber', buildVersion))
+    return consants
+
+
+def getTipModelEnumTS80():
+    constants = []
+    constants.append("B02")
+    constants.append("D25")
+    constants.append("TS80")  # end of miniware
+    constants.append("User")  # User
+    return constants
+
+
+def getTipModelEnumTS100():
+    constants = []
+    constants.append("B02")
+    constants.append("D24")
+    constants.append("BC2")
+    constants.append(" C1")
+    constants.append("TS100")  # end of miniware
+    constants.append("BC2")
+    constants.append("Hakko")  # end of hakko
+    constants.append("User")
+    return constants
+
+
+def getBuildDate():
+    # SOURCE_DATE_EPOCH (reproducible-builds.org) pins the date of a build
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if epoch:
+        return datetime.fromtimestamp(int(epoch), timezone.utc).strftime('%d-%m-%y')
+    return datetime.today().strftime('%d-%m-%y')
+
+
+def getDebugMenu(buildVersion=""):
+    # buildVersion None (--reproducible) leaves the date to TranslationVolatile.cpp
+    constants = []
+    constants.append(None if buildVersion is None else getBuildDate())
+    constants.append("HW G ")
+    constants.append("HW M ")
+    constants.append("HW P ")
+    constants.append("Time ")
+    constants.append("Move ")
+    constants.append("RTip ")
+    constants.append("CTip ")
+    constants.append("CHan ")
+    constants.append("Vin  ")
+    constants.append("PCB  ")  # PCB Version AKA IMU version
+    return constants
+
+
+def getTextList(defs, lang, buildVersion):
+    textList = []
+    # iterate over all strings
+    obj = lang['menuOptions']
+    for mod in defs['menuOptions']:
+        eid = mod['id']
+        textList.append(obj[eid]['desc'])
+
+    obj = lang['messages']
+    for mod in defs['messages']:
+        eid = mod['id']
+        if eid not in obj:
+            textList.append(mod['default'])
+        else:
+            textList.append(obj[eid])
+
+    obj = lang['characters']
+
+    for mod in defs['characters']:
+        eid = mod['id']
+        textList.append(obj[eid])
+
+    obj = lang['menuOptions']
+    for mod in defs['menuOptions']:
+        eid = mod['id']
+        if lang['menuDouble']:
+            textList.append(obj[eid]['text2'][0])
+            textList.append(obj[eid]['text2'][1])
+        else:
+            textList.append(obj[eid]['text'])
+
+    obj = lang['menuGroups']
+    for mod in defs['menuGroups']:
+        eid = mod['id']
+        textList.append(obj[eid]['text2'][0])
+        textList.append(obj[eid]['text2'][1])
+
+    obj = lang['menuGroups']
+    for mod in defs['menuGroups']:
+        eid = mod['id']
+        textList.append(obj[eid]['desc'])
+    constants = getConstants(buildVersion)
+    for x in constants:
+        if x[1] is not None:
+            textList.append(x[1])
+    textList.extend(getTipModelEnumTS100())
+    textList.extend(getTipModelEnumTS80())
+    textList.extend(text for text in getDebugMenu(buildVersion) if text is not None)
+    return textList
+
+
+def countSymbols(textList, symbolCounts=None):
+    # collapse all strings down into the composite letters and store totals for these
+    if symbolCounts is None:
+        symbolCounts = {}
+    for line in textList:
+        line = line.replace('\n', '').replace('\r', '')
+        line = line.replace('\\n', '').replace('\\r', '')
+        if len(line):
+            # print(line)
+            for letter in line:
+                symbolCounts[letter] = symbolCounts.get(letter, 0) + 1
+    return symbolCounts
+
+
+def sortSymbolCounts(symbolCounts):
+    symbolCounts = sorted(
+        symbolCounts.items(),
+        key=lambda kv: (kv[1], kv[0]))  # swap to Big -> little sort order
+    symbolCounts = list(map(lambda x: x[0], symbolCounts))
+    symbolCounts.reverse()
+    return symbolCounts
+
+
+def getLanguageDefs(defs):
+    # defs of a single language block, without the menu options of lang=MULTI
+    menuOptions = [mod for mod in defs['menuOptions'] if mod.get('feature') != MULTI_FEATURE]
+    if len(menuOptions) == len(defs['menuOptions']):
+        return defs
+    return dict(defs, menuOptions=menuOptions)
+
+
+def getLetterCounts(defs, lang, buildVersion):
+    # Symbols of a single language block
+    defs = getLanguageDefs(defs)
+    symbols = sortSymbolCounts(countSymbols(getTextList(defs, lang, buildVersion)))
+    if buildVersion is None:
+        symbols = forceVolatileSymbols(symbols)
+    return symbols
+
+
+def forceVolatileSymbols(symbols):
+    # The version and date symbols go first, after the digits, in a fixed order
+    return list(VOLATILE_SYMBOLS[10:]) + [sym for sym in symbols if sym not in VOLATILE_SYMBOLS]
+
+
+def getVolatileSymbolMap():
+    """
+    Symbol map of VOLATILE_SYMBOLS, the codes getFontMapAndTable gives them
+    when they lead the symbol list (see forceVolatileSymbols)
+    """
+    store = fontStore.getFontStore()
+    symbolMap = {}
+    rowOfGlyph = {}
+    for sym in VOLATILE_SYMBOLS:
+        glyph = (bytes(store.getGlyph(fontStore.FONT_LARGE, sym)),
+                 bytes(store.getGlyph(fontStore.FONT_SMALL, sym)))
+        rowOfGlyph.setdefault(glyph, len(rowOfGlyph))
+        symbolMap[sym] = getRowCode(rowOfGlyph[glyph], 0)
+    return symbolMap
+
+
+def checkVolatileSymbols(symbolConversionTable):
+    # Raises ValueError when a language would not draw TranslationVolatile.cpp right
+    for sym, code in getVolatileSymbolMap().items():
+        if symbolConversionTable.get(sym) != code:
+            raise ValueError("symbol {} is not {} in every language".format(sym, code))
+
+
+def getFontMapAndTable(textList, trimGlyphs=False):
+    # the text list is sorted
+    # allocate out these in their order as number codes
+    # trimGlyphs stores USER_FONT_12 trimmed, see glyphCompression.py
+    symbolMap = {}
+    symbolMap['\n'] = '\\x01'  # Force insert the newline char
+    forcedFirstSymbols = ['0', '1', '2', '3', '4', '5', '6', '7', '8', '9']
+    # Get the font table
+    store = fontStore.getFontStore()
+    symbols = forcedFirstSymbols + [sym for sym in textList if sym not in forcedFirstSymbols]
+
+    # Report every missing glyph at once rather than stopping at the first
+    missingLarge = [sym for sym in symbols if not store.hasGlyph(fontStore.FONT_LARGE, sym)]
+    missingSmall = [sym for sym in symbols if not store.hasGlyph(fontStore.FONT_SMALL, sym)]
+    for sym in missingLarge:
+        print('Missing Large font element for {}'.format(sym))
+    for sym in missingSmall:
+        print('Missing Small font element for {}'.format(sym))
+    if missingLarge or missingSmall:
+        exit(1)
+
+    # enforce numbers are first, then allocate by frequency.
+    # Symbols drawn identically in both fonts (E.g. Latin A and Cyrillic A)
+    # share the code of the first one instead of getting their own rows
+    rows = []
+    rowOfGlyph = {}
+    rowOfSymbol = {}
+    for sym in symbols:
+        glyph = (bytes(store.getGlyph(fontStore.FONT_LARGE, sym)),
+                 bytes(store.getGlyph(fontStore.FONT_SMALL, sym)))
+        if glyph not in rowOfGlyph:
+            rowOfGlyph[glyph] = len(rows)
+            rows.append([])
+        rows[rowOfGlyph[glyph]].append(sym)
+        rowOfSymbol[sym] = rowOfGlyph[glyph]
+
+    # The most frequent rows get one byte codes. When they do not all fit,
+    # the top byte values become escapes selecting a code page and the
+    # rarest rows are coded as escape + index in that page
+    codePages = getCodePageCount(len(rows))
+    if codePages > MAX_CODE_PAGES:
+        print('Error, too many used symbols for this version')
+        exit(1)
+    singleRows = SINGLE_BYTE_CODES - codePages
+    for sym in symbols:
+        symbolMap[sym] = getRowCode(rowOfSymbol[sym], codePages)
+    merged = len(symbols) - len(rows)
+    print('Generating fonts for {} symbols'.format(len(textList)))
+    if merged:
+        print('Merged {} duplicate glyphs, saving {} bytes'.format(
+            merged, merged * sum(fontStore.GLYPH_BYTES)))
+    if codePages:
+        print('{} rare symbols use two byte codes on {} code page(s)'.format(
+            len(rows) - singleRows, codePages))
+
+    output = io.StringIO()
+    for font, tableName in ((fontStore.FONT_LARGE, "USER_FONT_12"),
+                            (fontStore.FONT_SMALL, "USER_FONT_6x8")):
+        trim = trimGlyphs and font == fontStore.FONT_LARGE
+        pages = [(tableName, rows[:singleRows])]
+        for page in range(codePages):
+            start = singleRows + page * CODE_PAGE_SIZE
+            pages.append((tableName + "_PAGE" + str(page), rows[start:start + CODE_PAGE_SIZE]))
+        for pageName, pageRows in pages:
+            if trim:
+                writeTrimmedGlyphs(pageName, pageRows, symbolMap, output)
+                continue
+            output.write(to_unicode("const uint8_t " + pageName + "[] = {\n"))
+            for shared in pageRows:
+                output.write(to_unicode("{}//{} -> {}\n".format(
+                    store.getGlyphText(font, shared[0]), symbolMap[shared[0]], " ".join(shared))))
+            output.write(to_unicode("};\n"))
+        if codePages:
+            output.write(to_unicode("const uint8_t* const " + tableName + "_PAGES[] = { " +
+                                    ", ".join(name for name, _ in pages[1:]) + " };\n"))
+            if trim:
+                output.write(to_unicode("const uint16_t* const " + tableName +
+                                        "_PAGES_OFFSETS[] = { " +
+                                        ", ".join(name + "_OFFSETS" for name, _ in pages[1:]) +
+                                        " };\n"))
+    if trimGlyphs:
+        rawSize = len(rows) * fontStore.GLYPH_BYTES[fontStore.FONT_LARGE]
+        trimmedSize = getLargeFontSize(rows, True)
+        print('Trimmed USER_FONT_12 from {} to {} bytes, saving {} bytes'.format(
+            rawSize, trimmedSize, rawSize - trimmedSize))
+    return (output.getvalue(), symbolMap)
+
+
+def writeTrimmedGlyphs(tableName, rows, symbolMap, f):
+    # A trimmed USER_FONT_12 table and the offset of every glyph in it
+    import glyphCompression
+    store = fontStore.getFontStore()
+    data, offsets = glyphCompression.trimGlyphs(
+        [bytes(store.getGlyph(fontStore.FONT_LARGE, shared[0])) for shared in rows])
+    f.write(to_unicode("const uint8_t " + tableName + "[] = {\n"))
+    for shared, start, end in zip(rows, offsets, offsets[1:] + [len(data)]):
+        f.write(to_unicode("{}//{} -> {}\n".format(
+            fontStore.formatGlyph(data[start:end]), symbolMap[shared[0]], " ".join(shared))))
+    f.write(to_unicode("};\n"))
+    f.write(to_unicode("const uint16_t " + tableName + "_OFFSETS[] = {\n"))
+    for i in range(0, len(offsets), 16):
+        f.write(to_unicode("".join("%d," % offset for offset in offsets[i:i + 16]) + "\n"))
+    f.write(to_unicode("};\n"))
+
+
+def getLargeFontSize(rows, trimGlyphs=False):
+    # Flash of the USER_FONT_12 rows (lists of symbols sharing a glyph)
+    import glyphCompression
+    if not trimGlyphs:
+        return len(rows) * fontStore.GLYPH_BYTES[fontStore.FONT_LARGE]
+    store = fontStore.getFontStore()
+    return glyphCompression.getTrimmedSize(
+        [bytes(store.getGlyph(fontStore.FONT_LARGE, shared[0])) for shared in rows])
+
+
+def getCodePageCount(rowCount):
+    # Each code page takes one byte value away from the one byte codes
+    codePages = 0
+    while rowCount > SINGLE_BYTE_CODES - codePages + codePages * CODE_PAGE_SIZE:
+        codePages += 1
+    return codePages
+
+
+def getPageEscape(codePages):
+    # First byte value selecting a code page
+    return 2 + SINGLE_BYTE_CODES - codePages
+
+
+def getRowCode(row, codePages):
+    # "\\xNN" for the one byte codes, "\\xEE\\xNN" (escape, index + 1) for paged rows
+    singleRows = SINGLE_BYTE_CODES - codePages
+    if row < singleRows:
+        return "\\x%0.2X" % (2 + row)  # start at 2, as 0= null terminator,1 = new line
+    page, index = divmod(row - singleRows, CODE_PAGE_SIZE)
+    return "\\x%0.2X\\x%0.2X" % (getPageEscape(codePages) + page, 1 + index)
+
+
+def getCodePages(symbolConversionTable):
+    # Number of code pages used by a symbol map of getFontMapAndTable
+    return getCodePageCount(len(set(symbolConversionTable.values())) - 1)
+
+
+class SymbolCodec(object):
+    """
+    Converts text into the symbol escapes of one language.
+    Built once per language from the symbol map of getFontMapAndTable, the
+    characters without a symbol are collected in missing rather than
+    reported one by one.
+    """
+
+    def __init__(self, symbolMap):
+        self.symbolMap = symbolMap
+        self.table = str.maketrans(symbolMap)
+        self.missing = set()
+
+    def encode(self, text):
+        # convert all of the symbols from the string into escapes for their content
+        text = text.replace('\\r', '').replace('\\n', '\n')
+        missing = set(text).difference(self.symbolMap)
+        if missing:
+            self.missing.update(missing)
+            text = text.translate(dict.fromkeys(map(ord, missing)))
+        return text.translate(self.table)
+
+    def encodeAll(self, texts):
+        return [self.encode(text) for text in texts]
+
+    def reportMissing(self):
+        for c in sorted(self.missing):
+            print('Missing font definition for {}'.format(c))
+
+
+def convStr(symbolConversionTable, text):
+    # One off conversion, use a SymbolCodec when converting many strings
+    codec = SymbolCodec(symbolConversionTable)
+    outputString = codec.encode(text)
+    codec.reportMissing()
+    return outputString
+
+
+def writeLanguage(languageCode, lang, defs, f, buildVersion, compress=False, trimGlyphs=False,
+                  pool=False):
+    print("Generating block for " + languageCode)
+    defs = getLanguageDefs(defs)
+    # Iterate over all of the text to build up the symbols & counts
+    with profilePhase("letterCounts", languageCode):
+        textList = getLetterCounts(defs, lang, buildVersion)
+    # From the letter counts, need to make a symbol translator & write out the font
+    with profilePhase("fontTable", languageCode):
+        (fontTableText, symbolConversionTable) = getFontMapAndTable(textList, trimGlyphs)
+        if buildVersion is None:
+            checkVolatileSymbols(symbolConversionTable)
+    codec = SymbolCodec(symbolConversionTable)
+
+    f.write(to_unicode("\n#ifdef LANG_" + languageCode + "\n"))
+    f.write(fontTableText)
+    try:
+        langName = lang['languageLocalName']
+    except KeyError:
+        langName = languageCode
+
+    f.write(to_unicode("// ---- " + langName + " ----\n\n"))
+
+    literal = compressedSize = poolOffsets = None
+    if compress:
+        with profilePhase("compress", languageCode):
+            literal, compressedSize = writeCompressedStrings(languageCode, defs, lang, codec, f)
+    if pool:
+        with profilePhase("pool", languageCode):
+            poolOffsets, compressedSize = writeStringPool(languageCode, defs, lang, codec, f,
+                                                          buildVersion)
+    with profilePhase("strings", languageCode):
+        writeLanguageStrings(lang, defs, codec, f, buildVersion, literal=literal,
+                             poolOffsets=poolOffsets)
+
+    # ----- Block end
+    f.write(to_unicode("#endif\n"))
+    codec.reportMissing()
+    with profilePhase("sizes", languageCode):
+        sizes = getLanguageSizes(languageCode, defs, lang, codec, buildVersion, compressedSize,
+                                 trimGlyphs, pool)
+    return sizes, getCodePages(symbolConversionTable)
+
+
+def getEncodedBytes(encoded):
+    # "\\x0C\\x02" -> b"\x0C\x02"
+    return bytes(bytearray.fromhex(encoded.replace("\\x", "")))
+
+
+def writeByteTable(name, data, f):
+    f.write(to_unicode("static const uint8_t " + name + "[] = {\n"))
+    for i in range(0, len(data), 16):
+        f.write(to_unicode(fontStore.formatGlyph(data[i:i + 16]) + "\n"))
+    f.write(to_unicode("};\n"))
+
+
+def writeCompressedStrings(languageCode, defs, lang, codec, f):
+    # The translated strings of the language as one Huffman coded stream,
+    # inflated into TranslationBuffer by decompressTranslations() at boot.
+    # Returns the literal function pointing the strings into the buffer and
+    # the flash used by the stream and its decode table. Raises ValueError
+    # when the buffer would take more than COMPRESS_RAM_BUDGET
+    import stringCompression
+    offsets = {}
+    data = bytearray()
+    for _, text in getLanguageSlots(defs, lang):
+        if text is None:
+            continue
+        encoded = codec.encode(text)
+        if encoded not in offsets:
+            offsets[encoded] = len(data)
+            data += getEncodedBytes(encoded) + b"\0"
+    try:
+        code, stream = stringCompression.compress(data)
+    except ValueError as e:
+        raise ValueError(languageCode + ": " + str(e))
+    if len(data) > COMPRESS_RAM_BUDGET:
+        raise ValueError("{}: the compressed strings need {} bytes of RAM, more than the "
+                         "budget of {} bytes".format(languageCode, len(data), COMPRESS_RAM_BUDGET))
+    compressedSize = len(stream) + code.getTableSize()
+    print("Compressed strings from {} to {} bytes, saving {} bytes of flash for {} bytes "
+          "of RAM (of {})".format(len(data), compressedSize, len(data) - compressedSize,
+                                  len(data), COMPRESS_RAM_BUDGET))
+
+    f.write(to_unicode("// Huffman coded strings, see stringCompression.py\n"))
+    writeByteTable("TranslationCodeLengths", code.lengthCounts[1:], f)
+    writeByteTable("TranslationSymbols", code.symbols, f)
+    writeByteTable("TranslationStream", stream, f)
+    f.write(to_unicode("static char TranslationBuffer[" + str(len(data)) + "];\n\n"))
+    f.write(to_unicode("""void decompressTranslations() {
+	uint32_t bit = 0;
+	for (uint16_t out = 0; out < sizeof(TranslationBuffer); out++) {
+		int code = 0, first = 0, index = 0;
+		for (uint8_t len = 0; len < sizeof(TranslationCodeLengths); len++) {
+			code |= (TranslationStream[bit >> 3] >> (7 - (bit & 7))) & 1;
+			bit++;
+			int count = TranslationCodeLengths[len];
+			if (code - count < first) {
+				TranslationBuffer[out] = TranslationSymbols[index + code - first];
+				break;
+			}
+			index += count;
+			first = (first + count) << 1;
+			code <<= 1;
+		}
+	}
+}
+
+"""))
+    literal = lambda text: "TranslationBuffer + " + str(offsets[codec.encode(text)])
+    return literal, compressedSize
+
+
+def getPoolTexts(defs, lang, buildVersion):
+    # Every string of the pool: the translated ones, the constants and the
+    # debug menu. TipModelStrings differ per model and stay literals
+    texts = [text for name, text in getLanguageSlots(defs, lang)
+             if text is not None and name.split("[")[0] not in UNUSED_POOL_SLOTS]
+    texts.extend(x[1] for x in getConstants(buildVersion) if x[1] is not None)
+    texts.extend(text for text in getDebugMenu(buildVersion) if text is not None)
+    return texts
+
+
+def writeStringPool(languageCode, defs, lang, codec, f, buildVersion):
+    # All strings of the language in TranslationStrings[], see stringPool.py.
+    # Returns the offset of every encoded string and the flash of the pool
+    import stringPool
+    texts = getPoolTexts(defs, lang, buildVersion)
+    encoded = codec.encodeAll(texts)
+    strings = [getEncodedBytes(x) for x in encoded]
+    try:
+        pool, offsets = stringPool.poolStrings(strings)
+    except ValueError as e:
+        raise ValueError(languageCode + ": " + str(e))
+    duplicates, merged = stringPool.getPoolStats(strings, pool)
+    literals = getStringsSize(codec, texts)
+    print("Pooled {} strings into {} bytes ({} duplicates, {} tails of longer strings), "
+          "saving {} bytes".format(len(strings), len(pool), duplicates, merged,
+                                   literals - len(pool)))
+
+    # One line per stored string, in pool order
+    textOf = dict(zip(strings, texts))
+    escapesOf = dict(zip(strings, encoded))
+    stored = sorted((offset, text) for text, offset in offsets.items()
+                    if offset == 0 or pool[offset - 1] == 0)
+    f.write(to_unicode("// All strings of the language, see stringPool.py\n"))
+    f.write(to_unicode("const char TranslationStrings[] =\n"))
+    for i, (offset, text) in enumerate(stored):
+        terminator = "\\x00" if i + 1 < len(stored) else ""
+        f.write(to_unicode("  \"" + escapesOf[text] + terminator + "\"" +
+                           "//{}: {} \n".format(offset, textOf[text].replace('\n', '_'))))
+    f.write(to_unicode(";\n\n"))
+    poolOffsets = dict((escapes, offsets[text]) for text, escapes in zip(strings, encoded))
+    return poolOffsets, len(pool)
+
+
+def writeLanguageStrings(lang, defs, codec, f, buildVersion, shortNameTypeQualifier="const ",
+                         literal=None, poolOffsets=None):
+    # literal gives the C expression of a translated string, a plain string
+    # literal unless the strings are stored compressed. With poolOffsets
+    # (encoded string -> offset in TranslationStrings) every string points
+    # into the pool and the POOL_OFFSET_TABLES hold offsets
+    constant = lambda text: "\"" + codec.encode(text) + "\""
+    if poolOffsets is not None:
+        offset = lambda text: str(poolOffsets[codec.encode(text)])
+        literal = constant = lambda text: "TranslationStrings + " + offset(text)
+    if literal is None:
+        literal = constant
+
+    # ----- Writing SettingsDescriptions
+    obj = lang['menuOptions']
+    f.write(to_unicode("const char* SettingsDescriptions[] = {\n"))
+
+    maxLen = 25
+    for mod in defs['menuOptions']:
+        eid = mod['id']
+        if 'feature' in mod:
+            f.write(to_unicode("#ifdef " + mod['feature'] + "\n"))
+        f.write(to_unicode("  /* " + eid.ljust(maxLen)[:maxLen] + " */ "))
+        f.write(
+            to_unicode(literal(obj[eid]['desc']) +
+                       "," + "//{} \n".format(obj[eid]['desc'])))
+        if 'feature' in mod:
+            f.write(to_unicode("#endif\n"))
+
+    f.write(to_unicode("};\n\n"))
+
+    # ----- Writing Message strings
+
+    obj = lang['messages']
+
+    for mod in defs['messages']:
+        eid = mod['id']
+        sourceText = ""
+        if 'default' in mod:
+            sourceText = (mod['default'])
+        if eid in obj:
+            sourceText = (obj[eid])
+        f.write(
+            to_unicode("const char* " + eid + " = " +
+                       literal(sourceText) + ";" + "//{} \n".format(sourceText.replace('\n', '_'))))
+
+    f.write(to_unicode("\n"))
+
+    # ----- Writing Characters
+
+    obj = lang['characters']
+
+    for mod in defs['characters']:
+        eid = mod['id']
+        f.write(
+            to_unicode("const char* " + eid + " = " +
+                       literal(obj[eid]) + ";" + "//{} \n".format(obj[eid])))
+
+    f.write(to_unicode("\n"))
+
+    # Write out firmware constant options, with --reproducible the version
+    # and date are in TranslationVolatile.cpp
+    if buildVersion is None:
+        f.write(to_unicode("extern const char " + VOLATILE_VERSION + "[];\n"))
+        f.write(to_unicode("extern const char " + VOLATILE_DATE + "[];\n"))
+    constants = getConstants(buildVersion)
+    for x in constants:
+        if x[1] is None:
+            f.write(to_unicode("const char* " + x[0] + " = " + VOLATILE_VERSION + ";\n"))
+            continue
+        f.write(
+            to_unicode("const char* " + x[0] + " = " +
+                       constant(x[1]) + ";" + "//{} \n".format(x[1])))
+
+    f.write(to_unicode("\n"))
+    # Write out tip model strings
+
+    f.write(to_unicode("const char* TipModelStrings[] = {\n"))
+    f.write(to_unicode("#ifdef MODEL_TS100\n"))
+    texts = getTipModelEnumTS100()
+    for c, encoded in zip(texts, codec.encodeAll(texts)):
+        f.write(to_unicode("\t \"" + encoded + "\"," + "//{} \n".format(c)))
+    f.write(to_unicode("#else\n"))
+    texts = getTipModelEnumTS80()
+    for c, encoded in zip(texts, codec.encodeAll(texts)):
+        f.write(to_unicode("\t \"" + encoded + "\"," + "//{} \n".format(c)))
+    f.write(to_unicode("#endif\n"))
+
+    f.write(to_unicode("};\n\n"))
+
+    # Debug Menu
+    f.write(to_unicode("const char* DebugMenu[] = {\n"))
+    for c in getDebugMenu(buildVersion):
+        if c is None:
+            f.write(to_unicode("\t " + VOLATILE_DATE + ",\n"))
+            continue
+        f.write(to_unicode("\t " + constant(c) + "," + "//{} \n".format(c)))
+    f.write(to_unicode("};\n\n"))
+
+    # ----- Menu Options
+
+    # Menu type
+    f.write(
+        to_unicode(
+            shortNameTypeQualifier + "enum ShortNameType SettingsShortNameType = SHORT_NAME_" +
+            ("DOUBLE" if lang['menuDouble'] else "SINGLE") + "_LINE;\n"))
+
+    # ----- Writing SettingsDescriptions
+    obj = lang['menuOptions']
+    if poolOffsets is not None:
+        f.write(to_unicode("const uint16_t SettingsShortNamesOffsets[][2] = {\n"))
+    else:
+        f.write(to_unicode("const char* SettingsShortNames[][2] = {\n"))
+
+    maxLen = 25
+    for mod in defs['menuOptions']:
+        eid = mod['id']
+        if 'feature' in mod:
+            f.write(to_unicode("#ifdef " + mod['feature'] + "\n"))
+        f.write(to_unicode("  /* " + eid.ljust(maxLen)[:maxLen] + " */ "))
+        if poolOffsets is not None:
+            # The second line of a single line name is never read
+            names = obj[eid]['text2'] if lang['menuDouble'] else [obj[eid]['text']]
+            f.write(to_unicode("{ " + ", ".join(offset(name) for name in names) +
+                               " }," + "//{} \n".format(names)))
+        elif lang['menuDouble']:
+            f.write(
+                to_unicode(
+                    "{ " +
+                    literal(obj[eid]['text2'][0]) +
+                    ", " +
+                    literal(obj[eid]['text2'][1]) +
+                    " }," + "//{} \n".format(obj[eid]['text2'])))
+        else:
+            f.write(
+                to_unicode("{ " +
+                           literal(obj[eid]['text']) +
+                           " }," + "//{} \n".format(obj[eid]['text'])))
+        if 'feature' in mod:
+            f.write(to_unicode("#endif\n"))
+
+    f.write(to_unicode("};\n\n"))
+
+    # ----- Writing Menu Groups
+    obj = lang['menuGroups']
+    if poolOffsets is not None:
+        f.write(to_unicode("const uint16_t SettingsMenuEntriesOffsets[" + str(len(obj)) +
+                           "] = {\n"))
+        entry = offset
+    else:
+        f.write(
+            to_unicode("const char* SettingsMenuEntries[" + str(len(obj)) +
+                       "] = {\n"))
+        entry = literal
+
+    maxLen = 25
+    for mod in defs['menuGroups']:
+        eid = mod['id']
+        f.write(to_unicode("  /* " + eid.ljust(maxLen)[:maxLen] + " */ "))
+        f.write(
+            to_unicode(entry(obj[eid]['text2'][0] +
+                             "\\n" + obj[eid]['text2'][1]) + "," + "//{} \n".format(obj[eid]['text2'])))
+
+    f.write(to_unicode("};\n\n"))
+
+    if poolOffsets is not None:
+        return
+
+    # ----- Writing Menu Groups Descriptions
+    obj = lang['menuGroups']
+    f.write(
+        to_unicode("const char* SettingsMenuEntriesDescriptions[" +
+                   str(len(obj)) + "] = {\n"))
+
+    maxLen = 25
+    for mod in defs['menuGroups']:
+        eid = mod['id']
+        f.write(to_unicode("  /* " + eid.ljust(maxLen)[:maxLen] + " */ "))
+        f.write(
+            to_unicode(entry(obj[eid]['desc']) +
+                       "," + "//{} \n".format(obj[eid]['desc'])))
+
+    f.write(to_unicode("};\n\n"))
+
+
+def getLanguageSlots(defs, lang):
+    # Every translated string of a language in a fixed order, as
+    # (variable holding it, source text). Same order for all languages.
+    # Menu options are indexed by id (see writeSettingsIndexes), the
+    # options of a feature are left out of the arrays when it is not defined
+    slots = []
+    obj = lang['menuOptions']
+    for mod in defs['menuOptions']:
+        slots.append(("SettingsDescriptions[" + SETTINGS_INDEX + mod['id'] + "]",
+                      obj[mod['id']]['desc']))
+
+    obj = lang['messages']
+    for mod in defs['messages']:
+        eid = mod['id']
+        slots.append((eid, obj[eid] if eid in obj else mod.get('default', "")))
+
+    obj = lang['characters']
+    for mod in defs['characters']:
+        slots.append((mod['id'], obj[mod['id']]))
+
+    obj = lang['menuOptions']
+    for mod in defs['menuOptions']:
+        eid = mod['id']
+        name = "SettingsShortNames[" + SETTINGS_INDEX + eid + "]"
+        if lang['menuDouble']:
+            slots.append((name + "[0]", obj[eid]['text2'][0]))
+            slots.append((name + "[1]", obj[eid]['text2'][1]))
+        else:
+            # Second line is never read for single line names, left as NULL
+            slots.append((name + "[0]", obj[eid]['text']))
+            slots.append((name + "[1]", None))
+
+    obj = lang['menuGroups']
+    for i, mod in enumerate(defs['menuGroups']):
+        eid = mod['id']
+        slots.append(("SettingsMenuEntries[%d]" % i,
+                      obj[eid]['text2'][0] + "\\n" + obj[eid]['text2'][1]))
+    for i, mod in enumerate(defs['menuGroups']):
+        slots.append(("SettingsMenuEntriesDescriptions[%d]" % i, obj[mod['id']]['desc']))
+    return slots
+
+
+def getSlotFeatures(defs):
+    # Slot name of getLanguageSlots -> the feature it depends on
+    features = {}
+    for mod in defs['menuOptions']:
+        if 'feature' in mod:
+            index = "[" + SETTINGS_INDEX + mod['id'] + "]"
+            for name in ("SettingsDescriptions", "SettingsShortNames"):
+                features[name + index] = mod['feature']
+                features[name + index + "[0]"] = mod['feature']
+                features[name + index + "[1]"] = mod['feature']
+    return features
+
+
+def writeSettingsIndexes(defs, f):
+    # Position of every menu option in SettingsDescriptions and
+    # SettingsShortNames, which leave out the options of undefined features
+    f.write(to_unicode("enum SettingsIndex {\n"))
+    for mod in defs['menuOptions']:
+        if 'feature' in mod:
+            f.write(to_unicode("#ifdef " + mod['feature'] + "\n"))
+        f.write(to_unicode("  " + SETTINGS_INDEX + mod['id'] + ",\n"))
+        if 'feature' in mod:
+            f.write(to_unicode("#endif\n"))
+    f.write(to_unicode("};\n\n"))
+
+
+def writeSlotPointer(f, name, feature):
+    # Entry of a LanguageSlots table, NULL when the feature is not defined
+    if feature is None:
+        f.write(to_unicode("  &" + name + ",\n"))
+        return
+    f.write(to_unicode("#ifdef " + feature + "\n  &" + name + ",\n#else\n  NULL,\n#endif\n"))
+
+
+def getEncodedSize(encoded):
+    # "\\x0C\\x02" -> 2 bytes, plus the null terminator
+    return len(encoded) // 4 + 1
+
+
+def getStringsSize(codec, texts):
+    # Identical literals are merged by the compiler, count each once
+    return sum(getEncodedSize(encoded) for encoded in
+               set(codec.encode(text) for text in texts if text is not None))
+
+
+def getEscapeSize(codec, texts):
+    # Bytes the code page escapes add to the strings, counted like getStringsSize
+    codePages = getCodePages(codec.symbolMap)
+    if not codePages:
+        return 0
+    escape = getPageEscape(codePages)
+    size = 0
+    for encoded in set(codec.encode(text) for text in texts if text is not None):
+        data = bytearray(getEncodedBytes(encoded))
+        i = 0
+        while i < len(data):
+            if data[i] >= escape:
+                size += 1
+                i += 1
+            i += 1
+    return size
+
+
+def getModelStrings(model, buildVersion):
+    # Strings every language block carries, TipModelStrings depend on the model
+    texts = [x[1] for x in getConstants(buildVersion) if x[1] is not None]
+    texts.extend(getTipModelEnumTS100() if model == "TS100" else getTipModelEnumTS80())
+    texts.extend(text for text in getDebugMenu(buildVersion) if text is not None)
+    return texts
+
+
+def getFontSize(symbolConversionTable, trimGlyphs=False):
+    # One USER_FONT_12 and one USER_FONT_6x8 row per code, \x01 has none
+    rows = len(set(symbolConversionTable.values())) - 1
+    if not trimGlyphs:
+        return rows * sum(fontStore.GLYPH_BYTES)
+    rowSymbols = {}
+    for sym, code in symbolConversionTable.items():
+        if code != '\\x01':
+            rowSymbols.setdefault(code, []).append(sym)
+    return (getLargeFontSize(list(rowSymbols.values()), True) +
+            rows * fontStore.GLYPH_BYTES[fontStore.FONT_SMALL])
+
+
+def getLanguageSizes(languageCode, defs, lang, codec, buildVersion, compressedSize=None,
+                     trimGlyphs=False, pool=False):
+    # Flash used by the block of a language, per model. compressedSize
+    # replaces the translated strings when they are Huffman coded, or with
+    # pool all the strings but the tip names
+    import sizeReport
+    slots = getLanguageSlots(defs, lang)
+    offsetSlots = 0
+    if pool:
+        slots = [slot for slot in slots if slot[0].split("[")[0] not in UNUSED_POOL_SLOTS]
+        offsetSlots = len([name for name, _ in slots if name.split("[")[0] in POOL_OFFSET_TABLES])
+    sizes = []
+    for model in MODELS:
+        texts = getModelStrings(model, buildVersion)
+        if compressedSize is None:
+            strings = getStringsSize(codec, [text for _, text in slots] + texts)
+        elif pool:
+            strings = compressedSize + getStringsSize(
+                codec, getTipModelEnumTS100() if model == "TS100" else getTipModelEnumTS80())
+        else:
+            strings = compressedSize + getStringsSize(codec, texts)
+        sizes.append(sizeReport.makeRow(
+            languageCode, model, getFontSize(codec.symbolMap, trimGlyphs), strings,
+            POINTER_SIZE * (len(slots) - offsetSlots + len(texts)) +
+            POOL_OFFSET_SIZE * offsetSlots,
+            getEscapeSize(codec, [text for _, text in slots] + texts)))
+    return sizes
+
+
+def getMultiLanguageReport(langCodes, langDict, defs, codec, buildVersion):
+    # Marginal flash cost of each language, added in the given order
+    store = fontStore.getFontStore()
+    glyphRows = set()
+    report = []
+    for langCode in langCodes:
+        lang = langDict[langCode]
+        rowsBefore = len(glyphRows)
+        for sym in countSymbols(getTextList(defs, lang, buildVersion)):
+            glyphRows.add((bytes(store.getGlyph(fontStore.FONT_LARGE, sym)),
+                           bytes(store.getGlyph(fontStore.FONT_SMALL, sym))))
+        slots = getLanguageSlots(defs, lang)
+        report.append({
+            'language': langCode,
+            'font': (len(glyphRows) - rowsBefore) * sum(fontStore.GLYPH_BYTES),
+            'strings': getStringsSize(codec, [text for _, text in slots]),
+            'table': POINTER_SIZE * len(slots),
+        })
+    return report
+
+
+def printMultiLanguageReport(report):
+    # What each language adds and the running total. The flash left for the
+    # translations is checked on the size report rows, see --flash-budget
+    print("Language    Font Strings  Table  Added  Total")
+    total = 0
+    for row in report:
+        added = row['font'] + row['strings'] + row['table']
+        total += added
+        print("{:<8} {:>7} {:>7} {:>6} {:>6} {:>6}".format(
+            row['language'], row['font'], row['strings'], row['table'], added, total))
+
+
+def writeMultiLanguage(langCodes, langDict, defs, f, buildVersion, trimGlyphs=False):
+    # One block carrying several languages: a single font table built from
+    # the union of their symbols and one string table per language. The
+    # first language is active at boot, selectLanguage() switches at runtime
+    import sizeReport
+    print("Generating multi language block for " + ", ".join(langCodes))
+    symbolCounts = countSymbols(langCodes)  # LanguageNames
+    for langCode in langCodes:
+        countSymbols(getTextList(defs, langDict[langCode], buildVersion), symbolCounts)
+    symbols = sortSymbolCounts(symbolCounts)
+    if buildVersion is None:
+        symbols = forceVolatileSymbols(symbols)
+    (fontTableText, symbolConversionTable) = getFontMapAndTable(symbols, trimGlyphs)
+    if buildVersion is None:
+        checkVolatileSymbols(symbolConversionTable)
+    codec = SymbolCodec(symbolConversionTable)
+
+    f.write(to_unicode("\n#ifdef LANG_MULTI\n"))
+    f.write(fontTableText)
+    f.write(to_unicode("// ---- " + " ".join(langCodes) + " ----\n\n"))
+
+    writeLanguageStrings(langDict[langCodes[0]], defs, codec, f, buildVersion, "")
+    writeSettingsIndexes(defs, f)
+
+    # ----- Writing the string table of every language
+    for langCode in langCodes:
+        f.write(to_unicode("static const char* const LanguageStrings_" + langCode + "[] = {\n"))
+        for name, text in getLanguageSlots(defs, langDict[langCode]):
+            if text is None:
+                f.write(to_unicode("  /* " + name + " */ NULL,\n"))
+                continue
+            f.write(to_unicode("  /* " + name + " */ \"" + codec.encode(text) + "\"," +
+                               "//{} \n".format(text.replace('\n', '_'))))
+        f.write(to_unicode("};\n\n"))
+
+    f.write(to_unicode("static const char* const* const LanguageStrings[] = {\n"))
+    for langCode in langCodes:
+        f.write(to_unicode("  LanguageStrings_" + langCode + ",\n"))
+    f.write(to_unicode("};\n\n"))
+
+    f.write(to_unicode("static const enum ShortNameType LanguageShortNameTypes[] = {\n"))
+    for langCode in langCodes:
+        f.write(to_unicode("  SHORT_NAME_" + ("DOUBLE" if langDict[langCode]['menuDouble']
+                                              else "SINGLE") + "_LINE,\n"))
+    f.write(to_unicode("};\n\n"))
+
+    f.write(to_unicode("const char* const LanguageNames[] = {\n"))
+    for langCode in langCodes:
+        f.write(to_unicode("  \"" + codec.encode(langCode) + "\",//{} \n".format(langCode)))
+    f.write(to_unicode("};\n"))
+    f.write(to_unicode("const uint8_t LanguageCount = " + str(len(langCodes)) + ";\n\n"))
+
+    # ----- Writing where each string of a table goes, NULL skips the
+    # options of undefined features
+    features = getSlotFeatures(defs)
+    f.write(to_unicode("static const char** const LanguageSlots[] = {\n"))
+    for name, _ in getLanguageSlots(defs, langDict[langCodes[0]]):
+        writeSlotPointer(f, name, features.get(name))
+    f.write(to_unicode("};\n\n"))
+
+    f.write(to_unicode("""void selectLanguage(uint8_t index) {
+	if (index >= LanguageCount) {
+		return;
+	}
+	for (uint16_t i = 0; i < sizeof(LanguageSlots) / sizeof(LanguageSlots[0]); i++) {
+		if (LanguageSlots[i] != NULL) {
+			*LanguageSlots[i] = LanguageStrings[index][i];
+		}
+	}
+	SettingsShortNameType = LanguageShortNameTypes[index];
+}
+"""))
+
+    # ----- Block end
+    f.write(to_unicode("#endif\n"))
+    codec.reportMissing()
+    report = getMultiLanguageReport(langCodes, langDict, defs, codec, buildVersion)
+    printMultiLanguageReport(report)
+
+    # Everything in the block: the globals, every table and the lookup arrays
+    tables = sum(row['strings'] + row['table'] for row in report)
+    sizes = []
+    for model in MODELS:
+        texts = getModelStrings(model, buildVersion) + langCodes
+        slots = getLanguageSlots(defs, langDict[langCodes[0]])
+        sizes.append(sizeReport.makeRow(
+            MULTI_LANGUAGE, model, getFontSize(symbolConversionTable, trimGlyphs),
+            tables + getStringsSize(codec, texts) + len(langCodes),
+            POINTER_SIZE * (2 * len(slots) + len(texts) + len(langCodes)),
+            getEscapeSize(codec, texts + [text for langCode in langCodes for _, text in
+                                          getLanguageSlots(defs, langDict[langCode])])))
+    return sizes, getCodePages(symbolConversionTable)
+
+
+def getPackSlots(defs, lang, buildVersion):
+    # Every string a language pack carries, as (variable holding it, source
+    # text, model or None). The tip names of both models are in every pack,
+    # the version and date of --reproducible are not
+    slots = [(name, text, None) for name, text in getLanguageSlots(defs, lang)]
+    slots.extend((name, text, None) for name, text in getConstants(buildVersion)
+                 if text is not None)
+    slots.extend(("DebugMenu[%d]" % i, text, None)
+                 for i, text in enumerate(getDebugMenu(buildVersion)) if text is not None)
+    for model, texts in (("TS100", getTipModelEnumTS100()), ("TS80", getTipModelEnumTS80())):
+        slots.extend(("TipModelStrings[%d]" % i, text, model) for i, text in enumerate(texts))
+    return slots
+
+
+def getPackSlotLayout(slots):
+    import languagePack
+    return languagePack.getSlotLayout([name + ("@" + model if model else "")
+                                       for name, _, model in slots])
+
+
+def getFontTables(symbolConversionTable):
+    # USER_FONT_12 and USER_FONT_6x8 as bytes, one row per code from \x02 up
+    store = fontStore.getFontStore()
+    symbolOfCode = {}
+    for sym, code in symbolConversionTable.items():
+        if code != '\\x01':
+            symbolOfCode.setdefault(code, sym)
+    symbols = [symbolOfCode[code] for code in
+               sorted(symbolOfCode, key=lambda code: getEncodedBytes(code))]
+    return [b"".join(bytes(store.getGlyph(font, sym)) for sym in symbols)
+            for font in (fontStore.FONT_LARGE, fontStore.FONT_SMALL)]
+
+
+def renderPack(languageCode, lang, defs, buildVersion):
+    # The language pack of a language and its size report rows
+    import sizeReport
+    import languagePack
+    print("Generating language pack for " + languageCode)
+    defs = getLanguageDefs(defs)
+    with profilePhase("letterCounts", languageCode):
+        textList = getLetterCounts(defs, lang, buildVersion)
+    with profilePhase("fontTable", languageCode):
+        (_, symbolConversionTable) = getFontMapAndTable(textList)
+        if getCodePages(symbolConversionTable):
+            raise ValueError(languageCode + ": needs code pages, which language packs "
+                                            "do not support")
+        if buildVersion is None:
+            checkVolatileSymbols(symbolConversionTable)
+        fontLarge, fontSmall = getFontTables(symbolConversionTable)
+    codec = SymbolCodec(symbolConversionTable)
+
+    with profilePhase("strings", languageCode):
+        slots = getPackSlots(defs, lang, buildVersion)
+        strings = [None if text is None else getEncodedBytes(codec.encode(text))
+                   for _, text, _ in slots]
+        pack = languagePack.buildPack(
+            languageCode, 2 if lang['menuDouble'] else 1, getPackSlotLayout(slots),
+            fontLarge, fontSmall, strings, len(fontLarge) // fontStore.GLYPH_BYTES[0])
+    codec.reportMissing()
+
+    font = len(fontLarge) + len(fontSmall)
+    table = languagePack.getIndexSize(len(strings))
+    sizes = [sizeReport.makeRow(languageCode, model, font,
+                                len(pack) - font - table, table) for model in MODELS]
+    return pack, sizes, 0
+
+
+def writePackLanguage(lang, defs, f, buildVersion):
+    # The block of the lang=PACK firmware: every string variable, empty
+    # until loadLanguagePack() points it into the pack flashed at
+    # LanguagePack. lang only gives the slot names, the same for every language
+    import sizeReport
+    import languagePack
+    print("Generating language pack loader block")
+    defs = getLanguageDefs(defs)
+    slots = getPackSlots(defs, lang, buildVersion)
+    empty = lambda count: ", ".join(["EmptyString"] * count)
+
+    f.write(to_unicode("\n#ifdef LANG_" + PACK_LANGUAGE + "\n"))
+    f.write(to_unicode("// ---- language pack, see languagePack.py ----\n\n"))
+    f.write(to_unicode("extern \"C\" const uint8_t LanguagePack[];  "
+                       "// at LANGUAGE_PACK_ADDRESS of the Makefile\n"))
+    f.write(to_unicode("static const char EmptyString[] = \"\";\n"))
+    f.write(to_unicode("const uint8_t* USER_FONT_12 = LanguagePack;\n"))
+    f.write(to_unicode("const uint8_t* USER_FONT_6x8 = LanguagePack;\n\n"))
+
+    # ----- Writing the string variables
+    f.write(to_unicode("const char* SettingsDescriptions[] = {\n"))
+    for mod in defs['menuOptions']:
+        if 'feature' in mod:
+            f.write(to_unicode("#ifdef " + mod['feature'] + "\n"))
+        f.write(to_unicode("  EmptyString,\n"))
+        if 'feature' in mod:
+            f.write(to_unicode("#endif\n"))
+    f.write(to_unicode("};\n\n"))
+
+    for mod in defs['messages'] + defs['characters']:
+        f.write(to_unicode("const char* " + mod['id'] + " = EmptyString;\n"))
+    if buildVersion is None:
+        f.write(to_unicode("extern const char " + VOLATILE_VERSION + "[];\n"))
+        f.write(to_unicode("extern const char " + VOLATILE_DATE + "[];\n"))
+    for name, text in getConstants(buildVersion):
+        f.write(to_unicode("const char* " + name + " = " +
+                           ("EmptyString" if text is not None else VOLATILE_VERSION) + ";\n"))
+    f.write(to_unicode("\n"))
+
+    f.write(to_unicode("const char* TipModelStrings[] = {\n"))
+    f.write(to_unicode("#ifdef MODEL_TS100\n"))
+    f.write(to_unicode("  " + empty(len(getTipModelEnumTS100())) + ",\n"))
+    f.write(to_unicode("#else\n"))
+    f.write(to_unicode("  " + empty(len(getTipModelEnumTS80())) + ",\n"))
+    f.write(to_unicode("#endif\n"))
+    f.write(to_unicode("};\n\n"))
+    f.write(to_unicode("const char* DebugMenu[] = {\n"))
+    f.write(to_unicode("  " + ", ".join("EmptyString" if text is not None else VOLATILE_DATE
+                                        for text in getDebugMenu(buildVersion)) + ",\n"))
+    f.write(to_unicode("};\n\n"))
+
+    f.write(to_unicode("enum ShortNameType SettingsShortNameType = SHORT_NAME_SINGLE_LINE;\n"))
+    f.write(to_unicode("const char* SettingsShortNames[][2] = {\n"))
+    for mod in defs['menuOptions']:
+        if 'feature' in mod:
+            f.write(to_unicode("#ifdef " + mod['feature'] + "\n"))
+        f.write(to_unicode("  { " + empty(2) + " },\n"))
+        if 'feature' in mod:
+            f.write(to_unicode("#endif\n"))
+    f.write(to_unicode("};\n\n"))
+
+    count = len(defs['menuGroups'])
+    f.write(to_unicode("const char* SettingsMenuEntries[" + str(count) + "] = {\n"))
+    f.write(to_unicode("  " + empty(count) + ",\n"))
+    f.write(to_unicode("};\n\n"))
+    f.write(to_unicode("const char* SettingsMenuEntriesDescriptions[" + str(count) + "] = {\n"))
+    f.write(to_unicode("  " + empty(count) + ",\n"))
+    f.write(to_unicode("};\n\n"))
+
+    # ----- Writing where each string of a pack goes, NULL skips the tip
+    # names of the other model and the options of undefined features
+    writeSettingsIndexes(defs, f)
+    features = getSlotFeatures(defs)
+    f.write(to_unicode("static const char** const LanguageSlots[] = {\n"))
+    for name, _, model in slots:
+        if model is None:
+            writeSlotPointer(f, name, features.get(name))
+    f.write(to_unicode("#ifdef MODEL_TS100\n"))
+    for name, _, model in slots:
+        if model is not None:
+            f.write(to_unicode("  " + ("&" + name if model == "TS100" else "NULL") + ",\n"))
+    f.write(to_unicode("#else\n"))
+    for name, _, model in slots:
+        if model is not None:
+            f.write(to_unicode("  " + ("&" + name if model == "TS80" else "NULL") + ",\n"))
+    f.write(to_unicode("#endif\n"))
+    f.write(to_unicode("};\n\n"))
+
+    f.write(to_unicode(languagePack.HEADER_C + "\n"))
+    f.write(to_unicode("""bool loadLanguagePack() {
+	const struct LanguagePackHeader *header = (const struct LanguagePackHeader *) LanguagePack;
+	const uint16_t slotCount = sizeof(LanguageSlots) / sizeof(LanguageSlots[0]);
+	if (header->magic != %s || header->version != %d || header->slotCount != slotCount
+			|| header->layout != 0x%08X || header->size > %d) {
+		return false;
+	}
+	uint32_t checksum = 0;
+	for (uint32_t i = sizeof(struct LanguagePackHeader); i < header->size; i++) {
+		checksum += LanguagePack[i];
+	}
+	if (checksum != header->checksum) {
+		return false;
+	}
+	const uint16_t *offsets = (const uint16_t *) (header + 1);
+	for (uint16_t i = 0; i < slotCount; i++) {
+		if (LanguageSlots[i] != NULL) {
+			*LanguageSlots[i] = offsets[i] == 0x%04X ? NULL : (const char *) LanguagePack + offsets[i];
+		}
+	}
+	USER_FONT_12 = LanguagePack + header->font12;
+	USER_FONT_6x8 = LanguagePack + header->font6x8;
+	SettingsShortNameType = (enum ShortNameType) header->shortNameType;
+	return true;
+}
+""" % (languagePack.getMagicC(), languagePack.PACK_VERSION, getPackSlotLayout(slots),
+       languagePack.PACK_SIZE, languagePack.NULL_OFFSET)))
+
+    # ----- Block end
+    f.write(to_unicode("#endif\n"))
+
+    # The variables and the slot table, the strings are in the packs
+    sizes = []
+    for model in MODELS:
+        variables = len([slot for slot in slots if slot[2] in (None, model)])
+        sizes.append(sizeReport.makeRow(PACK_LANGUAGE, model, 0, 1,
+                                        POINTER_SIZE * (variables + len(slots) + 2)))
+    return sizes, 0
+
+
+def writeUnit(languageCode, lang, unit, f, compress=False, codePages=0, trimGlyphs=False,
+              pool=False):
+    print("Generating unit block for " + languageCode)
+    try:
+        langName = lang['languageLocalName']
+    except KeyError:
+        langName = languageCode
+    f.write(to_unicode("  #ifdef LANG_" + languageCode + "\n"))
+    if unit: 
+        f.write(to_unicode("    #define  ENABLED_FAHRENHEIT_SUPPORT" + "\n"))
+    else: f.write(to_unicode("    //#define  ENABLED_FAHRENHEIT_SUPPORT" + "\n"))
+    if compress:
+        f.write(to_unicode("    #define  TRANSLATION_COMPRESSED" + "\n"))
+    if pool:
+        f.write(to_unicode("    #define  TRANSLATION_POOLED" + "\n"))
+    writeGlyphsTrimmed(f, trimGlyphs)
+    writePageEscape(f, codePages)
+    # ----- Block end
+    f.write(to_unicode("  #endif /* ---- " + langName + " ---- */\n"))
+
+
+def writePageEscape(f, codePages):
+    # Lets OLED::print tell the code page escapes from the one byte codes
+    if codePages:
+        f.write(to_unicode("    #define  TRANSLATION_PAGE_ESCAPE 0x%0.2X\n" % getPageEscape(codePages)))
+
+
+def writeGlyphsTrimmed(f, trimGlyphs):
+    # Lets OLED::drawChar expand the trimmed USER_FONT_12 glyphs
+    if trimGlyphs:
+        f.write(to_unicode("    #define  TRANSLATION_GLYPHS_TRIMMED" + "\n"))
+
+
+def writeMultiUnit(langCodes, UnitDict, f, codePages=0, trimGlyphs=False):
+    # Fahrenheit is available when any of the languages enables it
+    print("Generating unit block for " + ", ".join(langCodes))
+    f.write(to_unicode("  #ifdef LANG_MULTI\n"))
+    if any(UnitDict[langCode] for langCode in langCodes):
+        f.write(to_unicode("    #define  ENABLED_FAHRENHEIT_SUPPORT" + "\n"))
+    else: f.write(to_unicode("    //#define  ENABLED_FAHRENHEIT_SUPPORT" + "\n"))
+    writeGlyphsTrimmed(f, trimGlyphs)
+    writePageEscape(f, codePages)
+    f.write(to_unicode("  #endif /* ---- " + " ".join(langCodes) + " ---- */\n"))
+
+
+def writePackUnit(langCodes, UnitDict, f):
+    # Fahrenheit is available when any of the packs enables it
+    print("Generating unit block for the language packs")
+    f.write(to_unicode("  #ifdef LANG_" + PACK_LANGUAGE + "\n"))
+    if any(UnitDict[langCode] for langCode in langCodes):
+        f.write(to_unicode("    #define  ENABLED_FAHRENHEIT_SUPPORT" + "\n"))
+    else: f.write(to_unicode("    //#define  ENABLED_FAHRENHEIT_SUPPORT" + "\n"))
+    f.write(to_unicode("  #endif /* ---- language packs ---- */\n"))
+
+def readVersion(jsonDir):
+    with open(os.path.relpath(jsonDir + 
+    "/../workspace/TS100/version.h"),"r") as version_file:
+        try: 
+            for line in version_file:
+                if re.findall(r'^.*(?<=(#define)).*(?<=(BUILD_VERSION))', line):
+                    line = re.findall(r'\"(.+?)\"',line)
+                    if line: 
+                        version = line[0]
+                        try: version += "."+ subprocess.check_output(
+                            ["git","rev-parse", "--short=7", "HEAD"]).strip().decode('ascii').upper()
+                            # --short=7: the shorted hash with 7 digits. Increase/decrease if needed!
+                        except OSError: version += " git"
+        finally: 
+            if version_file: 
+                version_file.close(); 
+                return version
+
+def read_opts():
+    """ Reading input parameters
+    First parameter = json directory
+    Second parameter = translation file
+    Third paramter = unit file
+    -l / --languages = only generate these language codes (E.g. : FR or EN,DE)
+    --split = write one translation file per language (Translation_XX.cpp)
+    --depfile = write a makefile fragment listing the inputs of the outputs
+    --no-cache = always regenerate, even if no input changed
+    -j / --jobs = number of processes generating languages in parallel
+    --size-report = write the flash used per language and model (.json / .csv)
+    --flash-budget / --size-baseline / --max-growth = fail when it grows too much
+    --multi = one block with all the languages, selectable at runtime
+    --compress = store the strings Huffman coded, inflated into RAM at boot
+    --check-widths = fail when a string is longer than translations_def.js allows
+    --profile = print the time and allocations of every step of the generation
+    --profile-stats / --profile-memory = also dump cProfile stats / a tracemalloc snapshot
+    --watch = keep running and regenerate the changed languages on every change
+    --packs = write a language pack per language and the LANG_PACK block loading them
+    --compress-glyphs = store the large font glyphs without their empty columns
+    --pool-strings = store the strings in one pool, with u16 offset tables
+    --reproducible = keep the build version and date out of the language blocks
+    --build-version = use this version instead of version.h and git
+    """
+    parser = argparse.ArgumentParser(
+        description="Generate the firmware translation sources")
+    parser.add_argument("jsonDir", nargs="?",
+                        help="directory holding the translation_xx.json files "
+                             "(default: the directory of this script)")
+    parser.add_argument("outFileTranslationCPP", nargs="?",
+                        help="output translation file")
+    parser.add_argument("outFileUnitH", nargs="?",
+                        help="output unit header")
+    parser.add_argument("-l", "--languages", action="append", default=[],
+                        help="language code(s) to generate, comma separated "
+                             "or repeated (default: all languages)")
+    parser.add_argument("--split", action="store_true",
+                        help="write one Translation_XX.cpp per language "
+                             "instead of a single file")
+    parser.add_argument("--depfile",
+                        help="write make dependency rules for the outputs "
+                             "to this file")
+    parser.add_argument("--cache-dir",
+                        help="where to keep the generation stamps "
+                             "(default: {json dir}/" + CACHE_DIR + ")")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="regenerate even if the inputs did not change")
+    parser.add_argument("--multi", action="store_true",
+                        help="generate a single LANG_" + MULTI_LANGUAGE + " block "
+                             "holding all the languages with a shared font")
+    parser.add_argument("--packs", metavar="DIR",
+                        help="write every language as a language pack "
+                             "(language_XX.hex) to this directory and generate "
+                             "the LANG_" + PACK_LANGUAGE + " block loading them")
+    parser.add_argument("--compress", action="store_true",
+                        help="store the strings of every language Huffman coded, "
+                             "decompressed into RAM at boot")
+    parser.add_argument("--compress-glyphs", action="store_true",
+                        help="store the USER_FONT_12 glyphs without their empty "
+                             "columns, with an offset table")
+    parser.add_argument("--pool-strings", action="store_true",
+                        help="store the strings of every language in one pool, "
+                             "merging duplicates and shared endings, with u16 "
+                             "offsets instead of pointer tables")
+    parser.add_argument("--reproducible", action="store_true",
+                        help="write the build version and date to " + VOLATILE_CPP +
+                             " only, so the language blocks are the same on every "
+                             "build (the date honours SOURCE_DATE_EPOCH)")
+    parser.add_argument("--build-version",
+                        help="build version to embed instead of the one of "
+                             "version.h and git")
+    parser.add_argument("--size-report",
+                        help="write the flash bytes of every language and model "
+                             "to this .json or .csv file")
+    parser.add_argument("--flash-budget", type=int,
+                        help="fail when a language needs more bytes than this")
+    parser.add_argument("--size-baseline",
+                        help="size report to compare against")
+    parser.add_argument("--max-growth", type=int, default=0,
+                        help="bytes a language may grow compared to "
+                             "--size-baseline (default: 0)")
+    parser.add_argument("--check-widths", action="store_true",
+                        help="list the strings longer than translations_def.js "
+                             "allows and fail when there are any")
+    parser.add_argument("--profile", action="store_true",
+                        help="print the time and allocations of each step, "
+                             "per language (generates on one process)")
+    parser.add_argument("--profile-stats",
+                        help="with --profile, dump cProfile statistics to this "
+                             "file (read with pstats)")
+    parser.add_argument("--profile-memory",
+                        help="with --profile, trace allocations and dump a "
+                             "tracemalloc snapshot to this file")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running, regenerating the changed languages "
+                             "whenever an input changes")
+    parser.add_argument("--watch-interval", type=float, default=0.2,
+                        help="seconds between two checks of the inputs "
+                             "with --watch (default: 0.2)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="generate languages on this many processes, "
+                             "0 uses every core (default: 1)")
+    opts = parser.parse_args()
+
+    if opts.jsonDir is None:
+        opts.jsonDir = os.path.relpath(os.path.dirname(os.path.abspath(__file__)))
+    if not os.path.isfile(os.path.join(opts.jsonDir, "translations_def.js")):
+        print("error: no translations_def.js in " + os.path.abspath(opts.jsonDir))
+        sys.exit(1)
+
+    if opts.outFileTranslationCPP is None:
+        outDir = os.path.relpath(opts.jsonDir + "/../workspace/TS100/Core/Src")
+        opts.outFileTranslationCPP = os.path.join(outDir, TRANSLATION_CPP)
+
+    if opts.outFileUnitH is None:
+        outDir = os.path.relpath(opts.jsonDir + "/../workspace/TS100/Core/Inc")
+        opts.outFileUnitH = os.path.join(outDir, UNIT_H)
+
+    if opts.cache_dir is None:
+        opts.cache_dir = os.path.join(opts.jsonDir, CACHE_DIR)
+
+    langCodes = []
+    for arg in opts.languages:
+        for code in arg.split(","):
+            code = code.strip().upper()
+            if code and code not in langCodes:
+                langCodes.append(code)
+    opts.languages = langCodes
+
+    if opts.jobs < 0:
+        parser.error("--jobs must be 0 or more")
+    if opts.compress and opts.multi:
+        parser.error("--compress can not be combined with --multi")
+    if opts.packs and (opts.multi or opts.compress or opts.compress_glyphs):
+        parser.error("--packs can not be combined with --multi, --compress or "
+                     "--compress-glyphs")
+    if opts.pool_strings and (opts.multi or opts.compress or opts.packs):
+        parser.error("--pool-strings can not be combined with --multi, --compress or --packs")
+    epoch = os.environ.get("SOURCE_DATE_EPOCH")
+    if epoch and not epoch.isdigit():
+        parser.error("SOURCE_DATE_EPOCH must be a number of seconds")
+    if (opts.profile_stats or opts.profile_memory) and not opts.profile:
+        parser.error("--profile-stats and --profile-memory need --profile")
+    if opts.watch and (opts.profile or opts.depfile):
+        parser.error("--watch can not be combined with --profile or --depfile")
+    if opts.profile:
+        # Steps running on pool workers would not be seen
+        opts.jobs = 1
+
+    return opts
+
+
+def orderOutput(langDict):
+    # These languages go first (when they are being generated)
+    mandatoryOrder = [key for key in ['EN'] if key in langDict]
+
+    # Then add all others in alphabetical order
+    sortedKeys = sorted(langDict.keys())
+
+    # Add the rest as they come
+    for key in sortedKeys:
+        if key not in mandatoryOrder:
+            mandatoryOrder.append(key)
+
+    return mandatoryOrder
+
+
+def getSplitFileName(outFileTranslationCPP, languageCode):
+    # Translation.cpp -> Translation_FR.cpp
+    base, ext = os.path.splitext(outFileTranslationCPP)
+    return base + "_" + languageCode + ext
+
+
+def writeIfChanged(fileName, text):
+    # Only touch the file when its content differs, so make keeps the objects.
+    # Overlapping runs (--jobs, buildFirmware.py) never see a partial file
+    from atomicWrite import writeAtomic
+    data = text.encode('utf-8')
+    try:
+        with open(fileName, 'rb') as f:
+            if f.read() == data:
+                return False
+    except IOError:
+        pass
+    writeAtomic(fileName, data)
+    return True
+
+
+def getOutputFiles(outFileTranslationCPP, outFileUnitH, langCodes, split=False,
+                   reproducible=False):
+    if split:
+        outFiles = [getSplitFileName(outFileTranslationCPP, langCode)
+                    for langCode in langCodes]
+    else:
+        outFiles = [outFileTranslationCPP]
+    outFiles.append(outFileUnitH)
+    if reproducible:
+        outFiles.append(getVolatileFileName(outFileTranslationCPP))
+    return outFiles
+
+
+def getInputFiles(jsonDir, langCodes=None):
+    # Every file whose content ends up in the generated sources
+    scriptDir = os.path.dirname(os.path.abspath(__file__))
+    inputFiles = [os.path.abspath(__file__),
+                  os.path.join(scriptDir, "fontTables.py"),
+                  os.path.join(scriptDir, "fontStore.py"),
+                  os.path.join(scriptDir, "stringCompression.py"),
+                  os.path.join(scriptDir, "widthCheck.py"),
+                  os.path.join(scriptDir, "translationStore.py"),
+                  os.path.join(scriptDir, "languagePack.py"),
+                  os.path.normpath(os.path.join(scriptDir, "..", "Bootup Logo",
+                                                "python_logo_converter", "intel_hex.py")),
+                  os.path.join(scriptDir, "glyphCompression.py"),
+                  os.path.join(scriptDir, "stringPool.py"),
+                  os.path.join(jsonDir, "translations_def.js")]
+    inputFiles.extend(os.path.join(jsonDir, fileName)
+                      for fileName in getTranslationFiles(jsonDir, langCodes))
+    return inputFiles
+
+
+def getTargetFiles(opts, blockCodes, langCodes=()):
+    # Every file a run writes, the stamp covers them all
+    outFiles = getOutputFiles(opts.outFileTranslationCPP, opts.outFileUnitH, blockCodes, opts.split,
+                              opts.reproducible)
+    if opts.packs:
+        outFiles.extend(getPackFileName(opts.packs, langCode) for langCode in langCodes)
+    if opts.size_report:
+        outFiles.append(opts.size_report)
+    return outFiles
+
+
+def getTargetHash(opts, buildVersion, inputFiles, outFiles):
+    return getInputHash(inputFiles + ([opts.size_baseline] if opts.size_baseline else []),
+                        outFiles,
+                        [buildVersion, getBuildDate(), str(opts.split), str(opts.multi),
+                         str(opts.flash_budget), str(opts.max_growth), str(opts.compress),
+                         str(opts.check_widths), str(opts.packs), str(opts.compress_glyphs),
+                         str(opts.reproducible), str(opts.pool_strings)])
+
+
+def getInputHash(inputFiles, outFiles, extra):
+    # Content hash of everything the generated output depends on
+    h = hashlib.sha256()
+    for fileName in inputFiles:
+        h.update(os.path.basename(fileName).encode('utf-8') + b"\0")
+        with open(fileName, 'rb') as f:
+            h.update(f.read())
+        h.update(b"\0")
+    for item in list(outFiles) + list(extra):
+        h.update(to_unicode(item).encode('utf-8') + b"\0")
+    return h.hexdigest()
+
+
+def getStampFile(cacheDir, outFiles):
+    # One stamp per set of outputs, so different targets do not evict each other
+    key = "\n".join(os.path.abspath(x) for x in outFiles).encode('utf-8')
+    return os.path.join(cacheDir, "generate_" + hashlib.sha1(key).hexdigest()[:12])
+
+
+def isCacheHit(stampFile, inputHash, outFiles):
+    try:
+        with open(stampFile, 'r') as f:
+            if f.read().strip() != inputHash:
+                return False
+    except IOError:
+        return False
+    return all(os.path.exists(x) for x in outFiles)
+
+
+def writeStamp(stampFile, inputHash):
+    stampDir = os.path.dirname(stampFile)
+    if stampDir and not os.path.isdir(stampDir):
+        os.makedirs(stampDir)
+    writeIfChanged(stampFile, inputHash + "\n")
+
+
+def escapeMake(fileName):
+    return fileName.replace("$", "$$").replace("#", "\\#").replace(" ", "\\ ")
+
+
+def getMakeStampFile(depFile):
+    # Core/Src/Translation.d -> Core/Src/Translation.stamp
+    return os.path.splitext(depFile)[0] + ".stamp"
+
+
+def touchFile(fileName):
+    with open(fileName, 'a'):
+        os.utime(fileName, None)
+
+
+def writeDepfile(depFile, outFiles, inputFiles, command):
+    """
+    Makefile fragment in the style of gcc -MP, all paths relative to the
+    directory the generator was run from. The recipe builds a stamp file,
+    which every run touches, and the outputs depend on it with an empty
+    recipe: make runs the generator once for all the outputs, also under -j,
+    and as writeIfChanged leaves unchanged outputs with their old time make
+    re-reads them instead of running the generator again on every build
+    """
+    stampFile = escapeMake(os.path.relpath(getMakeStampFile(depFile)))
+    outFiles = [escapeMake(os.path.relpath(x)) for x in outFiles]
+    inputFiles = [escapeMake(os.path.relpath(x)) for x in inputFiles]
+    lines = ["# Generated by make_translation.py, do not edit"]
+    lines.append(" ".join(outFiles) + ": " + stampFile + " ;")
+    lines.append("")
+    lines.append(stampFile + ": " + " \\\n ".join(inputFiles))
+    lines.append("\t" + " ".join(shlex.quote(x) for x in command).replace("$", "$$"))
+    for fileName in inputFiles:
+        lines.append("")
+        lines.append(fileName + ":")
+    writeIfChanged(depFile, "\n".join(lines) + "\n")
+    touchFile(getMakeStampFile(depFile))
+
+
+def renderLanguage(languageCode, lang, defs, buildVersion, compress=False, trimGlyphs=False,
+                   pool=False):
+    f = io.StringIO()
+    sizes, codePages = writeLanguage(languageCode, lang, defs, f, buildVersion, compress,
+                                     trimGlyphs, pool)
+    return f.getvalue(), sizes, codePages
+
+
+def renderMultiLanguage(langCodes, langDict, defs, buildVersion, trimGlyphs=False):
+    f = io.StringIO()
+    sizes, codePages = writeMultiLanguage(langCodes, langDict, defs, f, buildVersion, trimGlyphs)
+    return f.getvalue(), sizes, codePages
+
+
+def renderPackLanguage(lang, defs, buildVersion):
+    f = io.StringIO()
+    sizes, codePages = writePackLanguage(lang, defs, f, buildVersion)
+    return f.getvalue(), sizes, codePages
+
+
+def getPackFileName(packDir, languageCode):
+    return os.path.join(packDir, "language_" + languageCode + ".hex")
+
+
+def getVolatileFileName(outFileTranslationCPP):
+    return os.path.join(os.path.dirname(outFileTranslationCPP), VOLATILE_CPP)
+
+
+def renderVolatile(buildVersion):
+    """
+    TranslationVolatile.cpp of --reproducible: the build version and date,
+    which would otherwise change the language blocks on every build. Raises
+    ValueError when they use symbols outside VOLATILE_SYMBOLS
+    """
+    codec = SymbolCodec(getVolatileSymbolMap())
+    f = io.StringIO()
+    writeStart(f)
+    f.write(to_unicode("// Build version and date, kept out of the language blocks\n"))
+    for name, text in ((VOLATILE_VERSION, buildVersion), (VOLATILE_DATE, getBuildDate())):
+        encoded = codec.encode(text)
+        if codec.missing:
+            raise ValueError("{} uses {}, only \"{}\" can be drawn by every language, "
+                             "see --build-version".format(text, "".join(sorted(codec.missing)),
+                                                          VOLATILE_SYMBOLS))
+        f.write(to_unicode("extern const char " + name + "[] = \"" + encoded + "\";" +
+                           "//{} \n".format(text)))
+    return f.getvalue()
+
+
+class CompiledTranslations(object):
+    """
+    Generated sources of one compile: the block of every language (or the
+    single LANG_MULTI or LANG_PACK block), the unit.h text, the size report
+    rows, with packs the language pack of every language and when
+    reproducible the text of TranslationVolatile.cpp
+    """
+
+    def __init__(self, blockCodes, blocks, unit, sizes, codePages, split=False, packs=None,
+                 volatile=None):
+        self.blockCodes = blockCodes
+        self.blocks = blocks
+        self.unit = unit
+        self.sizes = sizes
+        self.codePages = codePages  # block code -> code pages
+        self.split = split
+        self.packs = packs or {}  # language code -> pack bytes
+        self.volatile = volatile
+
+    def getSources(self, outFileTranslationCPP=TRANSLATION_CPP, outFileUnitH=UNIT_H,
+                   packDir=None):
+        # File name -> text, in the order of getOutputFiles, then the packs
+        # as Intel hex when packDir is given
+        import languagePack
+        sources = {}
+        if self.split:
+            # One self contained unit per language, so a build only compiles its own
+            for blockCode, block in zip(self.blockCodes, self.blocks):
+                f = io.StringIO()
+                writeStart(f)
+                f.write(block)
+                sources[getSplitFileName(outFileTranslationCPP, blockCode)] = f.getvalue()
+        else:
+            f = io.StringIO()
+            writeStart(f)
+            for block in self.blocks:
+                f.write(block)
+            sources[outFileTranslationCPP] = f.getvalue()
+        sources[outFileUnitH] = self.unit
+        if self.volatile is not None:
+            sources[getVolatileFileName(outFileTranslationCPP)] = self.volatile
+        if packDir is not None:
+            for langCode, pack in self.packs.items():
+                f = io.StringIO()
+                languagePack.writeIntelHex(f, pack)
+                sources[getPackFileName(packDir, langCode)] = f.getvalue()
+        return sources
+
+    def getStaleFiles(self, outFileTranslationCPP, sources):
+        """
+        Translation units an earlier run in another mode left next to
+        outFileTranslationCPP: the split units of other languages or of a
+        plain run, Translation.cpp of a --split run and TranslationVolatile.cpp
+        without --reproducible. The Makefile would build them against the new
+        unit.h
+        """
+        import glob
+        base, ext = os.path.splitext(outFileTranslationCPP)
+        candidates = glob.glob(glob.escape(base) + "_*" + ext)
+        candidates += [outFileTranslationCPP, getVolatileFileName(outFileTranslationCPP)]
+        return [fileName for fileName in candidates
+                if fileName not in sources and os.path.isfile(fileName)]
+
+    def write(self, outFileTranslationCPP, outFileUnitH, packDir=None):
+        # Only files whose content changed are written, returns their names.
+        # The units of the modes not in use are deleted
+        if packDir is not None and not os.path.isdir(packDir):
+            os.makedirs(packDir)
+        sources = self.getSources(outFileTranslationCPP, outFileUnitH, packDir)
+        for fileName in self.getStaleFiles(outFileTranslationCPP, sources):
+            print("Removing " + fileName)
+            os.remove(fileName)
+        return [fileName for fileName, text in sources.items() if writeIfChanged(fileName, text)]
+
+
+class TranslationCompiler(object):
+    """
+    Generates the translation sources in process. All inputs are given to
+    the constructor and only read afterwards, so a compiler can compile any
+    number of times and from several threads at once. Changed inputs need a
+    new compiler, creating one costs nothing.
+
+    langDict and UnitDict map the language codes to the parsed translation
+    files and their Fahrenheit support, defs is the parsed
+    translations_def.js. The font store is kept in cacheDir like the
+    compiled translations (default: next to fontStore.py).
+    """
+
+    def __init__(self, langDict, UnitDict, defs, buildVersion, cacheDir=None):
+        self.langDict = langDict
+        self.UnitDict = UnitDict
+        self.defs = defs
+        self.buildVersion = buildVersion
+        self.cacheDir = cacheDir
+
+    @classmethod
+    def fromDirectory(cls, jsonDir, langCodes=None, buildVersion=None, cacheDir=None):
+        """
+        Compiler for the translation files of jsonDir (only langCodes when
+        given). The version is read from version.h unless given. Raises
+        ValueError listing the problems of all files
+        """
+        import translationStore
+        langDict, UnitDict = readTranslations(jsonDir, langCodes, cacheDir)
+        defs, _ = translationStore.loadDefs(jsonDir, cacheDir)
+        if buildVersion is None:
+            buildVersion = readVersion(jsonDir)
+        return cls(langDict, UnitDict, defs, buildVersion, cacheDir)
+
+    def getLanguageCodes(self):
+        return orderOutput(self.langDict)
+
+    def render(self, langCodes=None, multi=False, compress=False, jobs=1, packs=False,
+               trimGlyphs=False, reproducible=False, pool=False):
+        """
+        Generate the blocks of langCodes (default: every language), returns
+        {block code: (text, size report rows, code pages)}. Languages are
+        independent, with jobs they are rendered on a process pool (0 uses
+        every core). With packs the languages map to their pack bytes
+        instead of a text, next to the LANG_PACK block. When reproducible
+        the blocks leave the build version and date to TranslationVolatile.cpp,
+        with pool the strings of a language are pooled
+        """
+        if langCodes is None:
+            langCodes = self.getLanguageCodes()
+        buildVersion = None if reproducible else self.buildVersion
+        fontStore.getFontStore(self.cacheDir)
+        if multi:
+            return {MULTI_LANGUAGE: renderMultiLanguage(langCodes, self.langDict, self.defs,
+                                                        buildVersion, trimGlyphs)}
+        langs = [self.langDict[langCode] for langCode in langCodes]
+        count = len(langCodes)
+        if packs:
+            renderer = renderPack
+            args = (langCodes, langs, [self.defs] * count, [buildVersion] * count)
+        else:
+            renderer = renderLanguage
+            args = (langCodes, langs, [self.defs] * count, [buildVersion] * count,
+                    [compress] * count, [trimGlyphs] * count, [pool] * count)
+        if jobs == 1 or count < 2:
+            rendered = dict(zip(langCodes, map(renderer, *args)))
+        else:
+            from concurrent.futures import ProcessPoolExecutor
+            # Workers load the store from the same cache, also when spawned
+            with ProcessPoolExecutor(max_workers=jobs or None, initializer=fontStore.getFontStore,
+                                     initargs=(self.cacheDir,)) as executor:
+                rendered = dict(zip(langCodes, executor.map(renderer, *args)))
+        if packs and self.langDict:
+            rendered[PACK_LANGUAGE] = renderPackLanguage(next(iter(self.langDict.values())),
+                                                         self.defs, buildVersion)
+        return rendered
+
+    def assemble(self, rendered, langCodes=None, split=False, multi=False, compress=False,
+                 packs=False, trimGlyphs=False, reproducible=False, pool=False):
+        # The CompiledTranslations of rendered blocks, which may come from
+        # several render() calls with the same reproducible and pool
+        if langCodes is None:
+            langCodes = self.getLanguageCodes()
+        if multi:
+            blockCodes = [MULTI_LANGUAGE]
+        elif packs:
+            blockCodes = [PACK_LANGUAGE]
+        else:
+            blockCodes = langCodes
+        codePages = dict((code, rendered[code][2]) for code in blockCodes)
+        f = io.StringIO()
+        writeStartUnit(f)
+        for langCode in langCodes:
+            writeUnit(langCode, self.langDict[langCode], self.UnitDict[langCode], f,
+                      compress, codePages.get(langCode, 0), trimGlyphs, pool)
+        if multi:
+            writeMultiUnit(langCodes, self.UnitDict, f, codePages[MULTI_LANGUAGE], trimGlyphs)
+        if packs:
+            writePackUnit(langCodes, self.UnitDict, f)
+        f.write(to_unicode("\n#endif /* _UNIT_H */\n"))
+        sizeCodes = blockCodes + langCodes if packs else blockCodes
+        return CompiledTranslations(blockCodes, [rendered[code][0] for code in blockCodes],
+                                    f.getvalue(),
+                                    [row for code in sizeCodes for row in rendered[code][1]],
+                                    codePages, split,
+                                    dict((code, rendered[code][0]) for code in langCodes)
+                                    if packs else None,
+                                    renderVolatile(self.buildVersion) if reproducible else None)
+
+    def compile(self, langCodes=None, split=False, multi=False, compress=False, jobs=1,
+                packs=False, trimGlyphs=False, reproducible=False, pool=False):
+        """
+        Generate the sources of langCodes (default: every language), returns
+        a CompiledTranslations. With packs the sources are the LANG_PACK
+        block, and every language becomes a language pack. When reproducible
+        the build version and date go to TranslationVolatile.cpp only, with
+        pool the strings of every language are pooled. Raises ValueError
+        when a language can not be generated
+        """
+        rendered = self.render(langCodes, multi, compress, jobs, packs, trimGlyphs, reproducible,
+                               pool)
+        return self.assemble(rendered, langCodes, split, multi, compress, packs, trimGlyphs,
+                             reproducible, pool)
+
+
+def checkTarget(opts, defs, sizes, checkLangDict, baselineRows=None):
+    # Size report and the size and width checks, returns the errors
+    import sizeReport
+    import widthCheck
+    if opts.size_report:
+        sizeReport.printReport(sizes)
+        sizeReport.writeReport(opts.size_report, sizes)
+    errors = sizeReport.checkReport(sizes, opts.flash_budget, baselineRows, opts.max_growth)
+    with profilePhase("widthCheck"):
+        widthReport = widthCheck.checkWidths(defs, checkLangDict)
+    if opts.check_widths:
+        widthCheck.printWidthReport(widthReport)
+        errors.extend("{}: {} string(s) do not fit".format(langCode, len(widthReport[langCode]))
+                      for langCode in sorted(widthReport))
+    elif widthReport:
+        print("Warning: {} string(s) in {} language(s) do not fit, see --check-widths".format(
+            sum(len(x) for x in widthReport.values()), len(widthReport)))
+    return errors
+
+
+def getInputStats(inputFiles):
+    # (mtime, size) of every input, cheap enough to poll many times a second
+    stats = {}
+    for fileName in inputFiles:
+        try:
+            st = os.stat(fileName)
+        except OSError:
+            continue
+        stats[fileName] = (st.st_mtime_ns, st.st_size)
+    return stats
+
+
+def watchTranslations(opts, compiler, inputFiles, baselineRows=None):
+    """
+    Generate, then regenerate whenever an input changes, until interrupted.
+    The font store, the definitions and the rendered block of every language
+    stay in memory, so a changed translation only renders its own block
+    again (every language with --multi, they share one font). A changed
+    script or fontTables.py restarts the generator
+    """
+    jsonDir = opts.jsonDir
+    defsFile = os.path.join(jsonDir, "translations_def.js")
+    scriptFiles = inputFiles[:inputFiles.index(defsFile)]
+    rendered = {}
+    stats = getInputStats(inputFiles)
+    changed = None  # None renders every language
+    while True:
+        start = time.perf_counter()
+        langCodes = compiler.getLanguageCodes()
+        try:
+            packs = opts.packs is not None
+            if opts.multi or changed is None:
+                rendered = compiler.render(None, opts.multi, opts.compress, opts.jobs, packs,
+                                           opts.compress_glyphs, opts.reproducible,
+                                           opts.pool_strings)
+            else:
+                rendered.update(compiler.render([code for code in langCodes if code in changed],
+                                                False, opts.compress, opts.jobs, packs,
+                                                opts.compress_glyphs, opts.reproducible,
+                                                opts.pool_strings))
+            compiled = compiler.assemble(rendered, None, opts.split, opts.multi, opts.compress,
+                                         packs, opts.compress_glyphs, opts.reproducible,
+                                         opts.pool_strings)
+        except ValueError as e:
+            errors = [str(e)]
+        else:
+            compiled.write(opts.outFileTranslationCPP, opts.outFileUnitH, opts.packs)
+            errors = checkTarget(opts, compiler.defs, compiled.sizes,
+                                 dict((code, compiler.langDict[code]) for code in langCodes
+                                      if changed is None or code in changed),
+                                 baselineRows)
+        for error in errors:
+            print("error: " + error)
+        if not errors:
+            outFiles = getTargetFiles(opts, compiled.blockCodes, compiled.packs)
+            writeStamp(getStampFile(opts.cache_dir, outFiles),
+                       getTargetHash(opts, compiler.buildVersion, inputFiles, outFiles))
+        print("Generated {} language(s) in {:.1f} ms".format(
+            len(langCodes) if changed is None or opts.multi else len(changed),
+            1000 * (time.perf_counter() - start)))
+        sys.stdout.flush()
+
+        # Poll until the inputs are readable again after a change, translation
+        # files may come and go. A broken file keeps the last good output
+        changedFiles = set()
+        while True:
+            time.sleep(opts.watch_interval)
+            inputFiles = getInputFiles(jsonDir, opts.languages)
+            newStats = getInputStats(inputFiles)
+            changedFiles.update(fileName for fileName in set(stats) | set(newStats)
+                                if stats.get(fileName) != newStats.get(fileName))
+            if newStats == stats:
+                continue
+            stats = newStats
+            if changedFiles.intersection(scriptFiles):
+                print("Generator changed, restarting")
+                sys.stdout.flush()
+                os.execv(sys.executable, [sys.executable] + sys.argv)
+            try:
+                compiler, changed = reloadInputs(compiler, opts, changedFiles, stats)
+            except (OSError, ValueError) as e:
+                for line in str(e).splitlines():
+                    print("error: " + line)
+                sys.stdout.flush()
+                continue
+            break
+
+
+def reloadInputs(compiler, opts, changedFiles, stats):
+    """
+    A compiler for the changed inputs, returns (compiler, changed language
+    codes or None when the definitions changed and every language has to be
+    rendered again)
+    """
+    import translationStore
+    jsonDir = opts.jsonDir
+    if os.path.join(jsonDir, translationStore.DEFS_FILE) in changedFiles:
+        # Every translation is checked against the new definitions
+        return TranslationCompiler.fromDirectory(jsonDir, opts.languages, compiler.buildVersion,
+                                                 opts.cache_dir), None
+    fileNames = [os.path.basename(fileName) for fileName in changedFiles if fileName in stats]
+    _, loaded, loadedUnits = translationStore.loadLanguages(jsonDir, fileNames, opts.cache_dir)
+    langDict = dict(compiler.langDict)
+    UnitDict = dict(compiler.UnitDict)
+    changed = set(loaded)
+    for fileName in changedFiles:
+        if fileName not in stats:
+            # Removed translation file
+            langCode = os.path.basename(fileName)[12:-5].upper()
+            langDict.pop(langCode, None)
+            UnitDict.pop(langCode, None)
+            changed.add(langCode)
+    langDict.update(loaded)
+    UnitDict.update(loadedUnits)
+    return TranslationCompiler(langDict, UnitDict, compiler.defs, compiler.buildVersion,
+                               compiler.cacheDir), changed
+
+
+if __name__ == "__main__":
+    opts = read_opts()
+    jsonDir = opts.jsonDir
+    outFileTranslationCPP = opts.outFileTranslationCPP
+    outFileUnitH = opts.outFileUnitH
+
+    if opts.profile:
+        import atexit
+        import phaseProfiler
+        profiler = phaseProfiler.PhaseProfiler(opts.profile_memory is not None)
+        if opts.profile_stats:
+            import cProfile
+            cProfiler = cProfile.Profile()
+            cProfiler.enable()
+
+        def endProfile():
+            # Also runs after sys.exit(), failed runs are profiled too
+            if opts.profile_stats:
+                cProfiler.disable()
+                cProfiler.dump_stats(opts.profile_stats)
+            if opts.profile_memory:
+                import tracemalloc
+                tracemalloc.take_snapshot().dump(opts.profile_memory)
+            profiler.printSummary()
+
+        atexit.register(endProfile)
+
+    with profilePhase("readVersion"):
+        if opts.build_version:
+            buildVersion = opts.build_version
+        else:
+            try: buildVersion = readVersion(jsonDir)
+            except: print("error: could not get/extract build version"); sys.exit(1)
+
+    print("Build version: " + buildVersion)
+
+    # The whole generation is skipped when none of its inputs changed
+    with profilePhase("cacheCheck"):
+        try:
+            inputFiles = getInputFiles(jsonDir, opts.languages)
+            if opts.size_baseline:
+                # Loaded now so a missing baseline fails before generating anything
+                import sizeReport
+                baselineRows = sizeReport.readReport(opts.size_baseline)
+        except (OSError, ValueError, KeyError) as e:
+            print("error: " + str(e))
+            sys.exit(1)
+        # Language codes come from the file names, nothing is parsed yet
+        langCodes = orderOutput(dict.fromkeys(
+            os.path.basename(fileName)[12:-5].upper() for fileName in inputFiles
+            if os.path.basename(fileName).startswith("translation_")))
+        if opts.multi:
+            blockCodes = [MULTI_LANGUAGE]
+        elif opts.packs:
+            blockCodes = [PACK_LANGUAGE]
+        else:
+            blockCodes = langCodes
+        outFiles = getTargetFiles(opts, blockCodes, langCodes)
+        inputHash = getTargetHash(opts, buildVersion, inputFiles, outFiles)
+        stampFile = getStampFile(opts.cache_dir, outFiles)
+        cacheHit = (not opts.no_cache and not opts.watch and
+                    isCacheHit(stampFile, inputHash, outFiles))
+
+    if opts.split:
+        print("Making " + getSplitFileName(outFileTranslationCPP, "XX") + " from " + jsonDir)
+    else:
+        print("Making " + outFileTranslationCPP + " from " + jsonDir)
+    print("Making " + outFileUnitH + " from " + jsonDir)
+    if opts.packs:
+        print("Making " + getPackFileName(opts.packs, "XX") + " from " + jsonDir)
+
+    if not cacheHit:
+        with profilePhase("readTranslations"):
+            try:
+                compiler = TranslationCompiler.fromDirectory(jsonDir, opts.languages, buildVersion,
+                                                             opts.cache_dir)
+            except ValueError as e:
+                # Every problem of every file at once
+                for line in str(e).splitlines():
+                    print("error: " + line)
+                sys.exit(1)
+        defs = compiler.defs
+        langDict = compiler.langDict
+        if opts.watch:
+            try:
+                watchTranslations(opts, compiler, inputFiles,
+                                  baselineRows if opts.size_baseline else None)
+            except KeyboardInterrupt:
+                sys.exit(0)
+        try:
+            compiled = compiler.compile(None, opts.split, opts.multi, opts.compress, opts.jobs,
+                                        opts.packs is not None, opts.compress_glyphs,
+                                        opts.reproducible, opts.pool_strings)
+        except ValueError as e:
+            print("error: " + str(e))
+            sys.exit(1)
+        with profilePhase("writeFiles"):
+            compiled.write(outFileTranslationCPP, outFileUnitH, opts.packs)
+        errors = checkTarget(opts, defs, compiled.sizes, langDict,
+                             baselineRows if opts.size_baseline else None)
+        if errors:
+            # No stamp, the next run checks again
+            for error in errors:
+                print("error: " + error)
+            sys.exit(1)
+        writeStamp(stampFile, inputHash)
+
+    if opts.depfile:
+        with profilePhase("depfile"):
+            writeDepfile(opts.depfile, outFiles, inputFiles, ["python3"] + sys.argv)
+
+    print("Up to date" if cacheHit else "Done")
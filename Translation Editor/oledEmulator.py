@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+Host side emulation of the 96x16 OLED, to see translated strings without
+flashing a device.
+
+OLED mirrors OLED::print / drawChar / drawArea of the firmware: the screen
+is two 8 pixel high strips of column bytes (least significant bit on top),
+USER_FONT_12 glyphs cover both strips, USER_FONT_6x8 glyphs one, and \\x01
+moves the cursor to the second strip. The font tables are built from the
+symbol map of make_translation.getFontMapAndTable, so every code draws the
+same bytes the generated Translation.cpp holds.
+
+Run as a script it renders every string of every language into one PNG
+sheet per language (oled_XX.png).
+"""
+from __future__ import print_function
+import os
+import sys
+import argparse
+
+try:
+    import numpy as np
+except ImportError as error:
+    raise ImportError("{}: {} requires NumPy. "
+                      "Install with `pip` or OS-specific package "
+                      "management tool."
+                      .format(error, sys.argv[0]))
+
+import fontStore
+import glyphStore
+import make_translation
+import translationStore
+import widthCheck
+from glyphStore import FONT_SIZES
+
+OLED_WIDTH = 96
+OLED_HEIGHT = 16
+
+
+def getRow(code, codePages):
+    # Row of the font tables drawn for a code: one byte codes start at \x02,
+    # code page rows follow the one byte rows in page order
+    if len(code) == 1:
+        return code[0] - 2
+    singleRows = make_translation.SINGLE_BYTE_CODES - codePages
+    page = code[0] - make_translation.getPageEscape(codePages)
+    return singleRows + page * make_translation.CODE_PAGE_SIZE + code[1] - 1
+
+
+def getFontTables(symbolConversionTable):
+    """
+    The glyphs of a symbol map as one (rows, glyph bytes) uint8 array per
+    font, row n holding what getFontMapAndTable emitted for that row
+    """
+    store = glyphStore.getGlyphStore()
+    codePages = make_translation.getCodePages(symbolConversionTable)
+    rowOfSymbol = {}
+    for sym, code in symbolConversionTable.items():
+        if code != '\\x01':
+            rowOfSymbol[sym] = getRow(bytearray(make_translation.getEncodedBytes(code)), codePages)
+    symbols = list(rowOfSymbol)
+    rows = [rowOfSymbol[sym] for sym in symbols]
+    tables = []
+    for font in (fontStore.FONT_LARGE, fontStore.FONT_SMALL):
+        table = np.zeros((len(set(rows)), fontStore.GLYPH_BYTES[font]), np.uint8)
+        table[rows] = store.getGlyphs(font, symbols)
+        tables.append(table)
+    return tables, codePages
+
+
+class OLED(object):
+    """
+    Framebuffer of the panel. width can be made larger than the panel to
+    see a scrolling string in one piece
+    """
+
+    def __init__(self, fontTables, codePages=0, width=OLED_WIDTH):
+        self.fontTables = fontTables
+        self.codePages = codePages
+        self.width = width
+        self.strips = np.zeros((2, width), np.uint8)
+        self.cursorX = 0
+        self.cursorY = 0
+        self.font = fontStore.FONT_LARGE
+
+    def clearScreen(self):
+        self.strips[:] = 0
+
+    def setFont(self, font):
+        self.font = font
+
+    def setCursor(self, x, y):
+        self.cursorX = x
+        self.cursorY = y
+
+    def drawArea(self, x, y, wide, height, glyphs):
+        """
+        Blit glyphs, a (count, wide * height / 8) array, side by side from x.
+        Clipped like OLED::drawArea
+        """
+        columns = glyphStore.toStrips(glyphs, wide, height)
+        start = max(x, 0)
+        end = min(x + columns.shape[1], self.width)
+        if end <= start:
+            return
+        columns = columns[:, start - x:end - x]
+        if y == 0:
+            self.strips[0, start:end] = columns[0]
+        if y == 8 or height == 16:
+            self.strips[1, start:end] = columns[-1]
+
+    def drawRows(self, rows):
+        width, height = FONT_SIZES[self.font]
+        if rows:
+            self.drawArea(self.cursorX, self.cursorY, width, height,
+                          self.fontTables[self.font][rows])
+            self.cursorX += width * len(rows)
+
+    def print(self, data):
+        """Draw an encoded string (bytes) at the cursor, like OLED::print"""
+        data = bytearray(data)
+        escape = make_translation.getPageEscape(self.codePages) if self.codePages else 256
+        rows = []
+        i = 0
+        while i < len(data) and data[i]:
+            c = data[i]
+            if c == 1:
+                self.drawRows(rows)
+                rows = []
+                if self.cursorY == 0:
+                    self.setCursor(0, 8)
+                # Anywhere else the firmware would draw from before the table
+            elif c >= escape and i + 1 < len(data) and data[i + 1]:
+                rows.append(getRow(data[i:i + 2], self.codePages))
+                i += 1
+            else:
+                rows.append(getRow(data[i:i + 1], self.codePages))
+            i += 1
+        self.drawRows(rows)
+
+    def getPixels(self, leftHanded=False):
+        """(16, width) bool array of the screen, rotated when left handed"""
+        bits = np.unpackbits(self.strips[:, :, None], axis=2, bitorder="little")
+        pixels = bits.transpose(0, 2, 1).reshape(OLED_HEIGHT, self.width).astype(bool)
+        if leftHanded:
+            pixels = pixels[::-1, ::-1]
+        return pixels
+
+
+def getScreens(defs, lang, codec):
+    """
+    Every translated string of a language as (name, encoded bytes, font),
+    in the font the firmware draws it in (widthCheck.getSlotFont). Two line
+    short names are shown on one screen
+    """
+    screens = []
+    slots = make_translation.getLanguageSlots(defs, lang)
+    for i, (name, text) in enumerate(slots):
+        if text is None or name.endswith("][1]"):
+            continue
+        font = widthCheck.getSlotFont(name, lang)
+        if name.endswith("][0]") and lang['menuDouble']:
+            name = name[:-3]
+            text = text + "\n" + slots[i + 1][1]
+        encoded = make_translation.getEncodedBytes(codec.encode(text))
+        screens.append((name, encoded, font))
+    return screens
+
+
+def renderScreen(fontTables, codePages, encoded, font, leftHanded=False):
+    # Panel sized framebuffer, or wider for a string that scrolls
+    width = max(OLED_WIDTH, FONT_SIZES[font][0] * len(encoded))
+    oled = OLED(fontTables, codePages, width)
+    oled.setFont(font)
+    oled.print(encoded)
+    return oled.getPixels(leftHanded)
+
+
+def renderSheet(screens, fontTables, codePages, leftHanded=False, scale=2):
+    """
+    One grey scale image with a row per screen: its name, then the pixels, with
+    whatever lies past the 96 pixel panel in grey
+    """
+    from PIL import Image, ImageDraw
+
+    pixels = [renderScreen(fontTables, codePages, encoded, font, leftHanded)
+              for _, encoded, font in screens]
+    labelWidth = 6 * max(len(name) for name, _, _ in screens) + 8
+    rowHeight = OLED_HEIGHT * scale + 6
+    width = labelWidth + scale * max(p.shape[1] for p in pixels) + 4
+    sheet = np.zeros((rowHeight * len(screens), width), np.uint8)
+    for row, screen in enumerate(pixels):
+        top = row * rowHeight + 3
+        block = np.repeat(np.repeat(screen, scale, axis=0), scale, axis=1)
+        colour = np.full(block.shape, 255, np.uint8)
+        if leftHanded:
+            colour[:, :block.shape[1] - OLED_WIDTH * scale] = 128
+        else:
+            colour[:, OLED_WIDTH * scale:] = 128
+        area = sheet[top:top + block.shape[0], labelWidth:labelWidth + block.shape[1]]
+        area[:] = 24  # panel background
+        area[block] = colour[block]
+    image = Image.fromarray(sheet, "L")
+    draw = ImageDraw.Draw(image)
+    for row, (name, _, _) in enumerate(screens):
+        draw.text((2, row * rowHeight + 3), name, fill=200)
+    return image
+
+
+def renderLanguageSheet(lang, defs, buildVersion, leftHanded=False, scale=2):
+    (_, symbolConversionTable) = make_translation.getFontMapAndTable(
+        make_translation.getLetterCounts(defs, lang, buildVersion))
+    codec = make_translation.SymbolCodec(symbolConversionTable)
+    fontTables, codePages = getFontTables(symbolConversionTable)
+    return renderSheet(getScreens(defs, lang, codec), fontTables, codePages, leftHanded, scale)
+
+
+def parse_commandline():
+    parser = argparse.ArgumentParser(
+        description="Render every translated string as the OLED shows it")
+    parser.add_argument("jsonDir", nargs="?", default=".",
+                        help="directory holding the translation_xx.json files")
+    parser.add_argument("-o", "--output-dir", default=".",
+                        help="where to write the oled_XX.png sheets")
+    parser.add_argument("-l", "--languages", action="append", default=[],
+                        help="language code(s) to render, comma separated "
+                             "or repeated (default: all languages)")
+    parser.add_argument("--left-handed", action="store_true",
+                        help="show the panel rotated as in left handed mode")
+    parser.add_argument("-s", "--scale", type=int, default=2,
+                        help="size of a pixel in the sheets (default: 2)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_commandline()
+    langCodes = [code.strip().upper() for arg in args.languages
+                 for code in arg.split(",") if code.strip()]
+    try:
+        langDict, _ = make_translation.readTranslations(args.jsonDir, langCodes)
+        defs, _ = translationStore.loadDefs(args.jsonDir)
+    except ValueError as e:
+        print("error: " + str(e))
+        sys.exit(1)
+    buildVersion = make_translation.readVersion(args.jsonDir)
+    if not os.path.isdir(args.output_dir):
+        os.makedirs(args.output_dir)
+    for langCode in make_translation.orderOutput(langDict):
+        fileName = os.path.join(args.output_dir, "oled_" + langCode + ".png")
+        # Fast compression, the sheets are large and mostly background
+        renderLanguageSheet(langDict[langCode], defs, buildVersion, args.left_handed,
+                            args.scale).save(
+            fileName, compress_level=1)
+        print("Wrote " + fileName)
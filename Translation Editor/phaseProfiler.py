@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+Wall time and allocations of the steps of make_translation.py --profile.
+
+Each step is timed with phase(name, language). The allocation count is the
+change of the number of memory blocks the interpreter holds over the step;
+with traceMemory the peak traced bytes of the step are recorded as well.
+Steps must not be nested, every phase() is a leaf.
+"""
+from __future__ import print_function
+import sys
+import time
+import tracemalloc
+import contextlib
+
+
+class PhaseProfiler(object):
+
+    def __init__(self, traceMemory=False):
+        self.traceMemory = traceMemory
+        self.phases = []  # (name, language, seconds, blocks, peak bytes or None)
+        if traceMemory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextlib.contextmanager
+    def phase(self, name, language=""):
+        blocks = sys.getallocatedblocks()
+        if self.traceMemory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1] if self.traceMemory else None
+            self.phases.append((name, language, seconds,
+                                sys.getallocatedblocks() - blocks, peak))
+
+    def getPhaseTotals(self):
+        # name -> [calls, seconds, blocks, peak], in the order phases first ran
+        totals = {}
+        for name, _, seconds, blocks, peak in self.phases:
+            total = totals.setdefault(name, [0, 0.0, 0, 0])
+            total[0] += 1
+            total[1] += seconds
+            total[2] += blocks
+            total[3] = max(total[3], peak or 0)
+        return totals
+
+    def printSummary(self):
+        totals = self.getPhaseTotals()
+        wall = sum(total[1] for total in totals.values()) or 1.0
+        print("Phase                Calls    Time ms      %     Blocks" +
+              ("    Peak KB" if self.traceMemory else ""))
+        for name, (calls, seconds, blocks, peak) in totals.items():
+            print("{:<20} {:>5} {:>10.2f} {:>6.1f} {:>10}".format(
+                name, calls, 1000 * seconds, 100 * seconds / wall, blocks) +
+                (" {:>10.1f}".format(peak / 1024.0) if self.traceMemory else ""))
+
+        languages = {}
+        for name, language, seconds, _, _ in self.phases:
+            if language:
+                languages.setdefault(language, {})
+                languages[language][name] = languages[language].get(name, 0.0) + seconds
+        if languages:
+            names = [name for name in totals
+                     if any(name in phases for phases in languages.values())]
+            print("")
+            print("Language " + "".join("{:>14}".format(name[:13]) for name in names) +
+                  "      Total ms")
+            for language, phases in languages.items():
+                print("{:<8} ".format(language) +
+                      "".join("{:>14.2f}".format(1000 * phases.get(name, 0.0)) for name in names) +
+                      "{:>14.2f}".format(1000 * sum(phases.values())))
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+Flash size report of the generated translations.
+
+make_translation.py fills one row per language and model with the bytes of
+the font tables, string literals and pointer arrays it emitted. The report
+is written as JSON or CSV (by file extension) and can be checked against a
+flash budget and against a stored baseline report.
+"""
+from __future__ import print_function
+import io
+import sys
+import csv
+import json
+import argparse
+
+FIELDS = ["language", "model", "font", "strings", "pointers", "total", "escapes"]
+
+
+def makeRow(language, model, font, strings, pointers, escapes=0):
+    # escapes: bytes of code page escapes, already part of strings
+    return {
+        "language": language,
+        "model": model,
+        "font": font,
+        "strings": strings,
+        "pointers": pointers,
+        "total": font + strings + pointers,
+        "escapes": escapes,
+    }
+
+
+def writeReport(fileName, rows):
+    if fileName.lower().endswith(".csv"):
+        with io.open(fileName, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS, lineterminator="\n")
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with io.open(fileName, "w", encoding="utf-8", newline="\n") as f:
+            f.write(json.dumps({"languages": rows}, indent=2, sort_keys=True))
+            f.write("\n")
+
+
+def readReport(fileName):
+    if fileName.lower().endswith(".csv"):
+        with io.open(fileName, "r", encoding="utf-8", newline="") as f:
+            rows = list(csv.DictReader(f))
+        for row in rows:
+            for field in FIELDS[2:]:
+                row[field] = int(row.get(field) or 0)
+        return rows
+    with io.open(fileName, "r", encoding="utf-8") as f:
+        return json.load(f)["languages"]
+
+
+def checkReport(rows, budget=None, baselineRows=None, maxGrowth=0):
+    """Return the list of violations, empty when everything fits"""
+    errors = []
+    if budget is not None:
+        for row in rows:
+            if row["total"] > budget:
+                errors.append("{} {}: {} bytes exceeds the budget of {} bytes".format(
+                    row["language"], row["model"], row["total"], budget))
+    if baselineRows is not None:
+        baseline = dict(((row["language"], row["model"]), row) for row in baselineRows)
+        for row in rows:
+            old = baseline.get((row["language"], row["model"]))
+            if old is not None and row["total"] - old["total"] > maxGrowth:
+                errors.append("{} {}: grew by {} bytes ({} -> {}), more than {} allowed".format(
+                    row["language"], row["model"], row["total"] - old["total"],
+                    old["total"], row["total"], maxGrowth))
+    return errors
+
+
+def printReport(rows):
+    print("Language Model     Font Strings Pointers  Total Escapes")
+    for row in rows:
+        print("{:<8} {:<6} {:>7} {:>7} {:>8} {:>6} {:>7}".format(
+            row["language"], row["model"], row["font"], row["strings"],
+            row["pointers"], row["total"], row.get("escapes", 0)))
+
+
+def parse_commandline():
+    parser = argparse.ArgumentParser(
+        description="Show a size report of make_translation.py and check it")
+    parser.add_argument("report", help="size report, .json or .csv")
+    parser.add_argument("--flash-budget", type=int, metavar="BYTES",
+                        help="fail when a language and model needs more flash")
+    parser.add_argument("--baseline", metavar="FILE",
+                        help="earlier size report to compare with")
+    parser.add_argument("--max-growth", type=int, default=0, metavar="BYTES",
+                        help="bytes a language may grow by since the baseline (default: 0)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_commandline()
+    try:
+        rows = readReport(args.report)
+        baselineRows = readReport(args.baseline) if args.baseline else None
+    except (OSError, ValueError, KeyError) as e:
+        print("error: " + str(e))
+        sys.exit(1)
+    printReport(rows)
+    errors = checkReport(rows, args.flash_budget, baselineRows, args.max_growth)
+    for error in errors:
+        print("error: " + error)
+    if errors:
+        sys.exit(1)
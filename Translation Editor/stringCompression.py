@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+Canonical Huffman coding of the encoded translation strings.
+
+make_translation.py --compress stores the strings of a language as one
+packed bitstream instead of one C literal per string. The firmware inflates
+it into RAM at boot with decompressTranslations(), which walks the same
+canonical code as decode() below, so only the number of codes of every
+length and the symbols in code order have to be stored.
+
+Bits are packed most significant first. Codes are assigned in order of
+(length, symbol), the layout used by zlib's puff.c.
+"""
+from __future__ import print_function
+import heapq
+
+MAX_CODE_LENGTH = 15
+
+
+def getCodeLengths(counts, maxLength=MAX_CODE_LENGTH):
+    """Code length of every symbol of counts (symbol -> count)"""
+    if len(counts) == 1:
+        return dict.fromkeys(counts, 1)
+    while True:
+        # Items are (weight, tie breaker, symbols below this node)
+        heap = [(count, sym, [sym]) for sym, count in counts.items()]
+        heapq.heapify(heap)
+        lengths = dict.fromkeys(counts, 0)
+        while len(heap) > 1:
+            a = heapq.heappop(heap)
+            b = heapq.heappop(heap)
+            for sym in a[2] + b[2]:
+                lengths[sym] += 1
+            heapq.heappush(heap, (a[0] + b[0], min(a[1], b[1]), a[2] + b[2]))
+        if max(lengths.values()) <= maxLength:
+            return lengths
+        # Too deep, flatten the distribution and try again
+        counts = dict((sym, (count + 1) // 2) for sym, count in counts.items())
+
+
+class HuffmanCode(object):
+    """
+    Canonical code for byte symbols. lengthCounts[n] is the number of codes
+    of n bits, symbols lists the symbols in code order: together they are
+    the whole decode table.
+    """
+
+    def __init__(self, counts):
+        self.lengths = getCodeLengths(counts)
+        self.symbols = sorted(self.lengths, key=lambda sym: (self.lengths[sym], sym))
+        self.lengthCounts = [0] * (MAX_CODE_LENGTH + 1)
+        for sym in self.symbols:
+            self.lengthCounts[self.lengths[sym]] += 1
+        self.codes = {}
+        code = 0
+        length = self.lengths[self.symbols[0]]
+        for sym in self.symbols:
+            code <<= self.lengths[sym] - length
+            length = self.lengths[sym]
+            self.codes[sym] = code
+            code += 1
+
+    def encode(self, data):
+        """Pack the symbols of data, returns (bytes, number of bits)"""
+        out = bytearray()
+        acc = 0
+        bits = 0
+        total = 0
+        for sym in bytearray(data):
+            acc = (acc << self.lengths[sym]) | self.codes[sym]
+            bits += self.lengths[sym]
+            total += self.lengths[sym]
+            while bits >= 8:
+                bits -= 8
+                out.append((acc >> bits) & 0xFF)
+            acc &= (1 << bits) - 1
+        if bits:
+            out.append((acc << (8 - bits)) & 0xFF)
+        return bytes(out), total
+
+    def getTableSize(self):
+        # Bytes of the firmware decode table, lengthCounts[0] is not stored
+        return MAX_CODE_LENGTH + len(self.symbols)
+
+
+def decode(lengthCounts, symbols, stream, size):
+    """
+    Reference decoder, the same steps as decompressTranslations() in the
+    generated C. Returns the first size symbols of stream
+    """
+    stream = bytearray(stream)
+    out = bytearray()
+    bit = 0
+    while len(out) < size:
+        code = first = index = 0
+        for length in range(1, MAX_CODE_LENGTH + 1):
+            code |= (stream[bit >> 3] >> (7 - (bit & 7))) & 1
+            bit += 1
+            count = lengthCounts[length]
+            if code - count < first:
+                out.append(symbols[index + code - first])
+                break
+            index += count
+            first += count
+            first <<= 1
+            code <<= 1
+        else:
+            raise ValueError("Invalid code at bit {}".format(bit))
+    return bytes(out)
+
+
+def getSymbolCounts(data):
+    counts = {}
+    for sym in bytearray(data):
+        counts[sym] = counts.get(sym, 0) + 1
+    return counts
+
+
+def compress(data):
+    """
+    Code data with its own canonical Huffman code and check that the
+    reference decoder gives it back. Returns (code, stream)
+    """
+    code = HuffmanCode(getSymbolCounts(data))
+    stream, _ = code.encode(data)
+    if decode(code.lengthCounts, code.symbols, stream, len(data)) != bytes(data):
+        raise ValueError("Huffman round trip failed")
+    return code, stream
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+One pool holding all the encoded strings of a language.
+
+make_translation.py --pool-strings stores the strings of a language in a
+single TranslationStrings[] array instead of one C literal per string.
+Every distinct string is stored once with its NUL terminator, and a string
+that is the tail of a longer one (the "F" of "OFF", or a shared ending of
+two messages) is not stored at all: it points into the end of the longer
+string. The string tables then hold u16 offsets into the pool instead of
+4 byte pointers.
+
+The pool is built by sorting the strings on their reversed bytes: a string
+is a tail of another exactly when its reversed bytes are a prefix of the
+other's, and those strings sort next to each other.
+"""
+from __future__ import print_function
+
+MAX_POOL_SIZE = 0xFFFF  # offsets are u16
+
+
+def poolStrings(strings):
+    """
+    Pool the byte strings of strings (without terminator). Returns (pool,
+    {string: offset}), raises ValueError when the pool does not fit u16
+    offsets
+    """
+    # Longest first among strings sharing an ending, so every string meets
+    # the string it can be merged into before itself
+    order = sorted(set(strings), key=lambda text: text[::-1], reverse=True)
+    pool = bytearray()
+    offsets = {}
+    last = None
+    for text in order:
+        if last is not None and last.endswith(text):
+            offsets[text] = offsets[last] + len(last) - len(text)
+            continue
+        offsets[text] = len(pool)
+        pool += text + b"\0"
+        last = text
+    if len(pool) > MAX_POOL_SIZE:
+        raise ValueError("String pool of {} bytes does not fit u16 offsets".format(len(pool)))
+    for text, offset in offsets.items():
+        if readString(pool, offset) != text:
+            raise ValueError("String pool lost {!r}".format(text))
+    return bytes(pool), offsets
+
+
+def readString(pool, offset):
+    # The string at offset, as the firmware reads it
+    return bytes(pool[offset:pool.index(b"\0", offset)])
+
+
+def getPoolStats(strings, pool):
+    # (duplicate strings, strings merged into the tail of another)
+    unique = len(set(strings))
+    return len(strings) - unique, unique - pool.count(b"\0")
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+make_translation.py --compress-glyphs: every USER_FONT_12 glyph of
+fontTables.py, trimmed and read back the way OLED::drawChar() and
+OLED::drawTrimmedGlyph() read it, gives the bytes of the untrimmed glyph,
+the empty ones included, and so do the tables of the rendered blocks.
+
+Run with `python3 -m unittest discover -s "Translation Editor"` (or pytest).
+"""
+import contextlib
+import io
+import os
+import re
+import sys
+import unittest
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+import fontStore  # noqa: E402
+import glyphCompression  # noqa: E402
+import make_translation  # noqa: E402
+
+TABLE_RE = re.compile(r"const uint8_t USER_FONT_12\[\] = \{\n(.*?)\};", re.S)
+OFFSETS_RE = re.compile(r"const uint16_t USER_FONT_12_OFFSETS\[\] = \{\n(.*?)\};", re.S)
+GLYPH_BYTES = fontStore.GLYPH_BYTES[fontStore.FONT_LARGE]
+
+
+def drawTrimmedGlyph(table, offset):
+    # OLED::drawTrimmedGlyph(USER_FONT_12 + offset), the buffer it draws
+    buffer = bytearray(24)
+    first = table[offset] >> 4
+    count = table[offset] & 0x0F
+    for page in range(2):
+        for column in range(count):
+            buffer[page * 12 + first + column] = table[offset + 1 + page * count + column]
+    return bytes(buffer)
+
+
+def drawChar(table, offsets, c):
+    # OLED::drawChar(c) of the large font with TRANSLATION_GLYPHS_TRIMMED
+    return drawTrimmedGlyph(table, offsets[c - 2])
+
+
+def readBytes(body):
+    return bytes(int(x, 16) for x in re.findall(r"0x([0-9A-F]{2})", body))
+
+
+class GlyphCompressionTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        data = bytes(fontStore.getFontStore().getGlyphs(fontStore.FONT_LARGE))
+        cls.glyphs = [data[i:i + GLYPH_BYTES] for i in range(0, len(data), GLYPH_BYTES)]
+
+    def testEveryGlyph(self):
+        table, offsets = glyphCompression.trimGlyphs(self.glyphs)
+        self.assertEqual(len(offsets), len(self.glyphs))
+        for index, glyph in enumerate(self.glyphs):
+            self.assertEqual(drawChar(table, offsets, index + 2), glyph)
+            self.assertEqual(glyphCompression.expandGlyph(table, offsets[index]), glyph)
+        self.assertLess(len(table), len(self.glyphs) * GLYPH_BYTES)
+
+    def testEmptyGlyph(self):
+        empty = [glyph for glyph in self.glyphs if not any(bytearray(glyph))]
+        self.assertTrue(empty)  # the space
+        blank = bytes(GLYPH_BYTES)
+        self.assertEqual(glyphCompression.trimGlyph(blank), b"\0")
+        # Between two glyphs, as it is in a table
+        table, offsets = glyphCompression.trimGlyphs([self.glyphs[1], blank, self.glyphs[1]])
+        self.assertEqual(offsets[2] - offsets[1], 1)
+        self.assertEqual(drawTrimmedGlyph(table, offsets[1]), blank)
+        self.assertEqual(drawTrimmedGlyph(table, offsets[2]), self.glyphs[1])
+
+    def testFullWidth(self):
+        glyph = bytes(range(1, GLYPH_BYTES + 1))
+        trimmed = glyphCompression.trimGlyph(glyph)
+        self.assertEqual(trimmed, b"\x0C" + glyph)
+        self.assertEqual(drawTrimmedGlyph(trimmed, 0), glyph)
+
+    def testRenderedTable(self):
+        # The trimmed table of every block draws the glyphs of the plain one
+        with contextlib.redirect_stdout(io.StringIO()):
+            compiler = make_translation.TranslationCompiler.fromDirectory(SCRIPT_DIR)
+            trimmed = compiler.render(trimGlyphs=True, jobs=0)
+            plain = compiler.render(jobs=0)
+        for langCode in sorted(trimmed):
+            with self.subTest(language=langCode):
+                text = trimmed[langCode][0]
+                table = readBytes(TABLE_RE.search(text).group(1))
+                offsets = [int(x) for x in re.findall(r"\d+", OFFSETS_RE.search(text).group(1))]
+                glyphs = readBytes(TABLE_RE.search(plain[langCode][0]).group(1))
+                self.assertEqual(len(glyphs), len(offsets) * GLYPH_BYTES)
+                for index in range(len(offsets)):
+                    self.assertEqual(drawChar(table, offsets, index + 2),
+                                     glyphs[index * GLYPH_BYTES:(index + 1) * GLYPH_BYTES])
+
+
+if __name__ == "__main__":
+    unittest.main()
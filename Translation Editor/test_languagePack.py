@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+make_translation.py --packs: the pack header of languagePack.py has the
+layout of the C struct the LANG_PACK block reads it with, and the Intel hex
+file of every language pack reads back, record by record, to a pack at
+PACK_ADDRESS with the header fields of its language.
+
+Run with `python3 -m unittest discover -s "Translation Editor"` (or pytest).
+"""
+import contextlib
+import io
+import os
+import re
+import sys
+import struct
+import unittest
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+import languagePack  # noqa: E402
+import make_translation  # noqa: E402
+
+FIELD_RE = re.compile(r"^\s*(uint8_t|uint16_t|uint32_t|char) (\w+)(?:\[(\d+)\])?;", re.M)
+C_SIZES = {"uint8_t": 1, "uint16_t": 2, "uint32_t": 4, "char": 1}
+
+
+def getCLayout(structC):
+    # [(field, offset, size)] of a C struct with natural alignment, its size
+    layout = []
+    offset = 0
+    for ctype, name, count in FIELD_RE.findall(structC):
+        align = C_SIZES[ctype]
+        offset += -offset % align
+        size = align * int(count or 1)
+        layout.append((name, offset, size))
+        offset += size
+    return layout, offset
+
+
+def getStructLayout(fmt):
+    # [(offset, size)] of the fields of a "<" struct format
+    layout = []
+    offset = 0
+    for count, code in re.findall(r"(\d*)([a-zA-Z])", fmt.lstrip("<")):
+        if code == "s":
+            sizes = [int(count or 1)]
+        else:
+            sizes = [struct.calcsize("<" + code)] * int(count or 1)
+        for size in sizes:
+            layout.append((offset, size))
+            offset += size
+    return layout
+
+
+def readRecords(text):
+    """(type, address offset, data) of every record, checking its length and checksum"""
+    records = []
+    for line in text.splitlines():
+        assert line.startswith(":"), line
+        record = bytearray.fromhex(line[1:])
+        assert len(record) == record[0] + 5, line
+        assert sum(record) & 0xff == 0, line
+        records.append((record[3], (record[1] << 8) | record[2], bytes(record[4:-1])))
+    return records
+
+
+def readMemory(records):
+    # The bytes of the data records from their first address, which must follow each other
+    start = address = None
+    data = bytearray()
+    addressHi = 0
+    for recordType, offset, payload in records:
+        if recordType == languagePack.INTELHEX_EXTENDED_LINEAR_ADDRESS_RECORD:
+            addressHi = struct.unpack(">H", payload)[0]
+        elif recordType == languagePack.INTELHEX_DATA_RECORD:
+            if start is None:
+                start = address = (addressHi << 16) | offset
+            assert (addressHi << 16) | offset == address
+            data += payload
+            address += len(payload)
+    return start, bytes(data)
+
+
+class LanguagePackTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.compiler = make_translation.TranslationCompiler.fromDirectory(SCRIPT_DIR)
+            cls.compiled = cls.compiler.compile(packs=True, jobs=0)
+
+    def testHeaderLayout(self):
+        layout, size = getCLayout(languagePack.HEADER_C)
+        self.assertEqual(size, 40)
+        self.assertEqual(languagePack._HEADER.size, size)
+        self.assertEqual([(offset, fieldSize) for _, offset, fieldSize in layout],
+                         getStructLayout(languagePack._HEADER.format))
+        # The struct the generated loader reads the pack with
+        self.assertIn(languagePack.HEADER_C, self.compiled.blocks[0])
+
+    def testIntelHex(self):
+        defs = make_translation.getLanguageDefs(self.compiler.defs)
+        self.assertEqual(sorted(self.compiled.packs), sorted(self.compiler.getLanguageCodes()))
+        for langCode, pack in sorted(self.compiled.packs.items()):
+            with self.subTest(language=langCode):
+                f = io.StringIO()
+                languagePack.writeIntelHex(f, pack)
+                records = readRecords(f.getvalue())
+                self.assertEqual(records[0], (languagePack.INTELHEX_EXTENDED_LINEAR_ADDRESS_RECORD,
+                                              0, b"\x08\x00"))
+                self.assertEqual(records[-1], (languagePack.INTELHEX_END_OF_FILE_RECORD, 0, b""))
+                start, data = readMemory(records)
+                self.assertEqual(start, 0x0800D800)
+                self.assertEqual(start, languagePack.PACK_ADDRESS)
+                self.assertGreaterEqual(len(data), languagePack.INTELHEX_MINIMUM_SIZE)
+                self.assertEqual(data[:len(pack)], pack)
+                self.assertEqual(set(data[len(pack):]) - {0xff}, set())
+
+                header, strings = languagePack.readPack(data)
+                lang = self.compiler.langDict[langCode]
+                slots = make_translation.getPackSlots(defs, lang, self.compiler.buildVersion)
+                self.assertEqual(header['languageCode'], langCode)
+                self.assertEqual(header['slotCount'], len(slots))
+                self.assertEqual(header['shortNameType'], 2 if lang['menuDouble'] else 1)
+                self.assertEqual(header['font12'], languagePack.getIndexSize(len(slots)))
+                self.assertEqual(header['size'], len(pack))
+                self.assertEqual(len(strings), len(slots))
+
+    def testPadding(self):
+        f = io.StringIO()
+        languagePack.writeIntelHex(f, b"\x01\x02\x03")
+        start, data = readMemory(readRecords(f.getvalue()))
+        self.assertEqual(start, languagePack.PACK_ADDRESS)
+        self.assertEqual(data, b"\x01\x02\x03" + b"\xff" * (languagePack.INTELHEX_MINIMUM_SIZE - 3))
+
+    def testSegment(self):
+        with self.assertRaises(ValueError):
+            languagePack.writeIntelHex(io.StringIO(), bytes(0x3000))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+Round trip of make_translation.py --compress for every language: the decode
+table and stream written to the block, decoded with the reference decoder of
+stringCompression.py, give back the strings of the uncompressed block, and
+the inflated strings fit in the RAM budget.
+
+Run with `python3 -m unittest discover -s "Translation Editor"` (or pytest).
+"""
+import contextlib
+import io
+import os
+import re
+import sys
+import unittest
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+import make_translation  # noqa: E402
+import stringCompression  # noqa: E402
+
+TABLE_RE = re.compile(r"static const uint8_t (\w+)\[\] = \{\n(.*?)\};", re.S)
+BUFFER_RE = re.compile(r"static char TranslationBuffer\[(\d+)\];")
+OFFSET_RE = re.compile(r"TranslationBuffer \+ (\d+)")
+
+
+def readTables(text):
+    # name -> bytes of the static byte tables of a block
+    return dict((name, bytes(int(x, 16) for x in re.findall(r"0x([0-9A-F]{2})", body)))
+                for name, body in TABLE_RE.findall(text))
+
+
+def toLiteral(data):
+    # The C literal the uncompressed block has for the encoded string data
+    return "\"" + "".join("\\x%0.2X" % x for x in bytearray(data)) + "\""
+
+
+def inflate(text):
+    """The TranslationBuffer a compressed block holds after decompressTranslations()"""
+    tables = readTables(text)
+    size = int(BUFFER_RE.search(text).group(1))
+    lengthCounts = [0] + list(bytearray(tables["TranslationCodeLengths"]))
+    return stringCompression.decode(lengthCounts, bytearray(tables["TranslationSymbols"]),
+                                    tables["TranslationStream"], size)
+
+
+def getString(buffer, offset):
+    return buffer[offset:buffer.index(b"\0", offset)]
+
+
+class CompressedStringsTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.compiler = make_translation.TranslationCompiler.fromDirectory(SCRIPT_DIR)
+            cls.compressed = cls.compiler.render(compress=True, jobs=0)
+            cls.plain = cls.compiler.render(jobs=0)
+
+    def testEveryLanguage(self):
+        self.assertEqual(sorted(self.compressed), sorted(self.compiler.getLanguageCodes()))
+
+    def testRoundTrip(self):
+        # Every line pointing into the buffer, with the decoded strings put
+        # in place of the offsets, is a line of the uncompressed block
+        for langCode in sorted(self.compressed):
+            with self.subTest(language=langCode):
+                text = self.compressed[langCode][0]
+                buffer = inflate(text)
+                plainLines = set(self.plain[langCode][0].splitlines())
+                lines = [line for line in text.splitlines() if OFFSET_RE.search(line)]
+                self.assertTrue(lines)
+                for line in lines:
+                    decoded = OFFSET_RE.sub(
+                        lambda m: toLiteral(getString(buffer, int(m.group(1)))), line)
+                    self.assertIn(decoded, plainLines)
+
+    def testRamBudget(self):
+        for langCode in sorted(self.compressed):
+            with self.subTest(language=langCode):
+                size = int(BUFFER_RE.search(self.compressed[langCode][0]).group(1))
+                self.assertLessEqual(size, make_translation.COMPRESS_RAM_BUDGET)
+
+    def testOverBudget(self):
+        budget = make_translation.COMPRESS_RAM_BUDGET
+        make_translation.COMPRESS_RAM_BUDGET = 100
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                with self.assertRaises(ValueError):
+                    self.compiler.render(["EN"], compress=True)
+        finally:
+            make_translation.COMPRESS_RAM_BUDGET = budget
+
+
+if __name__ == "__main__":
+    unittest.main()
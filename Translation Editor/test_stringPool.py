@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+make_translation.py --pool-strings for every language: the pool built from
+the real strings of a language gives back every string at its offset, up to
+its NUL terminator, including the strings stored in the tail of a longer
+one, and the TranslationStrings[] written to the block with the offsets put
+in place of the literals gives the lines of the unpooled block.
+
+Run with `python3 -m unittest discover -s "Translation Editor"` (or pytest).
+"""
+import contextlib
+import io
+import os
+import re
+import sys
+import unittest
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+import make_translation  # noqa: E402
+import stringPool  # noqa: E402
+
+POOL_RE = re.compile(r"const char TranslationStrings\[\] =\n(.*?);\n", re.S)
+LITERAL_RE = re.compile(r"^\s*\"(.*)\"//", re.M)
+OFFSET_RE = re.compile(r"TranslationStrings \+ (\d+)")
+
+
+def readPool(text):
+    # The bytes of the TranslationStrings[] of a block
+    literals = LITERAL_RE.findall(POOL_RE.search(text).group(1))
+    return make_translation.getEncodedBytes("".join(literals))
+
+
+def getString(pool, offset):
+    # Independent of stringPool.readString: up to the next NUL
+    return pool[offset:].split(b"\0", 1)[0]
+
+
+def toLiteral(data):
+    # The C literal the unpooled block has for the encoded string data
+    return "\"" + "".join("\\x%0.2X" % x for x in bytearray(data)) + "\""
+
+
+class StringPoolTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.compiler = make_translation.TranslationCompiler.fromDirectory(SCRIPT_DIR)
+            cls.pooled = cls.compiler.render(pool=True, jobs=0)
+            cls.plain = cls.compiler.render(jobs=0)
+            cls.strings = dict((langCode, cls.getPoolStrings(langCode))
+                               for langCode in cls.compiler.getLanguageCodes())
+
+    @classmethod
+    def getPoolStrings(cls, langCode):
+        # The encoded strings of the pool of a language, as writeStringPool has them
+        defs = make_translation.getLanguageDefs(cls.compiler.defs)
+        lang = cls.compiler.langDict[langCode]
+        textList = make_translation.getLetterCounts(defs, lang, cls.compiler.buildVersion)
+        _, symbolMap = make_translation.getFontMapAndTable(textList)
+        codec = make_translation.SymbolCodec(symbolMap)
+        texts = make_translation.getPoolTexts(defs, lang, cls.compiler.buildVersion)
+        return [make_translation.getEncodedBytes(codec.encode(text)) for text in texts]
+
+    def testReadBack(self):
+        for langCode, strings in sorted(self.strings.items()):
+            with self.subTest(language=langCode):
+                pool, offsets = stringPool.poolStrings(strings)
+                self.assertTrue(pool.endswith(b"\0"))
+                self.assertEqual(set(offsets), set(strings))
+                for text in strings:
+                    self.assertEqual(getString(pool, offsets[text]), text)
+
+    def testSharedEndings(self):
+        # Every language has strings stored in the tail of a longer one
+        for langCode, strings in sorted(self.strings.items()):
+            with self.subTest(language=langCode):
+                pool, offsets = stringPool.poolStrings(strings)
+                _, merged = stringPool.getPoolStats(strings, pool)
+                tails = [text for text, offset in offsets.items()
+                         if offset and pool[offset - 1] != 0]
+                self.assertTrue(tails)
+                self.assertEqual(len(tails), merged)
+                for text in tails:
+                    self.assertEqual(getString(pool, offsets[text]), text)
+
+    def testTails(self):
+        strings = [b"OFF", b"F", b"FF", b"ON", b"OFF", b""]
+        pool, offsets = stringPool.poolStrings(strings)
+        self.assertEqual(len(pool), len(b"OFF\0ON\0"))
+        for text in strings:
+            self.assertEqual(getString(pool, offsets[text]), text)
+        self.assertEqual(stringPool.getPoolStats(strings, pool), (1, 3))
+
+    def testOffsetLimit(self):
+        strings = [b"%05d" % i for i in range(stringPool.MAX_POOL_SIZE // 6 + 1)]
+        with self.assertRaises(ValueError):
+            stringPool.poolStrings(strings)
+
+    def testBlock(self):
+        # Every line pointing into the pool, with the string at its offset
+        # put in place of it, is a line of the unpooled block
+        for langCode in sorted(self.pooled):
+            with self.subTest(language=langCode):
+                text = self.pooled[langCode][0]
+                pool = readPool(text)
+                plainLines = set(self.plain[langCode][0].splitlines())
+                lines = [line for line in text.splitlines() if OFFSET_RE.search(line)]
+                self.assertTrue(lines)
+                for line in lines:
+                    pooled = OFFSET_RE.sub(
+                        lambda m: toLiteral(getString(pool, int(m.group(1)))), line)
+                    self.assertIn(pooled, plainLines)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+The .cache/*.ir entries of translationStore.py: loaded as long as the
+translation and translations_def.js are unchanged, compiled again when one
+of them changes or the cache file is damaged, and translations_def.js
+parsed however its "var def =" line is laid out.
+
+Run with `python3 -m unittest discover -s "Translation Editor"` (or pytest).
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, SCRIPT_DIR)
+
+import translationStore  # noqa: E402
+
+FILE_NAMES = ["translation_de.json", "translation_en.json"]
+
+
+class TranslationStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.jsonDir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.jsonDir)
+        for fileName in [translationStore.DEFS_FILE] + FILE_NAMES:
+            shutil.copy(os.path.join(SCRIPT_DIR, fileName), self.jsonDir)
+        self.cacheDir = os.path.join(self.jsonDir, translationStore.CACHE_DIR)
+
+    def load(self):
+        """(langDict, [compiled language codes], defs compiled) of a loadLanguages call"""
+        languages = mock.patch.object(translationStore, "compileLanguage",
+                                      wraps=translationStore.compileLanguage)
+        defs = mock.patch.object(translationStore, "parseDefs", wraps=translationStore.parseDefs)
+        with languages as compileLanguage, defs as parseDefs:
+            _, langDict, _ = translationStore.loadLanguages(self.jsonDir, FILE_NAMES)
+        compiled = sorted(call[0][1][12:-5].upper() for call in compileLanguage.call_args_list)
+        return langDict, compiled, parseDefs.called
+
+    def getCacheFile(self, fileName):
+        return translationStore.getCacheFile(self.cacheDir, fileName)
+
+    def editLanguage(self, fileName, edit):
+        path = os.path.join(self.jsonDir, fileName)
+        with open(path, "rb") as f:
+            lang = json.loads(f.read().decode("utf-8"))
+        edit(lang)
+        with open(path, "wb") as f:
+            f.write(json.dumps(lang, ensure_ascii=False, indent="\t").encode("utf-8"))
+
+    def testCacheHit(self):
+        first, compiled, defsCompiled = self.load()
+        self.assertEqual(compiled, ["DE", "EN"])
+        self.assertTrue(defsCompiled)
+        for fileName in [translationStore.DEFS_FILE] + FILE_NAMES:
+            self.assertTrue(os.path.isfile(self.getCacheFile(fileName)))
+        second, compiled, defsCompiled = self.load()
+        self.assertEqual(compiled, [])
+        self.assertFalse(defsCompiled)
+        self.assertEqual(second, first)
+
+    def testTranslationChanged(self):
+        self.load()
+        self.editLanguage("translation_de.json",
+                          lambda lang: lang['messages'].update(SettingsResetMessage="Neu"))
+        langDict, compiled, defsCompiled = self.load()
+        self.assertEqual(compiled, ["DE"])
+        self.assertFalse(defsCompiled)
+        self.assertEqual(langDict["DE"]['messages']['SettingsResetMessage'], "Neu")
+
+    def testDefsChanged(self):
+        # Every translation is checked again against the new definitions
+        self.load()
+        defsFile = os.path.join(self.jsonDir, translationStore.DEFS_FILE)
+        with open(defsFile, "ab") as f:
+            f.write(b"\n")
+        _, compiled, defsCompiled = self.load()
+        self.assertTrue(defsCompiled)
+        self.assertEqual(compiled, ["DE", "EN"])
+
+    def testDamagedCache(self):
+        first, _, _ = self.load()
+        cacheFile = self.getCacheFile("translation_de.json")
+        with open(cacheFile, "rb") as f:
+            data = f.read()
+        header = translationStore._HEADER.size
+        for damaged in (b"", data[:header - 1], data[:header], data[:header + 10],
+                        data[:header] + b"\xff" * 64, b"x" * len(data)):
+            with open(cacheFile, "wb") as f:
+                f.write(damaged)
+            langDict, compiled, _ = self.load()
+            self.assertEqual(compiled, ["DE"])
+            self.assertEqual(langDict, first)
+            with open(cacheFile, "rb") as f:
+                self.assertEqual(f.read(), data)
+
+    def testDefsPrefix(self):
+        with open(os.path.join(SCRIPT_DIR, translationStore.DEFS_FILE), "rb") as f:
+            data = f.read()
+        defs = translationStore.parseDefs(data)
+        body = json.dumps(defs).encode("utf-8")
+        for prefix, suffix in ((b"var def = ", b""), (b"var def=", b";\n"),
+                               (b"\r\nvar  def =\r\n", b"\r\n")):
+            self.assertEqual(translationStore.parseDefs(prefix + body + suffix), defs)
+        for broken in (body, b"def = " + body, b""):
+            with self.assertRaises(ValueError):
+                translationStore.parseDefs(broken)
+
+
+if __name__ == "__main__":
+    unittest.main()
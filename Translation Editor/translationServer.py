@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+Local compile server for TranslationEditor.html.
+
+Serves the Translation Editor directory over HTTP and compiles the
+translation being edited without writing anything, so the editor can show
+what a build would say about it:
+
+    GET  /<file>   a file of the directory, / is TranslationEditor.html
+    POST /compile  body: a translation_xx.json, answers with JSON
+        language      language code
+        symbols       distinct symbols of the language (with the constants)
+        glyphRows     font rows after merging identical glyphs
+        codePages     code pages the language needs
+        missingGlyphs symbols without a glyph in one of the fonts
+        overflows     [{id, width, allowed}] strings too wide for the screen
+        sizes         size report rows per model (see sizeReport.py)
+        messages      output of the generator
+        errors        problems of the file, nothing else is filled then
+        cached        answered from the cache
+        milliseconds  time taken
+
+The fonts and translations_def.js stay loaded, translations_def.js is read
+again when it changes. Answers are kept in an LRU cache keyed by the hash
+of the posted file and of translations_def.js, so sending the same content
+again answers at once. Only the standard library is used, one request per
+connection.
+"""
+from __future__ import print_function
+import io
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import argparse
+import asyncio
+import mimetypes
+import contextlib
+import collections
+from urllib.parse import unquote, urlsplit
+from concurrent.futures import ThreadPoolExecutor
+
+import fontStore
+import widthCheck
+import translationStore
+import make_translation
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+INDEX_FILE = "TranslationEditor.html"
+MAX_BODY_SIZE = 1024 * 1024
+LANGUAGE_CODE_RE = re.compile(r"^[A-Za-z]+(_[A-Za-z]+)*$")
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+}
+
+
+def getUploadErrors(upload):
+    # What keeps a posted translation from being checked like a file of the directory
+    if not isinstance(upload, dict):
+        return ["not a JSON object"]
+    langCode = upload.get('languageCode')
+    if langCode is None:
+        return ["languageCode is missing"]
+    if not translationStore.isText(langCode) or not LANGUAGE_CODE_RE.match(langCode):
+        return ["languageCode must be a language code like \"DE\" or \"SR_LATN\""]
+    return []
+
+
+class CompileServer(object):
+    """
+    State of the server: the loaded definitions and the answer cache.
+    Compiles run one at a time on a worker thread, the generator prints its
+    progress and that output is captured for the answer
+    """
+
+    def __init__(self, directory, buildVersion, cacheSize=64):
+        self.directory = os.path.abspath(directory)
+        self.buildVersion = buildVersion
+        self.cacheSize = cacheSize
+        self.cache = collections.OrderedDict()  # content hash -> answer
+        self.defsStat = None
+        self.defs = self.defsHash = None
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def loadDefs(self):
+        # translations_def.js, parsed again only when the file changed
+        st = os.stat(os.path.join(self.directory, translationStore.DEFS_FILE))
+        if (st.st_mtime_ns, st.st_size) != self.defsStat:
+            self.defs, self.defsHash = translationStore.loadDefs(self.directory)
+            self.defsStat = (st.st_mtime_ns, st.st_size)
+
+    def compileTranslation(self, data):
+        """Answer of POST /compile for the bytes of a translation file"""
+        answer = {'language': None, 'symbols': 0, 'glyphRows': 0, 'codePages': 0,
+                  'missingGlyphs': [], 'overflows': [], 'sizes': [], 'messages': [],
+                  'errors': []}
+        try:
+            upload = json.loads(data.decode("utf-8"))
+        except ValueError as e:
+            answer['errors'] = ["Failed to decode the translation: " + str(e)]
+            return answer
+        answer['errors'] = getUploadErrors(upload)
+        if answer['errors']:
+            return answer
+        fileName = "translation_" + upload['languageCode'].lower() + ".json"
+        try:
+            langCode, lang, unit = translationStore.compileLanguage(data, fileName, self.defs)
+            translationStore.addFallbackOptions(self.directory, self.defs, {langCode: lang})
+        except ValueError as e:
+            answer['errors'] = str(e).splitlines()
+            return answer
+        answer['language'] = langCode
+
+        store = fontStore.getFontStore()
+        symbols = make_translation.getLetterCounts(self.defs, lang, self.buildVersion)
+        answer['symbols'] = len(symbols)
+        answer['missingGlyphs'] = [sym for sym in symbols
+                                   if not store.hasGlyph(fontStore.FONT_LARGE, sym) or
+                                   not store.hasGlyph(fontStore.FONT_SMALL, sym)]
+        overflows = widthCheck.checkWidths(self.defs, {langCode: lang}).get(langCode, [])
+        answer['overflows'] = [{'id': eid, 'width': width, 'allowed': allowed}
+                               for eid, width, allowed in overflows]
+        if answer['missingGlyphs']:
+            # The font table can not be generated
+            return answer
+
+        compiler = make_translation.TranslationCompiler({langCode: lang}, {langCode: unit},
+                                                        self.defs, self.buildVersion)
+        output = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(output):
+                _, sizes, codePages = compiler.render([langCode])[langCode]
+        except (ValueError, SystemExit) as e:
+            answer['errors'] = [str(e) or "generation failed"]
+            sizes, codePages = [], 0
+        answer['messages'] = output.getvalue().splitlines()
+        answer['sizes'] = sizes
+        answer['codePages'] = codePages
+        if sizes:
+            answer['glyphRows'] = sizes[0]['font'] // sum(fontStore.GLYPH_BYTES)
+        return answer
+
+    async def compile(self, data):
+        # Cached answer, or a new one compiled on the worker thread
+        self.loadDefs()
+        key = hashlib.sha256(self.defsHash + data).hexdigest()
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return dict(self.cache[key], cached=True)
+        start = time.perf_counter()
+        answer = await asyncio.get_running_loop().run_in_executor(
+            self.executor, self.compileTranslation, data)
+        answer['milliseconds'] = round(1000 * (time.perf_counter() - start), 1)
+        self.cache[key] = answer
+        while len(self.cache) > self.cacheSize:
+            self.cache.popitem(last=False)
+        return dict(answer, cached=False)
+
+    def getFile(self, path):
+        # (content type, bytes) of a file below the directory, or None
+        path = unquote(path).lstrip("/") or INDEX_FILE
+        fileName = os.path.abspath(os.path.join(self.directory, path))
+        if os.path.dirname(fileName) != self.directory or not os.path.isfile(fileName):
+            return None
+        with open(fileName, "rb") as f:
+            data = f.read()
+        contentType = mimetypes.guess_type(fileName)[0] or "application/octet-stream"
+        if contentType.startswith("text/") or contentType.endswith("javascript"):
+            contentType += "; charset=utf-8"
+        return contentType, data
+
+    async def route(self, method, target, body):
+        # (status, content type, bytes) of a request
+        path = urlsplit(target).path
+        if path == "/compile":
+            if method != "POST":
+                return 405, "text/plain", b"POST a translation file"
+            start = time.perf_counter()
+            answer = await self.compile(body)
+            if answer['cached']:
+                answer['milliseconds'] = round(1000 * (time.perf_counter() - start), 1)
+            return 200, "application/json", json.dumps(answer, ensure_ascii=False).encode("utf-8")
+        if method != "GET":
+            return 405, "text/plain", b"only GET"
+        found = self.getFile(path)
+        if found is None:
+            return 404, "text/plain", b"not found"
+        return (200,) + found
+
+    async def handleClient(self, reader, writer):
+        try:
+            status, contentType, payload, request = await self.readRequest(reader)
+            writer.write("HTTP/1.1 {} {}\r\nContent-Type: {}\r\nContent-Length: {}\r\n"
+                         "Connection: close\r\n\r\n".format(status, STATUS_TEXT[status],
+                                                            contentType, len(payload))
+                         .encode("latin-1") + payload)
+            await writer.drain()
+            print("{} {}".format(status, request), file=sys.stderr)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def readRequest(self, reader):
+        # (status, content type, payload, request line) of the next request
+        requestLine = (await reader.readline()).decode("latin-1").strip()
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if not line.strip():
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        parts = requestLine.split()
+        if len(parts) != 3:
+            return (400, "text/plain", b"bad request") + (requestLine,)
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            return (400, "text/plain", b"bad Content-Length") + (requestLine,)
+        if length > MAX_BODY_SIZE:
+            return (413, "text/plain", b"translation too large") + (requestLine,)
+        body = await reader.readexactly(length)
+        return await self.route(parts[0], parts[1], body) + (requestLine,)
+
+
+def parse_commandline():
+    parser = argparse.ArgumentParser(
+        description="Serve the Translation Editor with a compile endpoint")
+    parser.add_argument("jsonDir", nargs="?", default=SCRIPT_DIR,
+                        help="directory holding translations_def.js and the editor")
+    parser.add_argument("--host", default="127.0.0.1",
+                        help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000,
+                        help="port to listen on (default: 8000)")
+    parser.add_argument("--cache-size", type=int, default=64,
+                        help="compiled answers to keep (default: 64)")
+    parser.add_argument("--build-version",
+                        help="build version to compile with instead of the one of "
+                             "version.h and git")
+    return parser.parse_args()
+
+
+async def serve(server, host, port):
+    listener = await asyncio.start_server(server.handleClient, host, port)
+    print("Translation Editor on http://{}:{}/".format(host, port))
+    sys.stdout.flush()
+    async with listener:
+        await listener.serve_forever()
+
+
+if __name__ == "__main__":
+    args = parse_commandline()
+    buildVersion = args.build_version
+    if buildVersion is None:
+        try: buildVersion = make_translation.readVersion(args.jsonDir)
+        except: print("error: could not get/extract build version"); sys.exit(1)
+    server = CompileServer(args.jsonDir, buildVersion, args.cache_size)
+    try:
+        # Fonts and definitions are loaded before the first request
+        server.loadDefs()
+        fontStore.getFontStore()
+    except (OSError, ValueError) as e:
+        print("error: " + str(e))
+        sys.exit(1)
+    try:
+        asyncio.run(serve(server, args.host, args.port))
+    except KeyboardInterrupt:
+        pass
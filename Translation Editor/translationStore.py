@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+Validated, compiled form of translations_def.js and the translation files.
+
+Every input file is parsed once, checked against the definitions and
+reduced to the fields the generator reads. The result is cached next to the
+translations, one file per input, and loaded from there as long as the
+input (and, for a translation, translations_def.js) has the same content.
+
+Cache file layout:
+    header : magic "TSIR", format version (u16), marshal version (u16),
+             sha256 of the input and of translations_def.js (32 bytes)
+    data   : the compiled value, marshal encoded
+
+A translation compiles to (language code, language, Fahrenheit support),
+where language has the structure of the JSON file with only the used
+fields; languageLocalName is always present. The definitions compile to
+their parsed JSON.
+
+The menu options of a feature (their definition has "feature") may be left
+out of a translation, loadLanguages gives them the text of the English
+translation, which must have them.
+"""
+from __future__ import print_function
+import os
+import re
+import sys
+import json
+import marshal
+import struct
+import hashlib
+
+from atomicWrite import writeAtomic
+
+STORE_MAGIC = b"TSIR"
+STORE_VERSION = 1
+CACHE_DIR = ".cache"
+DEFS_FILE = "translations_def.js"
+# Language whose text the translations without a feature option get
+FALLBACK_LANGUAGE = "EN"
+
+_HEADER = struct.Struct("<4sHH32s")
+# What translations_def.js puts before its JSON, so the editor can load it
+DEFS_PREFIX_RE = re.compile(r"\s*var\s+def\s*=")
+
+# Fields of the definition entries that must be there, per section
+DEFS_FIELDS = {
+    'messages': ('id',),
+    'characters': ('id',),
+    'menuGroups': ('id',),
+    'menuOptions': ('id',),
+}
+
+
+def parseDefs(data):
+    # translations_def.js is JSON behind "var def =", raises ValueError otherwise
+    text = data.decode("utf-8")
+    prefix = DEFS_PREFIX_RE.match(text)
+    if prefix is None:
+        raise ValueError("does not start with \"var def =\"")
+    return json.loads(text[prefix.end():].rstrip().rstrip(";"))
+
+
+def getDefsErrors(defs):
+    errors = []
+    for section, fields in DEFS_FIELDS.items():
+        if not isinstance(defs.get(section), list):
+            errors.append("missing section " + section)
+            continue
+        for i, mod in enumerate(defs[section]):
+            for field in fields:
+                if field not in mod:
+                    errors.append("{}[{}] has no {}".format(section, i, field))
+    return errors
+
+
+def isText(value):
+    return isinstance(value, str)
+
+
+def isTextPair(value):
+    return isinstance(value, list) and len(value) == 2 and all(isText(x) for x in value)
+
+
+def checkText(errors, name, value):
+    if value is None:
+        errors.append(name + " is missing")
+    elif not isText(value):
+        errors.append(name + " must be a string")
+
+
+def getLanguageErrors(defs, lang, langCode):
+    """Every problem of a parsed translation file, an empty list if none"""
+    errors = []
+    if not isinstance(lang, dict):
+        return ["not a JSON object"]
+    if lang.get('languageCode') != langCode:
+        errors.append("languageCode is {}, expected {}".format(
+            lang.get('languageCode', "(missing)"), langCode))
+    if not isinstance(lang.get('menuDouble'), bool):
+        errors.append("menuDouble must be true or false")
+    if not isinstance(lang.get('tempUnitFahrenheit', True), bool):
+        errors.append("tempUnitFahrenheit must be true or false")
+    if not isText(lang.get('languageLocalName', "")):
+        errors.append("languageLocalName must be a string")
+
+    for section in DEFS_FIELDS:
+        if not isinstance(lang.get(section), dict):
+            errors.append("missing section " + section)
+    if errors:
+        return errors
+
+    # Messages without a translation fall back to their default
+    for mod in defs['messages']:
+        eid = mod['id']
+        if eid in lang['messages'] or 'default' not in mod:
+            checkText(errors, "messages." + eid, lang['messages'].get(eid))
+    for mod in defs['characters']:
+        checkText(errors, "characters." + mod['id'], lang['characters'].get(mod['id']))
+    for mod in defs['menuGroups']:
+        entry = lang['menuGroups'].get(mod['id'])
+        if not isinstance(entry, dict):
+            errors.append("menuGroups.{} is missing".format(mod['id']))
+            continue
+        if not isTextPair(entry.get('text2')):
+            errors.append("menuGroups.{}.text2 must be two strings".format(mod['id']))
+        checkText(errors, "menuGroups." + mod['id'] + ".desc", entry.get('desc'))
+    for mod in defs['menuOptions']:
+        entry = lang['menuOptions'].get(mod['id'])
+        if entry is None and 'feature' in mod and langCode != FALLBACK_LANGUAGE:
+            continue  # falls back to the English text, see addFallbackOptions
+        if not isinstance(entry, dict):
+            errors.append("menuOptions.{} is missing".format(mod['id']))
+            continue
+        if lang['menuDouble'] and not isTextPair(entry.get('text2')):
+            errors.append("menuOptions.{}.text2 must be two strings".format(mod['id']))
+        if not lang['menuDouble']:
+            checkText(errors, "menuOptions." + mod['id'] + ".text", entry.get('text'))
+        checkText(errors, "menuOptions." + mod['id'] + ".desc", entry.get('desc'))
+    return errors
+
+
+def pick(obj, fields):
+    return dict((field, obj[field]) for field in fields if field in obj)
+
+
+def getMenuText(lang):
+    # Fields of a menu option the generator reads
+    return ('text2', 'desc') if lang['menuDouble'] else ('text', 'desc')
+
+
+def normaliseLanguage(defs, lang, langCode):
+    # Only what the generator reads, in definition order
+    menuText = getMenuText(lang)
+    return {
+        'languageCode': langCode,
+        'languageLocalName': lang.get('languageLocalName', langCode),
+        'menuDouble': lang['menuDouble'],
+        'messages': pick(lang['messages'], [mod['id'] for mod in defs['messages']]),
+        'characters': pick(lang['characters'], [mod['id'] for mod in defs['characters']]),
+        'menuGroups': dict((mod['id'], pick(lang['menuGroups'][mod['id']], ('text2', 'desc')))
+                           for mod in defs['menuGroups']),
+        'menuOptions': dict((mod['id'], pick(lang['menuOptions'][mod['id']], menuText))
+                            for mod in defs['menuOptions'] if mod['id'] in lang['menuOptions']),
+    }
+
+
+def addFallbackOptions(jsonDir, defs, langDict):
+    """
+    Give the compiled languages of langDict that leave out menu options of
+    a feature the English text of them, the way messages fall back to their
+    default. Raises ValueError when the English translation lacks one
+    """
+    missing = [(lang, mod['id']) for lang in langDict.values() for mod in defs['menuOptions']
+               if mod['id'] not in lang['menuOptions']]
+    if not missing:
+        return
+    fileName = "translation_" + FALLBACK_LANGUAGE.lower() + ".json"
+    try:
+        with open(os.path.join(jsonDir, fileName), "rb") as f:
+            options = json.loads(f.read().decode("utf-8"))['menuOptions']
+    except (IOError, ValueError, KeyError, TypeError) as e:
+        raise ValueError("Failed to read the fallback options of {}: {}".format(fileName, e))
+    for lang, eid in missing:
+        entry = options.get(eid)
+        if not isinstance(entry, dict) or not all(isText(entry.get(field)) for field in ('text', 'desc')):
+            raise ValueError("{}: menuOptions.{} needs a text and a desc".format(fileName, eid))
+        lang['menuOptions'][eid] = pick(entry, getMenuText(lang))
+
+
+def compileLanguage(data, fileName, defs):
+    """
+    Parse and check the bytes of a translation file, returns the compiled
+    (language code, language, Fahrenheit support). Raises ValueError listing
+    every problem of the file
+    """
+    langCode = os.path.basename(fileName)[12:-5].upper()
+    try:
+        lang = json.loads(data.decode("utf-8"))
+    except ValueError as e:
+        raise ValueError("Failed to decode {}: {}".format(fileName, e))
+    errors = getLanguageErrors(defs, lang, langCode)
+    if errors:
+        raise ValueError("\n".join(fileName + ": " + error for error in errors))
+    return langCode, normaliseLanguage(defs, lang, langCode), lang.get('tempUnitFahrenheit', True)
+
+
+def getCacheFile(cacheDir, fileName):
+    return os.path.join(cacheDir, os.path.basename(fileName) + ".ir")
+
+
+def readCache(cacheFile, sourceHash):
+    try:
+        with open(cacheFile, "rb") as f:
+            data = f.read()
+    except IOError:
+        return None
+    if (len(data) < _HEADER.size or
+            _HEADER.unpack_from(data) != (STORE_MAGIC, STORE_VERSION, marshal.version, sourceHash)):
+        return None
+    try:
+        return marshal.loads(data[_HEADER.size:])
+    except (EOFError, ValueError, TypeError):
+        return None
+
+
+def writeCache(cacheFile, sourceHash, value):
+    cacheDir = os.path.dirname(cacheFile)
+    if not os.path.isdir(cacheDir):
+        os.makedirs(cacheDir)
+    writeAtomic(cacheFile, _HEADER.pack(STORE_MAGIC, STORE_VERSION, marshal.version, sourceHash) +
+                marshal.dumps(value))
+
+
+def loadCompiled(fileName, compileData, cacheDir, extraHash=b""):
+    # The compiled value of fileName, from the cache when its content is unchanged
+    with open(fileName, "rb") as f:
+        data = f.read()
+    sourceHash = hashlib.sha256(data + extraHash).digest()
+    cacheFile = getCacheFile(cacheDir, fileName)
+    value = readCache(cacheFile, sourceHash)
+    if value is None:
+        value = compileData(data)
+        writeCache(cacheFile, sourceHash, value)
+    return value, sourceHash
+
+
+def loadDefs(jsonDir, cacheDir=None):
+    """
+    The parsed translations_def.js of jsonDir and its content hash, which
+    the translations compiled against it are keyed with
+    """
+    def compileDefs(data):
+        try:
+            defs = parseDefs(data)
+        except ValueError as e:
+            raise ValueError("Failed to decode {}: {}".format(DEFS_FILE, e))
+        errors = getDefsErrors(defs)
+        if errors:
+            raise ValueError("\n".join(DEFS_FILE + ": " + error for error in errors))
+        return defs
+
+    if cacheDir is None:
+        cacheDir = os.path.join(jsonDir, CACHE_DIR)
+    return loadCompiled(os.path.join(jsonDir, DEFS_FILE), compileDefs, cacheDir)
+
+
+def loadLanguage(jsonDir, fileName, defs, defsHash, cacheDir=None):
+    """Compiled (language code, language, Fahrenheit support) of a translation file"""
+    if cacheDir is None:
+        cacheDir = os.path.join(jsonDir, CACHE_DIR)
+    value, _ = loadCompiled(os.path.join(jsonDir, fileName),
+                            lambda data: compileLanguage(data, fileName, defs),
+                            cacheDir, defsHash)
+    return value
+
+
+def loadLanguages(jsonDir, fileNames, cacheDir=None):
+    """
+    Load the definitions and the translation files fileNames, returns
+    (defs, {language code: language}, {language code: Fahrenheit support}).
+    Raises ValueError listing the problems of all the files at once
+    """
+    defs, defsHash = loadDefs(jsonDir, cacheDir)
+    langDict = {}
+    UnitDict = {}
+    errors = []
+    for fileName in fileNames:
+        try:
+            langCode, lang, unit = loadLanguage(jsonDir, fileName, defs, defsHash, cacheDir)
+        except (IOError, ValueError) as e:
+            errors.append(str(e))
+            continue
+        langDict[langCode] = lang
+        UnitDict[langCode] = unit
+    if errors:
+        raise ValueError("\n".join(errors))
+    addFallbackOptions(jsonDir, defs, langDict)
+    return defs, langDict, UnitDict
+
+
+if __name__ == "__main__":
+    # Check every translation of a directory, listing all problems
+    jsonDir = sys.argv[1] if len(sys.argv) > 1 else "."
+    fileNames = sorted(fileName for fileName in os.listdir(jsonDir)
+                       if fileName.lower().startswith("translation_") and
+                       fileName.lower().endswith(".json"))
+    try:
+        _, langDict, _ = loadLanguages(jsonDir, fileNames)
+    except ValueError as e:
+        for line in str(e).splitlines():
+            print("error: " + line)
+        sys.exit(1)
+    print("{} translation(s) OK".format(len(langDict)))
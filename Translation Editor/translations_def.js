@@ -282,6 +282,12 @@ var def =
 			"id": "TempChangeLongStep",
 			"maxLen": 6,
 			"maxLen2": 16
+		},
+		{
+			"id": "LanguageSwitch",
+			"feature": "LANG_MULTI",
+			"maxLen": 5,
+			"maxLen2": 8
 		}
 	]
 }
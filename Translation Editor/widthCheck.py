@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+Checks that translated strings fit the space translations_def.js gives them.
+
+Every string is measured in the font the firmware draws it in (getStringFont,
+which oledEmulator.py uses as well). OLED::drawChar moves the cursor by the
+glyph cell of the font, 12 pixels for the large font and 6 for the small one,
+so a line is that many pixels per glyph but the last, which ends where its
+ink ends. The space allowed is maxLen cells of the same font. Two line short
+names (menuDouble) use maxLen2 per line, lenSum limits several strings shown
+next to each other and the characters have to be exactly len glyphs.
+Strings containing a newline are checked line by line, messages missing
+from a translation are checked with their default. The scrolling
+descriptions have no limit.
+"""
+from __future__ import print_function
+import sys
+
+import fontStore
+
+PANEL_WIDTH = 96
+# Glyph cell of fontStore.FONT_LARGE and FONT_SMALL, what drawChar advances
+FONT_WIDTHS = (12, 6)
+
+# Messages the firmware prints after OLED::setFont(1) (GUIThread.cpp), the
+# others are drawn in the large font. The Warning* strings are not printed
+# by this firmware and follow the Sleeping* strings of the same screens
+SMALL_FONT_MESSAGES = frozenset([
+    "UndervoltageString", "InputVoltageString", "WarningTipTempString",
+    "SleepingAdvancedString", "WarningAdvancedString", "SleepingTipAdvancedString",
+    "IdleTipString", "IdleSetString", "TipDisconnectedString",
+    "SolderingAdvancedPowerPrompt", "SettingsResetMessage"])
+
+# Array of make_translation.getLanguageSlots -> section of getStringFont
+SLOT_SECTIONS = {
+    "SettingsDescriptions": "descriptions",
+    "SettingsShortNames": "menuOptions",
+    "SettingsMenuEntries": "menuGroups",
+    "SettingsMenuEntriesDescriptions": "descriptions",
+}
+
+_inkRight = {}
+
+
+def getStringFont(section, eid, lang):
+    """
+    Font the firmware draws a string in. section is a translations_def.js
+    section ("messages", "characters", "menuGroups", "menuOptions" for the
+    short names) or "descriptions" for the scrolling ones
+    """
+    if section == "messages":
+        return fontStore.FONT_SMALL if eid in SMALL_FONT_MESSAGES else fontStore.FONT_LARGE
+    if section == "menuGroups":
+        # displayMenu() of gui.cpp, two lines next to the icon
+        return fontStore.FONT_SMALL
+    if section == "menuOptions":
+        # printShortDescription() of gui.cpp
+        return fontStore.FONT_SMALL if lang['menuDouble'] else fontStore.FONT_LARGE
+    # The characters follow a short name, the descriptions scroll in the large font
+    return fontStore.FONT_LARGE
+
+
+def getSlotFont(name, lang):
+    """Font of a (variable name, text) slot of make_translation.getLanguageSlots"""
+    section = SLOT_SECTIONS.get(name.split("[")[0])
+    if section is not None:
+        return getStringFont(section, None, lang)
+    # Messages and characters are variables of their own, named by their id
+    return getStringFont("messages", name, lang)
+
+
+def getLines(text):
+    return text.replace('\\r', '').replace('\\n', '\n').split('\n')
+
+
+def getInkRight(font, sym):
+    """Columns of the glyph of sym up to its last one with ink"""
+    key = (font, sym)
+    right = _inkRight.get(key)
+    if right is None:
+        width = FONT_WIDTHS[font]
+        store = fontStore.getFontStore()
+        if store.hasGlyph(font, sym):
+            glyph = bytearray(store.getGlyph(font, sym))
+            # A column has ink when one of its page bytes is set
+            inked = [c for c in range(width) if any(glyph[c::width])]
+            right = inked[-1] + 1 if inked else 0
+        else:
+            right = width
+        _inkRight[key] = right
+    return right
+
+
+def getLineWidth(line, font):
+    if not line:
+        return 0
+    return FONT_WIDTHS[font] * (len(line) - 1) + getInkRight(font, line[-1])
+
+
+def getWidth(text, font):
+    # Pixels of the widest line
+    return max(getLineWidth(line, font) for line in getLines(text))
+
+
+def getMessage(obj, mod):
+    # The translated message, or the default of translations_def.js
+    return obj[mod['id']] if mod['id'] in obj else mod.get('default', "")
+
+
+def getLimitedStrings(defs, lang):
+    """
+    The strings of a language that have a limit, as (id, width, allowed
+    width, wrong count) with the widths in pixels and wrong count set for a
+    character that is not exactly len glyphs
+    """
+    limited = []
+    obj = lang['messages']
+    messages = dict((mod['id'], mod) for mod in defs['messages'])
+    for mod in defs['messages']:
+        eid = mod['id']
+        font = getStringFont("messages", eid, lang)
+        if 'lenSum' in mod:
+            fields = mod['lenSum']['fields']
+            if eid == fields[0]:  # the sum is checked once
+                # Printed one after the other, measured as one line
+                line = "".join(max(getLines(getMessage(obj, messages[field])), key=len)
+                               for field in fields)
+                limited.append((" + ".join(fields), getLineWidth(line, font),
+                                mod['lenSum']['maxLen'] * FONT_WIDTHS[font], False))
+        elif mod.get('maxLen') is not None:
+            limited.append((eid, getWidth(getMessage(obj, mod), font),
+                            mod['maxLen'] * FONT_WIDTHS[font], False))
+
+    obj = lang['characters']
+    for mod in defs['characters']:
+        if 'len' in mod:
+            font = getStringFont("characters", mod['id'], lang)
+            limited.append((mod['id'], getWidth(obj[mod['id']], font),
+                            mod['len'] * FONT_WIDTHS[font], len(obj[mod['id']]) != mod['len']))
+
+    obj = lang['menuGroups']
+    for mod in defs['menuGroups']:
+        if mod.get('maxLen') is not None:
+            font = getStringFont("menuGroups", mod['id'], lang)
+            limited.append((mod['id'], max(getWidth(line, font) for line in obj[mod['id']]['text2']),
+                            mod['maxLen'] * FONT_WIDTHS[font], False))
+
+    obj = lang['menuOptions']
+    for mod in defs['menuOptions']:
+        eid = mod['id']
+        font = getStringFont("menuOptions", eid, lang)
+        if lang['menuDouble']:
+            maxLen = mod.get('maxLen2', mod.get('maxLen'))
+            if maxLen is not None:
+                limited.append((eid, max(getWidth(line, font) for line in obj[eid]['text2']),
+                                maxLen * FONT_WIDTHS[font], False))
+        elif mod.get('maxLen') is not None:
+            limited.append((eid, getWidth(obj[eid]['text'], font),
+                            mod['maxLen'] * FONT_WIDTHS[font], False))
+    return limited
+
+
+def checkWidths(defs, langDict):
+    """
+    Check the limited strings of every language, returns {language code:
+    [(id, width in pixels, allowed pixels), ...]} for the languages with
+    strings that do not fit
+    """
+    report = {}
+    for langCode, lang in sorted(langDict.items()):
+        for eid, width, allowed, wrongCount in getLimitedStrings(defs, lang):
+            if width > allowed or wrongCount:
+                report.setdefault(langCode, []).append((eid, width, allowed))
+    return report
+
+
+def printWidthReport(report):
+    for langCode in sorted(report):
+        print("{}: {} string(s) do not fit".format(langCode, len(report[langCode])))
+        for eid, width, allowed in report[langCode]:
+            print("  {:<40} {:>4} px, {} px allowed".format(eid, width, allowed))
+
+
+if __name__ == "__main__":
+    import make_translation
+    import translationStore
+
+    jsonDir = sys.argv[1] if len(sys.argv) > 1 else "."
+    try:
+        langDict, _ = make_translation.readTranslations(jsonDir)
+        defs, _ = translationStore.loadDefs(jsonDir)
+    except ValueError as e:
+        print("error: " + str(e))
+        sys.exit(1)
+    report = checkWidths(defs, langDict)
+    printWidthReport(report)
+    sys.exit(1 if report else 0)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# coding=utf-8
+"""
+One entry point for the Python tools of the firmware:
+
+    ts100tool.py translate [...]  Translation Editor/make_translation.py
+    ts100tool.py logo [...]       Bootup Logo/python_logo_converter/img2ts100.py
+    ts100tool.py font [...]       Translation Editor/fontStore.py
+    ts100tool.py report [...]     Translation Editor/sizeReport.py
+
+The arguments after the command go to the tool unchanged, so
+`ts100tool.py translate --help` shows the options of make_translation.py.
+Only the tool being run is imported: the dispatch itself loads nothing but
+runpy, so PIL and NumPy are loaded by the logo converter alone, and the
+font tables only when fontStore.py has to rebuild its cache.
+benchmark.py run -c startup measures the startup of every command.
+"""
+from __future__ import print_function
+import os
+import sys
+import runpy
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+TRANSLATION_DIR = os.path.join(ROOT_DIR, "Translation Editor")
+LOGO_DIR = os.path.join(ROOT_DIR, "Bootup Logo", "python_logo_converter")
+
+# command -> (directory, script, help)
+COMMANDS = {
+    "translate": (TRANSLATION_DIR, "make_translation.py",
+                  "generate Translation.cpp and unit.h from the translations"),
+    "logo": (LOGO_DIR, "img2ts100.py", "convert an image to a boot logo Intel HEX file"),
+    "font": (TRANSLATION_DIR, "fontStore.py", "build the font store and list the fonts"),
+    "report": (TRANSLATION_DIR, "sizeReport.py", "show and check a flash size report"),
+}
+
+
+def printUsage(out):
+    print("usage: ts100tool.py {" + ",".join(COMMANDS) + "} ...", file=out)
+    print("", file=out)
+    for command, (_, script, text) in COMMANDS.items():
+        print("  {:<10} {} ({})".format(command, text, script), file=out)
+    print("", file=out)
+    print("`ts100tool.py COMMAND --help` shows the options of a command.", file=out)
+
+
+def runCommand(command, argv):
+    # Runs the script as if it was started itself, its exit code is ours.
+    # Run as a module, so the bytecode cached in __pycache__ is used instead
+    # of compiling the script on every start
+    directory, script, _ = COMMANDS[command]
+    sys.argv = [os.path.join(directory, script)] + argv
+    sys.path.insert(0, directory)
+    runpy.run_module(os.path.splitext(script)[0], run_name="__main__", alter_sys=True)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] in ("-h", "--help"):
+        printUsage(sys.stdout)
+        sys.exit(0)
+    if sys.argv[1] not in COMMANDS:
+        print("error: unknown command " + sys.argv[1], file=sys.stderr)
+        printUsage(sys.stderr)
+        sys.exit(2)
+    runCommand(sys.argv[1], sys.argv[2:])
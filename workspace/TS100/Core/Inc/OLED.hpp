@@ -101,6 +101,8 @@ public:
 	static void drawHeatSymbol(uint8_t state);
 private:
 	static void drawChar(char c); // Draw a character to a specific location
+	static void drawPageChar(uint8_t page, uint8_t c); // Draw a symbol of a code page
+	static void drawTrimmedGlyph(const uint8_t* glyph); // Draw a trimmed USER_FONT_12 glyph
 	static const uint8_t* currentFont;// Pointer to the current font used for rendering to the buffer
 	static uint8_t* firstStripPtr; // Pointers to the strips to allow for buffer having extra content
 	static uint8_t* secondStripPtr;	//Pointers to the strips
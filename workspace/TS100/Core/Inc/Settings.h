@@ -12,7 +12,7 @@
 #include <stdint.h>
 #include "stm32f1xx_hal.h"
 #include "unit.h"
-#define SETTINGSVERSION   ( 0x1E )
+#define SETTINGSVERSION   ( 0x1F )
 /*Change this if you change the struct below to prevent people getting \
           out of sync*/
 
@@ -56,6 +56,7 @@ typedef struct {
   uint8_t ReverseButtonTempChangeEnabled;   // Change the plus and minus button assigment
   uint16_t TempChangeLongStep;              // Change the plus and minus button assigment
   uint16_t TempChangeShortStep;             // Change the plus and minus button assigment
+  uint8_t language;  // Language shown by lang=MULTI builds, index into LanguageNames
 
 } systemSettingsType;
 
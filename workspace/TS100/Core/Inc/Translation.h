@@ -12,16 +12,82 @@
 enum ShortNameType {
 	SHORT_NAME_SINGLE_LINE = 1, SHORT_NAME_DOUBLE_LINE = 2,
 };
+#ifdef LANG_PACK
+/*
+ * lang=PACK firmware takes its fonts from the language pack, see loadLanguagePack()
+ */
+extern const uint8_t *USER_FONT_12;
+extern const uint8_t *USER_FONT_6x8;
+#else
 extern const uint8_t USER_FONT_12[];
 extern const uint8_t USER_FONT_6x8[];
+#endif
+#ifdef TRANSLATION_PAGE_ESCAPE
+/*
+ * Languages with more symbols than one byte codes keep the rare ones in
+ * code pages: TRANSLATION_PAGE_ESCAPE + page, then the index in the page + 1
+ */
+extern const uint8_t *const USER_FONT_12_PAGES[];
+extern const uint8_t *const USER_FONT_6x8_PAGES[];
+#endif
+#ifdef TRANSLATION_GLYPHS_TRIMMED
+/*
+ * USER_FONT_12 glyphs are stored without their empty columns, the offset
+ * of every glyph in the table is in USER_FONT_12_OFFSETS
+ */
+extern const uint16_t USER_FONT_12_OFFSETS[];
+#ifdef TRANSLATION_PAGE_ESCAPE
+extern const uint16_t *const USER_FONT_12_PAGES_OFFSETS[];
+#endif
+#endif
 /*
  * When SettingsShortNameType is SHORT_NAME_SINGLE_LINE
  * use SettingsShortNames as SettingsShortNames[16][1].. second column undefined
  */
+#if defined(LANG_MULTI) || defined(LANG_PACK)
+extern enum ShortNameType SettingsShortNameType;
+#else
 extern const enum ShortNameType SettingsShortNameType;
-extern const char *SettingsShortNames[26][2];
-extern const char *SettingsDescriptions[26];
+#endif
+#ifdef LANG_MULTI
+/*
+ * lang=MULTI adds the language setting (LanguageSwitch) to the menu options
+ */
+#define SETTINGS_OPTION_COUNT 27
+#define SETTINGS_LANGUAGE_INDEX 26
+#else
+#define SETTINGS_OPTION_COUNT 26
+#endif
+extern const char *SettingsShortNames[SETTINGS_OPTION_COUNT][2];
+extern const char *SettingsDescriptions[SETTINGS_OPTION_COUNT];
 extern const char *SettingsMenuEntries[4];
+#ifdef TRANSLATION_POOLED
+/*
+ * make_translation.py --pool-strings keeps every string of the language in
+ * TranslationStrings, the short names and menu entries are offsets into it
+ */
+extern const char TranslationStrings[];
+extern const uint16_t SettingsShortNamesOffsets[SETTINGS_OPTION_COUNT][2];
+extern const uint16_t SettingsMenuEntriesOffsets[4];
+#endif
+/*
+ * Read the short names and menu entries through these, they work whether or
+ * not the strings are pooled
+ */
+static inline const char *getSettingsShortName(uint8_t index, uint8_t line) {
+#ifdef TRANSLATION_POOLED
+	return TranslationStrings + SettingsShortNamesOffsets[index][line];
+#else
+	return SettingsShortNames[index][line];
+#endif
+}
+static inline const char *getSettingsMenuEntry(uint8_t index) {
+#ifdef TRANSLATION_POOLED
+	return TranslationStrings + SettingsMenuEntriesOffsets[index];
+#else
+	return SettingsMenuEntries[index];
+#endif
+}
 
 extern const char *SettingsCalibrationDone;
 extern const char *SettingsCalibrationWarning;
@@ -77,4 +143,32 @@ extern const char *SymbolCellCount;
 extern const char *SymbolVersionNumber;
 
 extern const char *DebugMenu[];
+
+#ifdef LANG_MULTI
+/*
+ * Multi language builds (make_translation.py --multi) carry several string
+ * tables, selectLanguage() points all of the strings above at one of them
+ */
+extern const char *const LanguageNames[];
+extern const uint8_t LanguageCount;
+void selectLanguage(uint8_t index);
+#endif
+
+#ifdef LANG_PACK
+/*
+ * lang=PACK builds (make_translation.py --packs) carry no translation, the
+ * strings and fonts come from a language pack flashed separately. This
+ * points all of them into the pack and returns false when no valid pack
+ * is flashed, the strings then stay empty
+ */
+bool loadLanguagePack();
+#endif
+
+#ifdef TRANSLATION_COMPRESSED
+/*
+ * make_translation.py --compress stores the strings Huffman coded,
+ * this inflates them into RAM and has to run before any of them is used
+ */
+void decompressTranslations();
+#endif
 #endif /* TRANSLATION_H_ */
@@ -27,7 +27,8 @@ typedef struct state_func_t {
 
 //Struct for holding the function pointers and descriptions
 typedef struct {
-	const char *description;
+	// Points at the SettingsDescriptions entry, so it follows selectLanguage()
+	const char *const *description;
 	const state_func incrementHandler;
 	const state_func draw;
 } menuitem;
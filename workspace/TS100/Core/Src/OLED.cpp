@@ -99,6 +99,12 @@ void OLED::drawChar(char c) {
 		return;
 	}
 	uint16_t index = c - 2; //First index is \x02
+#ifdef TRANSLATION_GLYPHS_TRIMMED
+	if (currentFont == USER_FONT_12) {
+		drawTrimmedGlyph(USER_FONT_12 + USER_FONT_12_OFFSETS[index]);
+		return;
+	}
+#endif
 	uint8_t *charPointer;
 	charPointer = ((uint8_t*) currentFont)
 			+ ((fontWidth * (fontHeight / 8)) * index);
@@ -106,6 +112,44 @@ void OLED::drawChar(char c) {
 	cursor_x += fontWidth;
 }
 
+#ifdef TRANSLATION_PAGE_ESCAPE
+void OLED::drawPageChar(uint8_t page, uint8_t c) {
+	const uint8_t *pageFont =
+			(currentFont == USER_FONT_6x8) ?
+					USER_FONT_6x8_PAGES[page] : USER_FONT_12_PAGES[page];
+	uint16_t index = c - 1; //First index is \x01
+#ifdef TRANSLATION_GLYPHS_TRIMMED
+	if (currentFont == USER_FONT_12) {
+		drawTrimmedGlyph(pageFont + USER_FONT_12_PAGES_OFFSETS[page][index]);
+		return;
+	}
+#endif
+	drawArea(cursor_x, cursor_y, fontWidth, fontHeight,
+			pageFont + ((fontWidth * (fontHeight / 8)) * index));
+	cursor_x += fontWidth;
+}
+#endif
+
+#ifdef TRANSLATION_GLYPHS_TRIMMED
+/*
+ * make_translation.py --compress-glyphs drops the empty columns of the large
+ * font glyphs: a header byte (first column << 4 | column count), then the
+ * columns of the top and of the bottom page. See glyphCompression.py
+ */
+void OLED::drawTrimmedGlyph(const uint8_t *glyph) {
+	uint8_t buffer[24] = { 0 };
+	uint8_t first = glyph[0] >> 4;
+	uint8_t count = glyph[0] & 0x0F;
+	for (uint8_t page = 0; page < 2; page++) {
+		for (uint8_t column = 0; column < count; column++) {
+			buffer[page * 12 + first + column] = glyph[1 + page * count + column];
+		}
+	}
+	drawArea(cursor_x, cursor_y, 12, 16, buffer);
+	cursor_x += 12;
+}
+#endif
+
 void OLED::setRotation(bool leftHanded) {
 #ifdef MODEL_TS80
 	leftHanded = !leftHanded;
@@ -135,6 +179,14 @@ void OLED::setRotation(bool leftHanded) {
 // print a string to the current cursor location
 void OLED::print(const char *str) {
 	while (str[0]) {
+#ifdef TRANSLATION_PAGE_ESCAPE
+		// Rare symbols are an escape selecting the code page, then their index
+		if ((uint8_t) str[0] >= TRANSLATION_PAGE_ESCAPE && str[1]) {
+			drawPageChar((uint8_t) str[0] - TRANSLATION_PAGE_ESCAPE, str[1]);
+			str += 2;
+			continue;
+		}
+#endif
 		drawChar(str[0]);
 		str++;
 	}
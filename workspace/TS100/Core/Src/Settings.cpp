@@ -89,6 +89,7 @@ void resetSettings() {
 	systemSettings.detailedIDLE = DETAILED_IDLE; // Detailed idle screen (off for first time users)
 	systemSettings.OrientationMode = ORIENTATION_MODE;  // Default to automatic
 	systemSettings.sensitivity = SENSITIVITY;      // Default high sensitivity
+	systemSettings.language = 0;  // First language of a lang=MULTI build
 	systemSettings.voltageDiv = VOLTAGE_DIV;  // Default divider from schematic
 	systemSettings.ShutdownTime = SHUTDOWN_TIME; // How many minutes until the unit turns itself off
 	systemSettings.boostModeEnabled = BOOST_MODE_ENABLED; // Default to having boost mode on as most people prefer it
@@ -68,6 +68,10 @@ static void settings_displayTempChangeShortStep(void);
 static void settings_setTempChangeShortStep(void);
 static void settings_displayTempChangeLongStep(void);
 static void settings_setTempChangeLongStep(void);
+#ifdef LANG_MULTI
+static void settings_setLanguage(void);
+static void settings_displayLanguage(void);
+#endif
 
 // Menu functions
 static void settings_displaySolderingMenu(void);
@@ -125,19 +129,19 @@ const menuitem rootSettingsMenu[] {
 		 * Exit
 		 */
 #ifdef MODEL_TS100
-		{ (const char*) SettingsDescriptions[0], { settings_setInputVRange }, {
+		{ &SettingsDescriptions[0], { settings_setInputVRange }, {
 				settings_displayInputVRange } }, /*Voltage input*/
 #else
-		{ (const char*) SettingsDescriptions[20], { settings_setInputPRange }, {
+		{ &SettingsDescriptions[20], { settings_setInputPRange }, {
 				settings_displayInputPRange } }, /*Voltage input*/
 #endif
-		{ (const char*) NULL, { settings_enterSolderingMenu }, {
+		{ NULL, { settings_enterSolderingMenu }, {
 				settings_displaySolderingMenu } }, /*Soldering*/
-		{ (const char*) NULL, { settings_enterPowerMenu }, {
+		{ NULL, { settings_enterPowerMenu }, {
 				settings_displayPowerMenu } }, /*Sleep Options Menu*/
-		{ (const char*) NULL, { settings_enterUIMenu },
+		{ NULL, { settings_enterUIMenu },
 				{ settings_displayUIMenu } }, /*UI Menu*/
-		{ (const char*) NULL, { settings_enterAdvancedMenu }, {
+		{ NULL, { settings_enterAdvancedMenu }, {
 				settings_displayAdvancedMenu } }, /*Advanced Menu*/
 		{ NULL, { NULL }, { NULL } }        // end of menu marker. DO NOT REMOVE
 };
@@ -150,38 +154,42 @@ const menuitem solderingMenu[] = {
  *  Temp change short step
  *  Temp change long step
  */
-{ (const char*) SettingsDescriptions[8], { settings_setBoostModeEnabled }, {
+{ &SettingsDescriptions[8], { settings_setBoostModeEnabled }, {
 		settings_displayBoostModeEnabled } }, /*Enable Boost*/
-{ (const char*) SettingsDescriptions[9], { settings_setBoostTemp }, {
+{ &SettingsDescriptions[9], { settings_setBoostTemp }, {
 		settings_displayBoostTemp } }, /*Boost Temp*/
-{ (const char*) SettingsDescriptions[10], { settings_setAutomaticStartMode }, {
+{ &SettingsDescriptions[10], { settings_setAutomaticStartMode }, {
 		settings_displayAutomaticStartMode } }, /*Auto start*/
-{ (const char*) SettingsDescriptions[24], { settings_setTempChangeShortStep }, {
+{ &SettingsDescriptions[24], { settings_setTempChangeShortStep }, {
     settings_displayTempChangeShortStep } }, /*Temp change short step*/
-{ (const char*) SettingsDescriptions[25], { settings_setTempChangeLongStep }, {
+{ &SettingsDescriptions[25], { settings_setTempChangeLongStep }, {
     settings_displayTempChangeLongStep } }, /*Temp change long step*/
 { NULL, { NULL }, { NULL } }                // end of menu marker. DO NOT REMOVE
 };
 const menuitem UIMenu[] = {
 /*
- // Language
+ *  Language (lang=MULTI only)
  *  Scrolling Speed
  *  Temperature Unit
  *  Display orientation
  *  Cooldown blink
  *  Reverse Temp change buttons + - 
  */
+#ifdef LANG_MULTI
+{ &SettingsDescriptions[SETTINGS_LANGUAGE_INDEX], { settings_setLanguage }, {
+		settings_displayLanguage } }, /* Language */
+#endif
 #ifdef ENABLED_FAHRENHEIT_SUPPORT
-{ (const char*) SettingsDescriptions[5], { settings_setTempF }, {
+{ &SettingsDescriptions[5], { settings_setTempF }, {
 		settings_displayTempF } }, /* Temperature units*/
 #endif
-{ (const char*) SettingsDescriptions[7], { settings_setDisplayRotation }, {
+{ &SettingsDescriptions[7], { settings_setDisplayRotation }, {
 		settings_displayDisplayRotation } }, /*Display Rotation*/
-{ (const char*) SettingsDescriptions[11], { settings_setCoolingBlinkEnabled }, {
+{ &SettingsDescriptions[11], { settings_setCoolingBlinkEnabled }, {
 		settings_displayCoolingBlinkEnabled } }, /*Cooling blink warning*/
-{ (const char*) SettingsDescriptions[16], { settings_setScrollSpeed }, {
+{ &SettingsDescriptions[16], { settings_setScrollSpeed }, {
 		settings_displayScrollSpeed } }, /*Scroll Speed for descriptions*/
-{ (const char*) SettingsDescriptions[23], { settings_setReverseButtonTempChangeEnabled }, {
+{ &SettingsDescriptions[23], { settings_setReverseButtonTempChangeEnabled }, {
     settings_displayReverseButtonTempChangeEnabled } }, /* Reverse Temp change buttons + - */
 { NULL, { NULL }, { NULL } }           // end of menu marker. DO NOT REMOVE
 };
@@ -192,13 +200,13 @@ const menuitem PowerMenu[] = {
  * 	Shutdown Time
  * 	Motion Sensitivity
  */
-{ (const char*) SettingsDescriptions[1], { settings_setSleepTemp }, {
+{ &SettingsDescriptions[1], { settings_setSleepTemp }, {
 		settings_displaySleepTemp } }, /*Sleep Temp*/
-{ (const char*) SettingsDescriptions[2], { settings_setSleepTime }, {
+{ &SettingsDescriptions[2], { settings_setSleepTime }, {
 		settings_displaySleepTime } }, /*Sleep Time*/
-{ (const char*) SettingsDescriptions[3], { settings_setShutdownTime }, {
+{ &SettingsDescriptions[3], { settings_setShutdownTime }, {
 		settings_displayShutdownTime } }, /*Shutdown Time*/
-{ (const char*) SettingsDescriptions[4], { settings_setSensitivity }, {
+{ &SettingsDescriptions[4], { settings_setSensitivity }, {
 		settings_displaySensitivity } }, /* Motion Sensitivity*/
 { NULL, { NULL }, { NULL } }           // end of menu marker. DO NOT REMOVE
 };
@@ -213,20 +221,20 @@ const menuitem advancedMenu[] = {
  *  Calibrate Input V
  *  Reset Settings
  */
-{ (const char*) SettingsDescriptions[21], { settings_setPowerLimitEnable }, {
+{ &SettingsDescriptions[21], { settings_setPowerLimitEnable }, {
 		settings_displayPowerLimitEnable } }, /*Power limit enable*/
-{ (const char*) SettingsDescriptions[22], { settings_setPowerLimit }, {
+{ &SettingsDescriptions[22], { settings_setPowerLimit }, {
 		settings_displayPowerLimit } }, /*Power limit*/
-{ (const char*) SettingsDescriptions[6], { settings_setAdvancedIDLEScreens }, {
+{ &SettingsDescriptions[6], { settings_setAdvancedIDLEScreens }, {
 		settings_displayAdvancedIDLEScreens } }, /* Advanced idle screen*/
-{ (const char*) SettingsDescriptions[15],
+{ &SettingsDescriptions[15],
 		{ settings_setAdvancedSolderingScreens }, {
 				settings_displayAdvancedSolderingScreens } }, /* Advanced soldering screen*/
-{ (const char*) SettingsDescriptions[13], { settings_setResetSettings }, {
+{ &SettingsDescriptions[13], { settings_setResetSettings }, {
 		settings_displayResetSettings } }, /*Resets settings*/
-{ (const char*) SettingsDescriptions[12], { settings_setCalibrate }, {
+{ &SettingsDescriptions[12], { settings_setCalibrate }, {
 		settings_displayCalibrate } }, /*Calibrate tip*/
-{ (const char*) SettingsDescriptions[14], { settings_setCalibrateVIN }, {
+{ &SettingsDescriptions[14], { settings_setCalibrateVIN }, {
 		settings_displayCalibrateVIN } }, /*Voltage input cal*/
 { NULL, { NULL }, { NULL } }  // end of menu marker. DO NOT REMOVE
 };
@@ -234,15 +242,15 @@ const menuitem advancedMenu[] = {
 static void printShortDescriptionSingleLine(uint32_t shortDescIndex) {
 	OLED::setFont(0);
 	OLED::setCharCursor(0, 0);
-	OLED::print(SettingsShortNames[shortDescIndex][0]);
+	OLED::print(getSettingsShortName(shortDescIndex, 0));
 }
 
 static void printShortDescriptionDoubleLine(uint32_t shortDescIndex) {
 	OLED::setFont(1);
 	OLED::setCharCursor(0, 0);
-	OLED::print(SettingsShortNames[shortDescIndex][0]);
+	OLED::print(getSettingsShortName(shortDescIndex, 0));
 	OLED::setCharCursor(0, 1);
-	OLED::print(SettingsShortNames[shortDescIndex][1]);
+	OLED::print(getSettingsShortName(shortDescIndex, 1));
 }
 
 /**
@@ -519,6 +527,19 @@ static void settings_displayScrollSpeed(void) {
 					SettingFastChar : SettingSlowChar);
 }
 
+#ifdef LANG_MULTI
+static void settings_setLanguage(void) {
+	systemSettings.language = (systemSettings.language + 1) % LanguageCount;
+	selectLanguage(systemSettings.language);
+}
+static void settings_displayLanguage(void) {
+	// The language code right aligned, codes run up to 7 chars (SR_CYRL)
+	printShortDescription(SETTINGS_LANGUAGE_INDEX,
+			8 - strlen(LanguageNames[systemSettings.language]));
+	OLED::print(LanguageNames[systemSettings.language]);
+}
+#endif
+
 static void settings_setDisplayRotation(void) {
 	systemSettings.OrientationMode++;
 	systemSettings.OrientationMode = systemSettings.OrientationMode % 3;
@@ -779,7 +800,7 @@ static void displayMenu(size_t index) {
 	OLED::setFont(1);
 	OLED::setCursor(0, 0);
 	// Draw title
-	OLED::print(SettingsMenuEntries[index]);
+	OLED::print(getSettingsMenuEntry(index));
 	// Draw symbol
 	// 16 pixel wide image
 	OLED::drawArea(96 - 16, 0, 16, 16, (&SettingsMenuIcons[(16 * 2) * index]));
@@ -841,7 +862,7 @@ void gui_Menu(const menuitem *menu) {
 				descriptionStart = xTaskGetTickCount();
 			// lower the value - higher the speed
 			int16_t descriptionWidth =
-			FONT_12_WIDTH * (strlen(menu[currentScreen].description) + 7);
+			FONT_12_WIDTH * (strlen(*menu[currentScreen].description) + 7);
 			int16_t descriptionOffset =
 					((xTaskGetTickCount() - descriptionStart)
 							/ (systemSettings.descriptionScrollSpeed == 1 ?
@@ -850,7 +871,7 @@ void gui_Menu(const menuitem *menu) {
 			if (lastOffset != descriptionOffset) {
 				OLED::clearScreen();
 				OLED::setCursor((OLED_WIDTH - descriptionOffset), 0);
-				OLED::print(menu[currentScreen].description);
+				OLED::print(*menu[currentScreen].description);
 				lastOffset = descriptionOffset;
 				lcdRefresh = true;
 			}
@@ -51,6 +51,12 @@ int main(void) {
 	/* Reset of all peripherals, Initializes the Flash interface and the Systick.
 	 */
 	HAL_Init();
+#ifdef TRANSLATION_COMPRESSED
+	decompressTranslations();  // strings are used from here on
+#endif
+#ifdef LANG_PACK
+	loadLanguagePack();  // strings and fonts of the flashed language pack
+#endif
 	Setup_HAL();  // Setup all the HAL objects
 	HAL_IWDG_Refresh(&hiwdg);
 	setTipX10Watts(0);  // force tip off
@@ -77,6 +83,12 @@ int main(void) {
 	}
 	HAL_IWDG_Refresh(&hiwdg);
 	settingsWereReset = restoreSettings();  // load the settings from flash
+#ifdef LANG_MULTI
+	if (systemSettings.language >= LanguageCount) {
+		systemSettings.language = 0;  // saved by a build with more languages
+	}
+	selectLanguage(systemSettings.language);  // the language saved in the settings
+#endif
 
 	HAL_IWDG_Refresh(&hiwdg);
 
@@ -129,8 +129,9 @@ echo "*********************************************"
 
 if [ ${#BUILD_LANGUAGES[@]} -gt 0 ] && [ ${#BUILD_MODELS[@]} -gt 0 ]
 then 
-    echo "Generating Translation.cpp"
-    python3 "$TRANSLATION_DIR/$TRANSLATION_SCRIPT" "$TRANSLATION_DIR" 
+    echo "Generating Translation files"
+    TRANSLATION_LANGUAGES=$(IFS=,; echo "${BUILD_LANGUAGES[*]}")
+    python3 "$TRANSLATION_DIR/$TRANSLATION_SCRIPT" "$TRANSLATION_DIR" --split --jobs 0 -l "$TRANSLATION_LANGUAGES" --depfile Core/Src/Translation.d
     checkLastCommand
 
     echo "Cleaning previous builds"